@@ -0,0 +1,147 @@
+"""Benchmark per-request chunk allocations and graph state size.
+
+Compares, for one QA request over `--k` retrieved chunks:
+
+- "documents": the previous data flow. Retrieved `Document`s are kept in the
+  state, the tool and `retrieval_node` each serialize them to a context string
+  and citation map (the tool's copy is thrown away), the citation map carries
+  `full_content` and the response holds its own context string.
+- "records": the current data flow. Documents are converted once into
+  `ChunkRecord`s, the state holds the chunk table only and the context string
+  and citations are rendered once for the response.
+
+Reported per variant: heap bytes still allocated once the state and response
+exist (tracemalloc), peak heap bytes while building them, and the size of
+the state as written by the session checkpointer.
+
+No API keys are needed; chunks are synthetic text with PyPDFLoader-style
+metadata.
+
+Usage:
+    python benchmarks/chunk_memory.py --k 8 --chunk-chars 500
+"""
+
+import argparse
+import random
+import string
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from langchain_core.documents import Document
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.app.core.retrieval.chunks import ChunkRecord, build_chunk_table, to_records  # noqa: E402
+from src.app.core.retrieval.serialization import (  # noqa: E402
+    render_citations,
+    render_context,
+)
+
+
+def _make_documents(count: int, chunk_chars: int, seed: int = 0) -> List[Document]:
+    """Synthetic retrieved chunks with the metadata PyPDFLoader attaches."""
+    rng = random.Random(seed)
+    docs = []
+    for idx in range(count):
+        words = []
+        while sum(len(word) + 1 for word in words) < chunk_chars:
+            words.append("".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))))
+        docs.append(
+            Document(
+                id=f"doc-{idx}",
+                page_content=" ".join(words) + "\n",
+                metadata={
+                    "source": "data/uploads/vector-databases.pdf",
+                    "page": idx + 1,
+                    "page_label": str(idx + 1),
+                    "total_pages": 120,
+                    "producer": "pdfTeX-1.40.25",
+                    "creator": "LaTeX with hyperref",
+                    "creationdate": "2024-03-01T10:00:00+00:00",
+                    "moddate": "2024-03-01T10:00:00+00:00",
+                },
+            )
+        )
+    return docs
+
+
+def _legacy_serialize(docs: List[Document]) -> Tuple[str, dict]:
+    """The Document-based serializer the pipeline used to call twice."""
+    context_parts = []
+    citation_map = {}
+    for idx, doc in enumerate(docs, start=1):
+        chunk_id = f"C{idx}"
+        page_num = doc.metadata.get("page") or doc.metadata.get("page_number", "unknown")
+        content = doc.page_content.strip()
+        citation_map[chunk_id] = {
+            "page": page_num,
+            "snippet": content[:100] + "..." if len(content) > 100 else content,
+            "source": doc.metadata.get("source", "unknown"),
+            "full_content": content,
+        }
+        context_parts.append(f"[{chunk_id}] Chunk from page {page_num}:\n{content}")
+    return "\n\n".join(context_parts), citation_map
+
+
+def _retrieve(docs: List[Document]) -> List[Document]:
+    """Fresh Document objects, as returned by the vector store per request."""
+    return [doc.model_copy(deep=True) for doc in docs]
+
+
+def documents_request(docs: List[Document]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Previous flow: Documents in state, serialized by tool and node."""
+    artifact = _retrieve(docs)
+    _legacy_serialize(artifact)  # tool result, discarded by retrieval_node
+    context, citations = _legacy_serialize(artifact)
+    state = {"raw_docs": artifact, "context": context, "citations": citations}
+    response = {"context": "".join([state["context"]]), "citations": state["citations"]}
+    return state, response
+
+
+def records_request(docs: List[Document]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Current flow: one record table in state, rendered once for the response."""
+    records = to_records(_retrieve(docs))
+    state = {"chunks": build_chunk_table(records)}
+    response = {
+        "context": render_context(state["chunks"]),
+        "citations": render_citations(state["chunks"]),
+    }
+    return state, response
+
+
+def _measure(
+    build: Callable[[List[Document]], Tuple[dict, dict]], docs: List[Document]
+) -> Tuple[int, int, int]:
+    """Return (retained bytes, peak bytes, checkpoint bytes) for one request."""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    state, response = build(docs)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    serde = JsonPlusSerializer(
+        allowed_msgpack_modules=[(ChunkRecord.__module__, ChunkRecord.__name__)]
+    )
+    checkpoint_bytes = sum(len(serde.dumps_typed(value)[1]) for value in state.values())
+    return current - baseline, peak - baseline, checkpoint_bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--chunk-chars", type=int, default=500)
+    args = parser.parse_args()
+
+    docs = _make_documents(args.k, args.chunk_chars)
+    print(f"{args.k} chunks of ~{args.chunk_chars} chars")
+    print(f"{'variant':>10} {'retained B':>11} {'peak B':>9} {'state B':>9}")
+    for name, build in (("documents", documents_request), ("records", records_request)):
+        retained, peak, state_bytes = _measure(build, docs)
+        print(f"{name:>10} {retained:>11,} {peak:>9,} {state_bytes:>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Benchmark reduced embedding dimensions and quantized local storage.
+
+Embeds the sample corpus from `index_documents.py --sample` at several output
+dimensions, loads it into a `LocalVectorStore` with each quantization mode
+and reports, per configuration:
+
+- index memory (bytes held in RAM by the search index),
+- median search latency,
+- recall@k against exact float search at the model's native dimension.
+
+The eight sample documents are tiny, so `--synthetic N` adds N random unit
+vectors as distractors to make memory and latency figures meaningful. The
+distractors are drawn once at the native dimension and truncated (and
+renormalized) for reduced dimensions, the way the models shorten their own
+embeddings; the ground truth is the exact top-k over the same
+distractor-augmented set, so a distractor in the top-k is not a miss when it
+belongs there.
+
+Usage (needs OPENAI_API_KEY):
+    python benchmarks/embedding_storage.py --dims 3072 1024 256 --synthetic 50000
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from index_documents import SAMPLE_DOCS  # noqa: E402
+from src.app.core.retrieval.local_store import (  # noqa: E402
+    QUANTIZATION_MODES,
+    LocalVectorStore,
+)
+from src.app.core.llm.embeddings import native_embedding_dimension  # noqa: E402
+from src.app.core.retrieval.vector_store import create_embeddings  # noqa: E402
+
+QUERIES = [
+    "What is HNSW indexing?",
+    "How does locality-sensitive hashing work?",
+    "How does IVF reduce the number of comparisons?",
+    "What is product quantization?",
+    "What are vector databases used for?",
+    "What are embeddings?",
+    "Why is approximate nearest neighbor search needed?",
+    "How do hierarchical graph layers speed up search?",
+]
+
+
+class _PrecomputedEmbeddings:
+    """Serve vectors computed once so the benchmark measures search only."""
+
+    def __init__(self, documents: List[List[float]], queries: Dict[str, List[float]]):
+        self._documents = documents
+        self._queries = queries
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        batch = self._documents[: len(texts)]
+        self._documents = self._documents[len(texts) :]
+        return batch
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._queries[text]
+
+
+def _synthetic_vectors(dims: int, count: int, seed: int = 0) -> np.ndarray:
+    """Random unit vectors used as distractors for realistic index sizes."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dims)).astype(np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _truncate(vectors: np.ndarray, dims: int) -> np.ndarray:
+    """Shorten unit vectors to `dims` dimensions and renormalize them."""
+    vectors = vectors[:, :dims]
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _exact_top_k(doc_vectors: np.ndarray, query_vector: np.ndarray, k: int) -> List[int]:
+    return list(np.argsort(-(doc_vectors @ query_vector))[:k])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dims", type=int, nargs="+", default=[3072, 1024, 256])
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--synthetic", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    texts = [doc["content"] for doc in SAMPLE_DOCS]
+    metadatas = [doc["metadata"] for doc in SAMPLE_DOCS]
+
+    # Ground truth: exact float search at the model's full dimension (not
+    # the configured `openai_embedding_dimensions`) over documents plus
+    # distractors.
+    native_dims = native_embedding_dimension()
+    if native_dims is None:
+        parser.error("unknown native dimension of the configured embedding model")
+    if max(args.dims) > native_dims:
+        parser.error(f"--dims must not exceed the native dimension ({native_dims})")
+    native = create_embeddings(dimensions=native_dims)
+    native_docs = np.asarray(native.embed_documents(texts), dtype=np.float32)
+    native_queries = np.asarray(native.embed_documents(QUERIES), dtype=np.float32)
+    distractors = _synthetic_vectors(native_dims, args.synthetic)
+    searched = np.vstack([native_docs, distractors])
+    truth = [set(_exact_top_k(searched, q, args.k)) for q in native_queries]
+
+    print(f"{'dims':>6} {'quant':>7} {'index bytes':>12} {'p50 ms':>8} {f'recall@{args.k}':>9}")
+    for dims in args.dims:
+        embeddings = create_embeddings(dimensions=dims)
+        doc_vectors = embeddings.embed_documents(texts)
+        query_vectors = dict(zip(QUERIES, embeddings.embed_documents(QUERIES)))
+        extra = _truncate(distractors, dims)
+
+        for quantization in QUANTIZATION_MODES:
+            with tempfile.TemporaryDirectory() as tmp:
+                store = LocalVectorStore(
+                    tmp,
+                    _PrecomputedEmbeddings(doc_vectors + extra.tolist(), query_vectors),
+                    embedding_model=f"benchmark:{dims}",
+                    quantization=quantization,
+                )
+                store.add_texts(
+                    texts + [""] * len(extra),
+                    metadatas=metadatas + [{"synthetic": True}] * len(extra),
+                    ids=[str(i) for i in range(len(texts) + len(extra))],
+                )
+
+                latencies = []
+                hits = 0
+                for query, relevant in zip(QUERIES, truth):
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        results = store.similarity_search(query, k=args.k)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                    found = {int(doc.id) for doc in results}
+                    hits += len(found & relevant)
+
+                recall = hits / (len(QUERIES) * args.k)
+                memory = store.memory_usage()["index_bytes"]
+                print(
+                    f"{dims:>6} {quantization:>7} {memory:>12,} "
+                    f"{statistics.median(latencies):>8.3f} {recall:>9.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Benchmark retrieval quality and cost of chunking configurations.
+
+Indexes a corpus into a temporary `LocalVectorStore` once per splitter
+configuration (`chunk_size:chunk_overlap`) and answers a labelled question
+set. Reported per configuration:
+
+- chunks, index size on disk and ingest time (split + embed + store),
+- median query latency (query embedding + search),
+- MRR and recall@k for every `--k`: the share of a question's relevant
+  passages that overlap at least one of the top-k chunks,
+- prompt tokens at every `--k`: the estimated size of the summarization
+  prompt (system prompt, question and rendered context) built from the
+  top-k chunks.
+
+The labelled set is a JSONL file with one `{"question": ..., "passages":
+[...]}` object per line; passages are quoted verbatim from the corpus
+(whitespace may differ) and matched by character span, so results are
+comparable across chunk sizes. Without `--corpus`/`--labels` the sample
+documents of `index_documents.py --sample` and built-in labels are used.
+
+`--embedder hashing` swaps the configured embeddings for the local hashed
+bag-of-words provider so the harness runs offline; its recall only says how
+lexical the question set is.
+
+Usage:
+    python benchmarks/retrieval_quality.py --configs 500:50 1000:200 --k 2 4 8
+    python benchmarks/retrieval_quality.py --corpus data/ --labels labels.jsonl
+"""
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from index_documents import SAMPLE_DOCS  # noqa: E402
+from src.app.core.agents.prompts import SUMMARIZATION_SYSTEM_PROMPT  # noqa: E402
+from src.app.core.llm.embeddings import HashingEmbeddings  # noqa: E402
+from src.app.core.llm.tokens import count_tokens  # noqa: E402
+from src.app.core.retrieval.chunks import build_chunk_table, to_records  # noqa: E402
+from src.app.core.retrieval.local_store import LocalVectorStore  # noqa: E402
+from src.app.core.retrieval.serialization import render_context  # noqa: E402
+from src.app.core.retrieval.vector_store import create_embeddings  # noqa: E402
+
+# The two splitter settings used by the ingestion paths today.
+DEFAULT_CONFIGS = ["500:50", "1000:200"]
+
+SAMPLE_LABELS = [
+    {
+        "question": "What is HNSW indexing?",
+        "passages": ["HNSW (Hierarchical Navigable Small World) is a graph-based indexing algorithm"],
+    },
+    {
+        "question": "How do hierarchical graph layers speed up search?",
+        "passages": ["Each layer acts as a skip list"],
+    },
+    {
+        "question": "How does locality-sensitive hashing work?",
+        "passages": ["uses hash functions to map similar vectors to the same buckets"],
+    },
+    {
+        "question": "How does IVF reduce the number of comparisons?",
+        "passages": ["only vectors in the nearest clusters are"],
+    },
+    {
+        "question": "What is product quantization?",
+        "passages": ["Product Quantization (PQ) is a compression technique"],
+    },
+    {
+        "question": "What are vector databases used for?",
+        "passages": ["Vector databases are optimized for storing and querying high-dimensional"],
+    },
+    {
+        "question": "What are embeddings?",
+        "passages": ["Embeddings are dense vector representations of data"],
+    },
+    {
+        "question": "Why is approximate nearest neighbor search needed?",
+        "passages": ["Exact search becomes impractical at scal"],
+    },
+]
+
+
+def _load_corpus(corpus: Path | None) -> List[Document]:
+    """One Document per source file (PDFs as a single text)."""
+    if corpus is None:
+        return [
+            Document(page_content=doc["content"], metadata=dict(doc["metadata"]))
+            for doc in SAMPLE_DOCS
+        ]
+
+    from langchain_community.document_loaders import PyPDFLoader
+
+    docs = []
+    for path in sorted(corpus.rglob("*")):
+        if path.suffix.lower() == ".pdf":
+            docs.extend(PyPDFLoader(str(path), mode="single").load())
+        elif path.suffix.lower() in (".txt", ".md"):
+            docs.append(
+                Document(
+                    page_content=path.read_text(encoding="utf-8"),
+                    metadata={"source": str(path), "page": 1},
+                )
+            )
+    return docs
+
+
+def _load_labels(labels: Path | None) -> List[dict]:
+    if labels is None:
+        return SAMPLE_LABELS
+    with labels.open(encoding="utf-8") as lines:
+        return [json.loads(line) for line in lines if line.strip()]
+
+
+def _passage_spans(
+    docs: List[Document], passages: List[str]
+) -> List[Tuple[int, int, int]]:
+    """(document index, start, end) of every passage found in the corpus."""
+    spans = []
+    for passage in passages:
+        pattern = re.compile(r"\s+".join(map(re.escape, passage.split())))
+        for doc_index, doc in enumerate(docs):
+            match = pattern.search(doc.page_content)
+            if match:
+                spans.append((doc_index, match.start(), match.end()))
+                break
+        else:
+            print(f"   ! passage not found in corpus: {passage[:60]!r}")
+    return spans
+
+
+def _overlaps(chunk: Document, span: Tuple[int, int, int]) -> bool:
+    doc_index, start, end = span
+    chunk_start = chunk.metadata["start_index"]
+    return (
+        chunk.metadata["doc_index"] == doc_index
+        and chunk_start < end
+        and start < chunk_start + len(chunk.page_content)
+    )
+
+
+def _prompt_tokens(question: str, results: List[Document]) -> int:
+    context = render_context(build_chunk_table(to_records(results)))
+    return count_tokens(
+        SUMMARIZATION_SYSTEM_PROMPT + f"Context:\n{context}\n\nQuestion: {question}"
+    )
+
+
+def _evaluate(
+    docs: List[Document],
+    labels: List[dict],
+    spans: List[List[Tuple[int, int, int]]],
+    embeddings: Embeddings,
+    chunk_size: int,
+    chunk_overlap: int,
+    ks: List[int],
+) -> Dict[str, float]:
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        chunks = splitter.create_documents(
+            [doc.page_content for doc in docs],
+            metadatas=[{**doc.metadata, "doc_index": idx} for idx, doc in enumerate(docs)],
+        )
+        store = LocalVectorStore(
+            tmp, embeddings, embedding_model=f"benchmark:{chunk_size}:{chunk_overlap}"
+        )
+        store.add_texts(
+            [chunk.page_content for chunk in chunks],
+            metadatas=[chunk.metadata for chunk in chunks],
+        )
+        ingest_seconds = time.perf_counter() - start
+        index_bytes = sum(path.stat().st_size for path in Path(tmp).iterdir())
+
+        latencies = []
+        reciprocal_ranks = []
+        recall = {k: [] for k in ks}
+        tokens = {k: [] for k in ks}
+        for label, label_spans in zip(labels, spans):
+            if not label_spans:
+                continue
+            question = label["question"]
+            start = time.perf_counter()
+            results = store.similarity_search(question, k=max(ks))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            relevant = [any(_overlaps(doc, span) for span in label_spans) for doc in results]
+            first = relevant.index(True) + 1 if True in relevant else None
+            reciprocal_ranks.append(1.0 / first if first else 0.0)
+            for k in ks:
+                found = sum(
+                    any(_overlaps(doc, span) for doc in results[:k]) for span in label_spans
+                )
+                recall[k].append(found / len(label_spans))
+                tokens[k].append(_prompt_tokens(question, results[:k]))
+
+    row = {
+        "chunks": len(chunks),
+        "index_kb": index_bytes / 1024,
+        "ingest_s": ingest_seconds,
+        "p50_ms": statistics.median(latencies),
+        "mrr": statistics.mean(reciprocal_ranks),
+    }
+    for k in ks:
+        row[f"recall@{k}"] = statistics.mean(recall[k])
+        row[f"tokens@{k}"] = statistics.mean(tokens[k])
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", type=Path, help="directory of .pdf/.txt/.md files")
+    parser.add_argument("--labels", type=Path, help="JSONL question -> passages file")
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS)
+    parser.add_argument("--k", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--embedder", choices=("configured", "hashing"), default="configured")
+    args = parser.parse_args()
+
+    docs = _load_corpus(args.corpus)
+    labels = _load_labels(args.labels)
+    spans = [_passage_spans(docs, label["passages"]) for label in labels]
+    embeddings = HashingEmbeddings() if args.embedder == "hashing" else create_embeddings()
+    ks = sorted(set(args.k))
+
+    print(f"{len(docs)} documents, {sum(map(bool, spans))} labelled questions")
+    header = f"{'config':>10} {'chunks':>7} {'index KB':>9} {'ingest s':>9} {'p50 ms':>8} {'MRR':>6}"
+    header += "".join(f" {f'R@{k}':>6} {f'tok@{k}':>7}" for k in ks)
+    print(header)
+    for config in args.configs:
+        chunk_size, chunk_overlap = (int(part) for part in config.split(":"))
+        row = _evaluate(docs, labels, spans, embeddings, chunk_size, chunk_overlap, ks)
+        line = (
+            f"{config:>10} {row['chunks']:>7} {row['index_kb']:>9.1f} "
+            f"{row['ingest_s']:>9.3f} {row['p50_ms']:>8.3f} {row['mrr']:>6.2f}"
+        )
+        line += "".join(f" {row[f'recall@{k}']:>6.2f} {row[f'tokens@{k}']:>7.0f}" for k in ks)
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
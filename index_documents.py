@@ -1,24 +1,98 @@
 """Quick script to index sample documents into Pinecone.
 
 Run this to populate your Pinecone index with documents before asking questions.
+
+Usage:
+    python index_documents.py                # index PDFs in data/ (or the sample)
+    python index_documents.py --sample       # index the built-in sample text
+    python index_documents.py --workers 4    # parse PDFs with 4 processes
 """
 
+import argparse
 import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from pathlib import Path
+from typing import Any, Dict, List, Tuple
 
 from dotenv import load_dotenv
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_openai import OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pinecone import Pinecone
+from pypdf import PdfReader
+
+from src.app.core.cache import get_cache
+from src.app.core.llm.rate_limit import INDEXING, rate_priority
+from src.app.core.retrieval.vector_store import check_index_embeddings, create_embeddings
 
 # Load environment variables
 load_dotenv()
 
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+
+# Sample documents about vector databases (also used by benchmarks/)
+SAMPLE_DOCS = [
+    {
+        "content": """HNSW (Hierarchical Navigable Small World) is a graph-based indexing algorithm 
+        for approximate nearest neighbor search in high-dimensional spaces. It provides fast search 
+        times by organizing data points in a hierarchical graph structure. The algorithm builds 
+        multiple layers, where higher layers have fewer nodes and enable quick navigation to the 
+        target region. HNSW achieves excellent performance with sub-linear search complexity.""",
+        "metadata": {"page": 5, "source": "vector_db_paper.pdf"}
+    },
+    {
+        "content": """The hierarchical structure of HNSW graphs allows for efficient navigation 
+        through the vector space. Each layer acts as a skip list, enabling the algorithm to quickly 
+        jump to relevant regions before performing detailed search in the bottom layer. This 
+        multi-scale approach is key to HNSW's performance advantage over flat indexes.""",
+        "metadata": {"page": 6, "source": "vector_db_paper.pdf"}
+    },
+    {
+        "content": """Locality-Sensitive Hashing (LSH) is a technique for approximate nearest neighbor 
+        search that uses hash functions to map similar vectors to the same buckets. LSH reduces the 
+        search space by focusing only on vectors that hash to the same or nearby buckets as the query 
+        vector. This probabilistic approach trades some accuracy for significant speed improvements.""",
+        "metadata": {"page": 7, "source": "vector_db_paper.pdf"}
+    },
+    {
+        "content": """Inverted File (IVF) indexing partitions the vector space into Voronoi cells 
+        using k-means clustering. During search, only vectors in the nearest clusters are examined, 
+        dramatically reducing the number of comparisons needed. IVF can be combined with product 
+        quantization for additional compression and speed improvements.""",
+        "metadata": {"page": 8, "source": "vector_db_paper.pdf"}
+    },
+    {
+        "content": """Product Quantization (PQ) is a compression technique that divides vectors into 
+        subvectors and quantizes each subvector independently using a learned codebook. This approach 
+        achieves significant memory savings while enabling fast approximate distance computations. 
+        PQ is often used in conjunction with other indexing methods like IVF.""",
+        "metadata": {"page": 9, "source": "vector_db_paper.pdf"}
+    },
+    {
+        "content": """Vector databases are optimized for storing and querying high-dimensional 
+        embeddings generated by machine learning models. They provide specialized indexing structures 
+        and query capabilities designed for similarity search operations. Common use cases include 
+        semantic search, recommendation systems, and retrieval-augmented generation (RAG) systems.""",
+        "metadata": {"page": 3, "source": "vector_db_paper.pdf"}
+    },
+    {
+        "content": """Embeddings are dense vector representations of data that capture semantic 
+        meaning. Modern embedding models like OpenAI's text-embedding-3-large can represent text 
+        in thousands of dimensions, where similar concepts are positioned close together in the 
+        vector space. This enables semantic search that goes beyond keyword matching.""",
+        "metadata": {"page": 4, "source": "vector_db_paper.pdf"}
+    },
+    {
+        "content": """Approximate Nearest Neighbor (ANN) search is essential for scaling vector 
+        databases to millions or billions of vectors. Exact search becomes impractical at scale, 
+        so ANN algorithms trade small amounts of accuracy for orders of magnitude speed improvements. 
+        Techniques like HNSW, LSH, and IVF enable sub-millisecond queries on large datasets.""",
+        "metadata": {"page": 10, "source": "vector_db_paper.pdf"}
+    },
+]
 
 
 def index_sample_text():
@@ -26,88 +100,25 @@ def index_sample_text():
     
     print("🔧 Initializing embeddings and vector store...")
     
-    # Initialize embeddings
-    embeddings = OpenAIEmbeddings(
-        api_key=OPENAI_API_KEY,
-        model="text-embedding-3-large"
-    )
+    # Initialize embeddings (same model and dimensions as query time)
+    embeddings = create_embeddings()
     
     # Initialize Pinecone
     pc = Pinecone(api_key=PINECONE_API_KEY)
     index = pc.Index(PINECONE_INDEX_NAME)
     
     # Check if index has vectors
-    stats = index.describe_index_stats()
+    stats = check_index_embeddings(index, claim=True)
     print(f"📊 Current vector count: {stats['total_vector_count']}")
     
-    # Sample documents about vector databases
-    sample_docs = [
-        {
-            "content": """HNSW (Hierarchical Navigable Small World) is a graph-based indexing algorithm 
-            for approximate nearest neighbor search in high-dimensional spaces. It provides fast search 
-            times by organizing data points in a hierarchical graph structure. The algorithm builds 
-            multiple layers, where higher layers have fewer nodes and enable quick navigation to the 
-            target region. HNSW achieves excellent performance with sub-linear search complexity.""",
-            "metadata": {"page": 5, "source": "vector_db_paper.pdf"}
-        },
-        {
-            "content": """The hierarchical structure of HNSW graphs allows for efficient navigation 
-            through the vector space. Each layer acts as a skip list, enabling the algorithm to quickly 
-            jump to relevant regions before performing detailed search in the bottom layer. This 
-            multi-scale approach is key to HNSW's performance advantage over flat indexes.""",
-            "metadata": {"page": 6, "source": "vector_db_paper.pdf"}
-        },
-        {
-            "content": """Locality-Sensitive Hashing (LSH) is a technique for approximate nearest neighbor 
-            search that uses hash functions to map similar vectors to the same buckets. LSH reduces the 
-            search space by focusing only on vectors that hash to the same or nearby buckets as the query 
-            vector. This probabilistic approach trades some accuracy for significant speed improvements.""",
-            "metadata": {"page": 7, "source": "vector_db_paper.pdf"}
-        },
-        {
-            "content": """Inverted File (IVF) indexing partitions the vector space into Voronoi cells 
-            using k-means clustering. During search, only vectors in the nearest clusters are examined, 
-            dramatically reducing the number of comparisons needed. IVF can be combined with product 
-            quantization for additional compression and speed improvements.""",
-            "metadata": {"page": 8, "source": "vector_db_paper.pdf"}
-        },
-        {
-            "content": """Product Quantization (PQ) is a compression technique that divides vectors into 
-            subvectors and quantizes each subvector independently using a learned codebook. This approach 
-            achieves significant memory savings while enabling fast approximate distance computations. 
-            PQ is often used in conjunction with other indexing methods like IVF.""",
-            "metadata": {"page": 9, "source": "vector_db_paper.pdf"}
-        },
-        {
-            "content": """Vector databases are optimized for storing and querying high-dimensional 
-            embeddings generated by machine learning models. They provide specialized indexing structures 
-            and query capabilities designed for similarity search operations. Common use cases include 
-            semantic search, recommendation systems, and retrieval-augmented generation (RAG) systems.""",
-            "metadata": {"page": 3, "source": "vector_db_paper.pdf"}
-        },
-        {
-            "content": """Embeddings are dense vector representations of data that capture semantic 
-            meaning. Modern embedding models like OpenAI's text-embedding-3-large can represent text 
-            in thousands of dimensions, where similar concepts are positioned close together in the 
-            vector space. This enables semantic search that goes beyond keyword matching.""",
-            "metadata": {"page": 4, "source": "vector_db_paper.pdf"}
-        },
-        {
-            "content": """Approximate Nearest Neighbor (ANN) search is essential for scaling vector 
-            databases to millions or billions of vectors. Exact search becomes impractical at scale, 
-            so ANN algorithms trade small amounts of accuracy for orders of magnitude speed improvements. 
-            Techniques like HNSW, LSH, and IVF enable sub-millisecond queries on large datasets.""",
-            "metadata": {"page": 10, "source": "vector_db_paper.pdf"}
-        },
-    ]
     
-    print(f"📝 Indexing {len(sample_docs)} sample documents...")
+    print(f"📝 Indexing {len(SAMPLE_DOCS)} sample documents...")
     
     # Convert to LangChain Document format
     from langchain_core.documents import Document
     documents = [
         Document(page_content=doc["content"], metadata=doc["metadata"])
-        for doc in sample_docs
+        for doc in SAMPLE_DOCS
     ]
     
     # Create vector store and add documents
@@ -119,6 +130,7 @@ def index_sample_text():
     
     # Add documents
     ids = vector_store.add_documents(documents)
+    get_cache().bump_corpus_version()
     print(f"✅ Successfully indexed {len(ids)} documents!")
     
     # Verify
@@ -129,8 +141,109 @@ def index_sample_text():
     print("   Example: 'What is HNSW indexing?'")
 
 
-def index_pdf_files():
-    """Index PDF files from the data/ directory."""
+# Chunk record passed from parsing workers to the embed/upsert stage:
+# (text, metadata). Plain tuples pickle far smaller than `Document` objects.
+ChunkRecord = Tuple[str, Dict[str, Any]]
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+EMBED_BATCH_SIZE = 100
+
+
+def _parse_page_range(path: str, start: int, stop: int) -> List[ChunkRecord]:
+    """Parse and split pages [start, stop) of a PDF into chunk records.
+
+    Runs inside a worker process (or in this process with `--workers 1`,
+    so both paths index the same chunks). Each chunk carries the per-page
+    metadata fields `PyPDFLoader` sets in page mode (source, page,
+    total_pages, page_label).
+    """
+    reader = PdfReader(path)
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+    )
+
+    records: List[ChunkRecord] = []
+    total_pages = len(reader.pages)
+    page_labels = reader.page_labels
+    for page_number in range(start, min(stop, total_pages)):
+        text = reader.pages[page_number].extract_text() or ""
+        metadata = {
+            "source": path,
+            "page": page_number,
+            "total_pages": total_pages,
+            "page_label": page_labels[page_number],
+        }
+        records.extend((chunk, metadata) for chunk in text_splitter.split_text(text))
+    return records
+
+
+def _plan_tasks(pdf_files: List[Path], pages_per_task: int) -> List[Tuple[str, int, int]]:
+    """Split every PDF into page-range tasks of at most `pages_per_task` pages."""
+    tasks = []
+    for pdf_path in pdf_files:
+        page_count = len(PdfReader(str(pdf_path)).pages)
+        for start in range(0, page_count, pages_per_task):
+            tasks.append((str(pdf_path), start, start + pages_per_task))
+    return tasks
+
+
+def _upsert_worker(
+    chunk_queue: "queue.Queue[List[ChunkRecord] | None]",
+    vector_store: PineconeVectorStore,
+    totals: Dict[str, Any],
+) -> None:
+    """Consume chunk records from the queue and embed/upsert them in batches.
+
+    After a failure the queue is still drained (without upserting) so the
+    parsing side never blocks on a full queue; the error is left in
+    `totals["error"]` for the caller to raise.
+    """
+    batch: List[ChunkRecord] = []
+
+    def flush(records: List[ChunkRecord]) -> None:
+        if totals["error"] is not None:
+            return
+        try:
+            with rate_priority(INDEXING):
+                vector_store.add_texts(
+                    [text for text, _ in records],
+                    metadatas=[metadata for _, metadata in records],
+                )
+        except Exception as exc:
+            totals["error"] = exc
+            return
+        totals["chunks"] += len(records)
+        totals["batches"] += 1
+        print(f"   ✓ Indexed batch {totals['batches']} ({totals['chunks']} chunks so far)")
+
+    while (records := chunk_queue.get()) is not None:
+        batch.extend(records)
+        while len(batch) >= EMBED_BATCH_SIZE:
+            flush(batch[:EMBED_BATCH_SIZE])
+            del batch[:EMBED_BATCH_SIZE]
+    if batch:
+        flush(batch)
+
+
+def index_pdf_files(workers: int = 1, pages_per_task: int = 25, queue_size: int = 8):
+    """Index PDF files from the data/ directory.
+
+    Parsing and splitting are CPU-bound, so with `workers > 1` page ranges
+    of every file are spread across a process pool. Workers return compact
+    (text, metadata) records that feed the embed/upsert stage through a
+    bounded queue. New tasks are only submitted as parsed results are handed
+    to that queue, with at most `max(queue_size, workers)` tasks in flight,
+    so parsing never runs far ahead of embedding.
+
+    Args:
+        workers: Number of parsing processes (1 parses in this process).
+        pages_per_task: Pages per parsing task; big files are split into
+            several tasks.
+        queue_size: Maximum number of parsed tasks waiting to be embedded
+            (and of tasks submitted to the pool ahead of them).
+    """
     
     data_dir = Path("data")
     
@@ -151,35 +264,12 @@ def index_pdf_files():
     
     print(f"📁 Found {len(pdf_files)} PDF files")
     
-    # Initialize components
-    embeddings = OpenAIEmbeddings(
-        api_key=OPENAI_API_KEY,
-        model="text-embedding-3-large"
-    )
+    # Initialize components (same embedding model and dimensions as query time)
+    embeddings = create_embeddings()
     
     pc = Pinecone(api_key=PINECONE_API_KEY)
     index = pc.Index(PINECONE_INDEX_NAME)
-    
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200
-    )
-    
-    all_documents = []
-    
-    for pdf_path in pdf_files:
-        print(f"📄 Processing: {pdf_path.name}")
-        
-        loader = PyPDFLoader(str(pdf_path))
-        pages = loader.load()
-        
-        # Split into chunks
-        chunks = text_splitter.split_documents(pages)
-        all_documents.extend(chunks)
-        
-        print(f"   ✓ Extracted {len(chunks)} chunks")
-    
-    print(f"\n📝 Indexing {len(all_documents)} total chunks...")
+    check_index_embeddings(index, claim=True)
     
     # Create vector store
     vector_store = PineconeVectorStore(
@@ -188,29 +278,78 @@ def index_pdf_files():
         text_key="text"
     )
     
-    # Add documents in batches
-    batch_size = 100
-    for i in range(0, len(all_documents), batch_size):
-        batch = all_documents[i:i+batch_size]
-        vector_store.add_documents(batch)
-        print(f"   ✓ Indexed batch {i//batch_size + 1}/{(len(all_documents)-1)//batch_size + 1}")
+    tasks = _plan_tasks(pdf_files, pages_per_task)
+    print(f"📄 Parsing {len(tasks)} page ranges with {workers} worker(s)...")
+
+    chunk_queue: "queue.Queue[List[ChunkRecord] | None]" = queue.Queue(maxsize=queue_size)
+    totals: Dict[str, Any] = {"chunks": 0, "batches": 0, "error": None}
+    upserter = threading.Thread(
+        target=_upsert_worker,
+        args=(chunk_queue, vector_store, totals),
+        daemon=True,
+    )
+    upserter.start()
+
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = iter(tasks)
+                in_flight: "set[Future[List[ChunkRecord]]]" = set()
+                max_in_flight = max(queue_size, workers)
+                while True:
+                    # Top up the pool; a blocked put() below holds it back.
+                    for task in pending:
+                        in_flight.add(executor.submit(_parse_page_range, *task))
+                        if len(in_flight) >= max_in_flight:
+                            break
+                    if not in_flight:
+                        break
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        chunk_queue.put(future.result())
+        else:
+            for task in tasks:
+                chunk_queue.put(_parse_page_range(*task))
+    finally:
+        chunk_queue.put(None)
+        upserter.join()
+
+    if totals["chunks"]:
+        # Invalidate cached retrieval results in the API workers
+        get_cache().bump_corpus_version()
+    if totals["error"] is not None:
+        raise totals["error"]
     
     stats = index.describe_index_stats()
-    print(f"\n✅ Indexing complete!")
+    print(f"\n✅ Indexing complete! ({totals['chunks']} chunks)")
     print(f"📊 Total vectors in index: {stats['total_vector_count']}")
 
 
 if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) > 1 and sys.argv[1] == "--sample":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sample", action="store_true", help="index the built-in sample text")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="processes used to parse and split PDFs (default: 1)",
+    )
+    parser.add_argument(
+        "--pages-per-task",
+        type=int,
+        default=25,
+        help="pages per parsing task; large PDFs are split across workers",
+    )
+    args = parser.parse_args()
+
+    if args.sample:
         # Index sample text
         index_sample_text()
     else:
         # Try to index PDFs, fall back to sample if none found
         data_dir = Path("data")
         if data_dir.exists() and list(data_dir.glob("*.pdf")):
-            index_pdf_files()
+            index_pdf_files(workers=args.workers, pages_per_task=args.pages_per_task)
         else:
             print("📝 No PDFs found. Indexing sample documents instead...")
             print("   (Use 'python index_documents.py' with PDFs in data/ folder)")
@@ -1,12 +1,85 @@
-from pathlib import Path
+import asyncio
+import threading
 
 from fastapi import FastAPI, File, HTTPException, Request, UploadFile, status
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers
 
-from .models import QuestionRequest, QAResponse
+from .core import metrics, profiling, tracing
+from .core.config import get_settings
+from .core.deadline import new_deadline
+from .core.retrieval.documents import DocumentNotFoundError, get_document_registry
+from .models import PrefetchRequest, QuestionRequest, QAResponse
+from .services.admission import OverloadedError, get_admission_controller
+from .services.prefetch import PrefetchRateLimitedError, get_prefetch_scheduler
 from .services.qa_service import answer_question
-from .services.indexing_service import index_pdf_file
+from .services.indexing_service import (
+    DuplicateUploadError,
+    InvalidUploadError,
+    StoredUpload,
+    UploadTooLargeError,
+    check_source_name,
+    delete_uploaded_document,
+    index_stored_upload,
+    replace_stored_upload,
+    store_pdf_upload,
+)
+
+# Allowance for multipart boundaries and headers around the file itself.
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+# Non-standard "Client Closed Request" status logged for abandoned requests.
+_CLIENT_CLOSED_REQUEST = 499
+
+
+class RequestSizeLimitMiddleware:
+    """Cap request bodies while they are received.
+
+    Multipart uploads are parsed (and spooled to a temporary file) before
+    the endpoint runs, so the limit cannot be enforced by the endpoint. This
+    ASGI middleware rejects a request with 413 when its Content-Length is
+    over the limit, before reading the body, and otherwise counts the body
+    as it arrives and aborts with 413 as soon as it exceeds the limit. This
+    also covers chunked uploads, which have no Content-Length.
+    """
+
+    def __init__(self, app, max_body_bytes: int) -> None:
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File exceeds the maximum upload size.",
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            exc = self._too_large()
+            response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Raised inside body parsing; FastAPI re-raises
+                    # HTTPExceptions from there, so the client gets the 413.
+                    raise self._too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
 
 
 app = FastAPI(
@@ -27,6 +100,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_body_bytes=get_settings().max_upload_bytes + _MULTIPART_OVERHEAD_BYTES,
+)
 
 
 @app.get("/")
@@ -38,7 +115,10 @@ async def root():
         "endpoints": {
             "docs": "/docs",
             "qa": "/qa (POST)",
-            "index_pdf": "/index-pdf (POST)"
+            "qa_prefetch": "/qa/prefetch (POST)",
+            "index_pdf": "/index-pdf (POST)",
+            "documents": "/documents (GET), /documents/{source} (PUT, DELETE)",
+            "metrics": "/metrics"
         }
     }
 
@@ -64,8 +144,79 @@ async def unhandled_exception_handler(
     )
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint() -> str:
+    """Process metrics in the Prometheus text exposition format."""
+    return metrics.render_prometheus()
+
+
+def _client_id(request: Request) -> str:
+    """Identify the client for per-client prefetch state."""
+    header = request.headers.get("X-Client-Id", "").strip()
+    if header:
+        return header[:128]
+    return request.client.host if request.client else "anonymous"
+
+
+async def _answer_until_disconnect(
+    request: Request,
+    question: str,
+    session_id: str | None,
+    deadline: float | None,
+) -> dict | None:
+    """Run `answer_question` under admission control, watching the client.
+
+    Returns:
+        The service result, or None if the client disconnected first. In that
+        case a request still waiting in the admission queue leaves it
+        immediately, while an admitted run is told to stop before its next
+        node and keeps its admission slot until its worker thread returns.
+
+    Raises:
+        OverloadedError: The request was not admitted.
+    """
+    cancel_event = threading.Event()
+    admitted = False
+
+    async def run() -> dict:
+        nonlocal admitted
+        async with get_admission_controller().admit():
+            admitted = True
+            return await run_in_threadpool(
+                profiling.profiled(answer_question),
+                question,
+                session_id,
+                cancel_event,
+                deadline,
+            )
+
+    task = asyncio.create_task(run())
+    # Retrieve the outcome of abandoned runs so it is not logged as unhandled.
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+    poll_seconds = get_settings().qa_disconnect_poll_seconds
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_seconds)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                metrics.increment("qa_cancelled_total")
+                return None
+    finally:
+        if not task.done():
+            cancel_event.set()
+            if not admitted:
+                task.cancel()
+            # Threaded work cannot be interrupted: an admitted run stops at
+            # the next node boundary, and the task is left to finish so the
+            # slot is only released once the worker thread is free again.
+
+
 @app.post("/qa", response_model=QAResponse, status_code=status.HTTP_200_OK)
-async def qa_endpoint(payload: QuestionRequest) -> QAResponse:
+async def qa_endpoint(
+    payload: QuestionRequest, request: Request, response: Response
+) -> QAResponse:
     """Submit a question about the vector databases paper.
 
     US-001 requirements:
@@ -77,6 +228,34 @@ async def qa_endpoint(payload: QuestionRequest) -> QAResponse:
     Enhancement for Feature 4 (Evidence-Aware Answers):
     - Returns `citations` mapping chunk IDs to source metadata
     - Enables frontend to display traceable sources
+
+    Conversation sessions:
+    - An optional `session_id` groups requests into a conversation so that
+      follow-up questions reuse still-relevant chunks from earlier turns
+
+    Admission control:
+    - Returns 429 with `Retry-After` when the concurrency limit and wait
+      queue are full, or when the request waited too long for a slot
+    - Stops the graph run when the client disconnects
+
+    Deadlines:
+    - Each request has `qa_deadline_seconds` from arrival; near the deadline
+      the draft is returned with `verified: false`, or only citations with
+      `status: "partial"`
+
+    Tracing:
+    - With `tracing_enabled`, the run is recorded as a span tree and the
+      trace ID is returned in the `X-Trace-Id` header
+
+    Profiling:
+    - With `profiling_enabled`, requests carrying the profiling header (or
+      sampled at `profiling_sample_rate`) are profiled; the artifact name is
+      returned in the `X-Profile-Id` header
+
+    Prefetch:
+    - With `prefetch_enabled`, a pending `/qa/prefetch` of the client for
+      this question is awaited and its results reused; one for another
+      question is cancelled
     """
 
     question = payload.question.strip()
@@ -88,45 +267,209 @@ async def qa_endpoint(payload: QuestionRequest) -> QAResponse:
             detail="`question` must be a non-empty string.",
         )
 
-    # Delegate to the service layer which runs the multi-agent QA graph
-    result = answer_question(question)
+    # The deadline starts on arrival, so time spent queued counts against it
+    settings = get_settings()
+    deadline = new_deadline(settings.qa_deadline_seconds)
 
-    return QAResponse(
-        answer=result.get("answer", ""),
-        context=result.get("context", ""),
-        citations=result.get("citations"),
-    )
+    if settings.prefetch_enabled:
+        await get_prefetch_scheduler().settle(_client_id(request), question)
 
+    profile_mode = profiling.requested_mode(request.headers)
+    with profiling.profile_request("qa", profile_mode) as profile, tracing.span(
+        "qa", question_chars=len(question), session=payload.session_id is not None
+    ) as root:
+        extra_headers = {"X-Trace-Id": root.trace_id} if root.trace_id else {}
+        if profile is not None:
+            extra_headers["X-Profile-Id"] = profile.profile_id
 
-@app.post("/index-pdf", status_code=status.HTTP_200_OK)
-async def index_pdf(file: UploadFile = File(...)) -> dict:
-    """Upload a PDF and index it into the vector database.
+        # Delegate to the service layer which runs the multi-agent QA graph
+        try:
+            result = await _answer_until_disconnect(
+                request, question, payload.session_id, deadline
+            )
+        except OverloadedError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=str(exc),
+                headers={"Retry-After": str(exc.retry_after), **extra_headers},
+            ) from exc
 
-    This endpoint:
-    - Accepts a PDF file upload
-    - Saves it to the local `data/uploads/` directory
-    - Uses PyPDFLoader to load the document into LangChain `Document` objects
-    - Indexes those documents into the configured Pinecone vector store
+        if result is None:
+            root.set_attribute("status", "cancelled")
+            return Response(status_code=_CLIENT_CLOSED_REQUEST, headers=extra_headers)
+
+        root.set_attributes(status=result.get("status"), verified=result.get("verified"))
+        response.headers.update(extra_headers)
+        return QAResponse(
+            answer=result.get("answer", ""),
+            context=result.get("context", ""),
+            citations=result.get("citations"),
+            session_id=payload.session_id,
+            grounding=result.get("grounding"),
+            verified=result.get("verified"),
+            status=result.get("status", "complete"),
+        )
+
+
+@app.post("/qa/prefetch", status_code=status.HTTP_202_ACCEPTED)
+async def qa_prefetch_endpoint(payload: PrefetchRequest, request: Request) -> dict:
+    """Warm retrieval for a question the user is still typing.
+
+    - Retrieval runs once the client (`X-Client-Id` header, else its
+      address) has sent no newer partial question for
+      `prefetch_debounce_seconds`; a newer one replaces the pending run
+    - A `/qa` question equal to, or slightly extending, the prefetched one
+      is answered from the prefetched results
+    - Returns 404 when prefetch is disabled and 429 with `Retry-After` when
+      the client exceeds `prefetch_max_per_minute`
     """
+    if not get_settings().prefetch_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Prefetch is disabled."
+        )
+
+    try:
+        result = get_prefetch_scheduler().schedule(
+            _client_id(request), payload.question.strip()
+        )
+    except PrefetchRateLimitedError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    return {"status": result}
 
+
+def _check_pdf_request(file: UploadFile) -> None:
+    """Reject uploads whose declared content type is not PDF.
+
+    The request body has already been received at this point; its size is
+    capped by `RequestSizeLimitMiddleware` while it arrives.
+    """
     if file.content_type not in ("application/pdf",):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only PDF files are supported.",
         )
 
-    upload_dir = Path("data/uploads")
-    upload_dir.mkdir(parents=True, exist_ok=True)
 
-    file_path = upload_dir / file.filename
-    contents = await file.read()
-    file_path.write_bytes(contents)
+async def _store_upload(
+    file: UploadFile, replace_source: str | None = None
+) -> StoredUpload:
+    """Copy a received upload to disk, mapping rejections to HTTP errors."""
+    try:
+        return await store_pdf_upload(file, replace_source)
+    except InvalidUploadError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    except UploadTooLargeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)
+        ) from exc
+    except DuplicateUploadError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=str(exc)
+        ) from exc
+
+
+@app.post("/index-pdf", status_code=status.HTTP_200_OK)
+async def index_pdf(
+    request: Request, response: Response, file: UploadFile = File(...)
+) -> dict:
+    """Upload a PDF and index it into the vector database.
+
+    This endpoint:
+    - Accepts a PDF file upload; request bodies larger than
+      `max_upload_bytes` (plus multipart overhead) are cut off with 413 while
+      they are received
+    - Copies it in chunks to the local `data/uploads/` directory under a
+      sanitized filename, hashing it on the way
+    - Rejects non-PDF content (by magic bytes) with 400, files larger than
+      `max_upload_bytes` with 413 and duplicate content with 409, all before
+      any parsing
+    - Uses PyPDFLoader to load the document into LangChain `Document` objects
+    - Indexes those documents into the configured Pinecone vector store
+    - Can be profiled like `/qa` (see the `X-Profile-Id` response header)
+    """
+
+    _check_pdf_request(file)
+
+    profile_mode = profiling.requested_mode(request.headers)
+    with profiling.profile_request("index_pdf", profile_mode) as profile:
+        stored = await _store_upload(file)
+
+        # Index the saved PDF off the event loop (parsing and embedding block)
+        chunks_indexed = await run_in_threadpool(
+            profiling.profiled(index_stored_upload), stored
+        )
 
-    # Index the saved PDF
-    chunks_indexed = index_pdf_file(file_path)
+    if profile is not None:
+        response.headers["X-Profile-Id"] = profile.profile_id
 
     return {
-        "filename": file.filename,
+        "filename": stored.path.name,
+        "sha256": stored.sha256,
         "chunks_indexed": chunks_indexed,
         "message": "PDF indexed successfully.",
     }
+
+
+@app.get("/documents", status_code=status.HTTP_200_OK)
+async def list_documents() -> dict:
+    """List the documents indexed through the API with their chunk counts."""
+    return {"documents": get_document_registry().list_sources()}
+
+
+@app.put("/documents/{source}", status_code=status.HTTP_200_OK)
+async def replace_document_endpoint(
+    source: str, file: UploadFile = File(...)
+) -> dict:
+    """Upload a new revision of a document, or index it if it is new.
+
+    - `source` is the document's stored file name (as returned by
+      `/index-pdf` and `GET /documents`)
+    - Only chunks that changed are embedded and upserted; chunks missing
+      from the new revision are deleted from the index
+    - Returns 409 if the content is identical to another document
+    """
+    try:
+        check_source_name(source)
+    except InvalidUploadError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    _check_pdf_request(file)
+
+    stored = await _store_upload(file, replace_source=source)
+    result = await run_in_threadpool(replace_stored_upload, stored)
+
+    return {
+        "source": source,
+        "sha256": stored.sha256,
+        "chunks_added": result.added,
+        "chunks_deleted": result.deleted,
+        "chunks_unchanged": result.unchanged,
+        "message": "Document replaced successfully.",
+    }
+
+
+@app.delete("/documents/{source}", status_code=status.HTTP_200_OK)
+async def delete_document_endpoint(source: str) -> dict:
+    """Remove a document's chunks from the index and delete its upload.
+
+    Returns 404 if no document is registered under `source`.
+    """
+    try:
+        chunks_deleted = await run_in_threadpool(delete_uploaded_document, source)
+    except DocumentNotFoundError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)
+        ) from exc
+
+    return {
+        "source": source,
+        "chunks_deleted": chunks_deleted,
+        "message": "Document deleted successfully.",
+    }
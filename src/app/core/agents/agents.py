@@ -4,26 +4,109 @@ This module defines three LangChain agents (Retrieval, Summarization,
 Verification) and thin node functions that LangGraph uses to invoke them.
 
 Enhancement for Feature 4 (Evidence-Aware Answers):
-The retrieval_node now extracts and stores citation information in addition
-to context, enabling downstream agents to produce cited answers.
+The retrieval_node now extracts and stores citation information,
+enabling downstream agents to produce cited answers.
+
+Multi-query retrieval:
+The multi_query_retrieval_node replaces the tool-calling Retrieval Agent with
+a single query-expansion call followed by concurrent retrieval and rank
+fusion (see `retrieval.fusion`).
+
+Pipelined verification:
+The pipelined_answer_node streams the summarization output and verifies each
+finished sentence while later sentences are still being generated.
+
+Local grounding:
+The grounding_node scores the draft's citation support locally so that the
+graph can skip the Verification Agent for well-grounded drafts; pipelined
+mode applies the same check per sentence.
+
+Chunk table:
+Retrieval nodes store a per-request chunk table (citation ID -> compact
+ChunkRecord) in `state["chunks"]`; the CONTEXT string is rendered from it
+only when a prompt is built.
+
+Map-reduce summarization:
+When the rendered context exceeds `map_reduce_threshold_tokens`, evidence
+notes are first extracted concurrently from groups of chunks and the draft
+is written from the notes (see `map_reduce.py`); verification then only sees
+the chunks the draft cites.
+
+Edit-list verification:
+With `verification_output = "edits"`, the Verification Agent returns a
+structured list of sentence edits instead of rewriting the whole answer, and
+the edits are applied locally (see `edits.py`).
+
+Prompt budgets:
+Prompts put the stable context ahead of the question and other per-call
+parts. Summarization and verification fit their chunks into per-node input
+budgets (dropping the lowest-ranked chunks first) and report their prompt
+tokens (see `llm.tokens`).
+
+Deadlines:
+Every node runs its LLM calls against `state["deadline"]`. Verification is
+skipped (`verified: False`) when too little budget is left for it, and a
+request that runs out of time before a draft exists returns its citations
+only (`status: "partial"`).
 """
 
-from typing import List
+import contextvars
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, List, Tuple
 
 from langchain.agents import create_agent
+from langchain.agents.structured_output import ProviderStrategy
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
-
+from openai import APITimeoutError
+
+from .. import metrics
+from ..config import get_settings
+from ..deadline import (
+    DeadlineExceededError,
+    call_with_deadline,
+    deadline_scope,
+    remaining,
+)
 from ..llm.factory import create_chat_model
-from ..retrieval.serialization import serialize_chunks_with_citations
+from ..llm.tokens import context_tokens, fit_chunks, prompt_tokens, record_prompt_tokens
+from ..retrieval.chunks import ChunkRecord, ChunkTable, build_chunk_table
+from ..retrieval.fusion import (
+    deduplicate_chunks,
+    multi_query_retrieve,
+    reciprocal_rank_fusion,
+)
+from ..retrieval.serialization import render_context
+from .edits import VerificationEdits, apply_edits, number_sentences
+from .grounding import check_grounding, score_sentences
+from .map_reduce import cited_chunks, group_chunks, parse_evidence_notes, render_notes
 from .prompts import (
+    EDIT_VERIFICATION_SYSTEM_PROMPT,
+    EVIDENCE_EXTRACTION_SYSTEM_PROMPT,
+    EVIDENCE_SYNTHESIS_SYSTEM_PROMPT,
+    MULTI_QUERY_SYSTEM_PROMPT,
     RETRIEVAL_SYSTEM_PROMPT,
+    SENTENCE_VERIFICATION_SYSTEM_PROMPT,
     SUMMARIZATION_SYSTEM_PROMPT,
     VERIFICATION_SYSTEM_PROMPT,
 )
+from .sentences import Sentence, SentenceStream, join_sentences, split_sentences
+from .sessions import contextualize_question
 from .state import QAState
 from .tools import retrieval_tool
 
 
+# Raised when a node's LLM call runs out of request budget.
+_DEADLINE_ERRORS = (DeadlineExceededError, APITimeoutError)
+
+
+def _has_budget(state: QAState, minimum_seconds: float) -> bool:
+    """Whether at least `minimum_seconds` remain before the request deadline."""
+    left = remaining(state.get("deadline"))
+    return left is None or left >= minimum_seconds
+
+
 def _extract_last_ai_content(messages: List[object]) -> str:
     """Extract the content of the last AIMessage in a messages list."""
     for msg in reversed(messages):
@@ -32,6 +115,49 @@ def _extract_last_ai_content(messages: List[object]) -> str:
     return ""
 
 
+def _message_text(msg: AIMessage) -> str:
+    """Return the text of a (possibly streamed) message's content."""
+    if isinstance(msg.content, str):
+        return msg.content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in msg.content
+    )
+
+
+def _parse_query_formulations(text: str, question: str, limit: int) -> List[str]:
+    """Parse one-per-line query formulations, keeping the original question first.
+
+    Bullets and numbering the model may add despite instructions are stripped,
+    and duplicate formulations (case-insensitive) are dropped.
+    """
+    queries = [question]
+    seen = {question.strip().lower()}
+
+    for line in text.splitlines():
+        query = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip().strip('"')
+        if not query or query.lower() in seen:
+            continue
+        seen.add(query.lower())
+        queries.append(query)
+
+    return queries[: limit + 1]
+
+
+def _merge_session_chunks(
+    state: QAState, new_records: List[ChunkRecord]
+) -> List[ChunkRecord]:
+    """Put chunks carried over from the session ahead of newly retrieved ones.
+
+    Only chunks that are not already carried over are added, so a follow-up
+    turn pays for incremental retrieval rather than a full re-run.
+    """
+    session_chunks = state.get("session_chunks") or []
+    if not session_chunks:
+        return new_records
+    return deduplicate_chunks([*session_chunks, *new_records])
+
+
 # Define agents at module level for reuse
 retrieval_agent = create_agent(
     model=create_chat_model(),
@@ -40,17 +166,50 @@ retrieval_agent = create_agent(
 )
 
 summarization_agent = create_agent(
-    model=create_chat_model(),
+    model=create_chat_model(hedge_node="summarization"),
     tools=[],
     system_prompt=SUMMARIZATION_SYSTEM_PROMPT,
 )
 
 verification_agent = create_agent(
-    model=create_chat_model(),
+    model=create_chat_model(hedge_node="verification"),
     tools=[],
     system_prompt=VERIFICATION_SYSTEM_PROMPT,
 )
 
+edit_verification_agent = create_agent(
+    model=create_chat_model(hedge_node="verification"),
+    tools=[],
+    system_prompt=EDIT_VERIFICATION_SYSTEM_PROMPT,
+    response_format=ProviderStrategy(VerificationEdits),
+)
+
+sentence_verification_agent = create_agent(
+    model=create_chat_model(hedge_node="verification"),
+    tools=[],
+    system_prompt=SENTENCE_VERIFICATION_SYSTEM_PROMPT,
+)
+
+evidence_extraction_agent = create_agent(
+    model=create_chat_model(),
+    tools=[],
+    system_prompt=EVIDENCE_EXTRACTION_SYSTEM_PROMPT,
+)
+
+evidence_synthesis_agent = create_agent(
+    model=create_chat_model(hedge_node="summarization"),
+    tools=[],
+    system_prompt=EVIDENCE_SYNTHESIS_SYSTEM_PROMPT,
+)
+
+query_expansion_agent = create_agent(
+    model=create_chat_model(),
+    tools=[],
+    system_prompt=MULTI_QUERY_SYSTEM_PROMPT.format(
+        count=get_settings().multi_query_count
+    ),
+)
+
 
 def retrieval_node(state: QAState) -> QAState:
     """Retrieval Agent node: gathers context from vector store.
@@ -59,42 +218,223 @@ def retrieval_node(state: QAState) -> QAState:
     This node now:
     - Sends the user's question to the Retrieval Agent.
     - The agent uses the attached retrieval tool to fetch document chunks.
-    - Extracts the tool's content AND the artifact (raw documents).
+    - Extracts the tool's artifact (compact chunk records).
     - Generates citation IDs (C1, C2, etc.) for each chunk.
-    - Stores both the context string with citations AND the citation mapping.
+    - Stores the resulting chunk table; context and citations are rendered
+      from it on demand.
+
+    When the agent calls the tool several times (different query
+    formulations), the artifacts of every call are fused by rank and
+    de-duplicated rather than keeping only the last call's results.
+
+    In a conversation session, the agent sees the previous questions and the
+    chunks carried over from the last turn are merged ahead of new results.
 
     Returns:
         Dictionary with:
-        - context: Formatted context string with citation IDs [C1], [C2], etc.
-        - citations: Dict mapping chunk IDs to metadata
-        - raw_docs: List of original Document objects
+        - chunks: Chunk table mapping citation IDs to ChunkRecords
+        - status: "partial" if the deadline passed during retrieval
     """
     question = state["question"]
-
-    result = retrieval_agent.invoke({"messages": [HumanMessage(content=question)]})
+    settings = get_settings()
+
+    search_request = contextualize_question(question, state.get("history"))
+
+    try:
+        with deadline_scope(state.get("deadline")):
+            result = call_with_deadline(
+                retrieval_agent.invoke,
+                {"messages": [HumanMessage(content=search_request)]},
+            )
+    except _DEADLINE_ERRORS:
+        # Out of time: keep whatever the session already carried over.
+        return {
+            "chunks": build_chunk_table(state.get("session_chunks") or []),
+            "status": "partial",
+        }
 
     messages = result.get("messages", [])
-    context = ""
-    raw_docs = []
-    citations = {}
 
-    # Extract both content and artifacts from ToolMessage
-    for msg in reversed(messages):
-        if isinstance(msg, ToolMessage):
-            # msg.content is the formatted context string
-            context = str(msg.content)
-            # msg.artifact contains the raw Document objects
-            if hasattr(msg, "artifact") and msg.artifact:
-                raw_docs = msg.artifact
-                # Generate citation-aware context and citation mapping
-                context, citations = serialize_chunks_with_citations(raw_docs)
-            break
+    # Collect the artifacts (ChunkRecords) of every ToolMessage
+    result_lists = [
+        msg.artifact
+        for msg in messages
+        if isinstance(msg, ToolMessage) and getattr(msg, "artifact", None)
+    ]
+    records = reciprocal_rank_fusion(result_lists, rrf_k=settings.rrf_k)
 
-    return {
-        "context": context,
-        "raw_docs": raw_docs,
-        "citations": citations,
-    }
+    return {"chunks": build_chunk_table(_merge_session_chunks(state, records))}
+
+
+def multi_query_retrieval_node(state: QAState) -> QAState:
+    """Multi-query retrieval node: one expansion call, concurrent retrieval.
+
+    This node:
+    - Asks the Query Expansion Agent for several formulations in one call.
+    - Runs `retrieve` for the original question and every formulation
+      concurrently.
+    - Fuses the ranked lists with Reciprocal Rank Fusion and de-duplicates.
+    - Assigns citation IDs (C1, C2, etc.) across the merged set.
+
+    In a conversation session, chunks carried over from the last turn are
+    kept and only the remaining slots are filled by new retrieval.
+
+    If the deadline passes during query expansion, only the original
+    question is searched.
+
+    Returns:
+        Same keys as `retrieval_node`: the chunk table in `chunks` and, on
+        timeout, `status`.
+    """
+    question = state["question"]
+    settings = get_settings()
+
+    session_chunks = state.get("session_chunks") or []
+    search_request = contextualize_question(question, state.get("history"))
+
+    with deadline_scope(state.get("deadline")):
+        try:
+            result = call_with_deadline(
+                query_expansion_agent.invoke,
+                {"messages": [HumanMessage(content=search_request)]},
+            )
+            queries = _parse_query_formulations(
+                _extract_last_ai_content(result.get("messages", [])),
+                question,
+                settings.multi_query_count,
+            )
+        except _DEADLINE_ERRORS:
+            # No time for expansion: search with the original question only.
+            queries = [question]
+
+        try:
+            new_records = call_with_deadline(
+                multi_query_retrieve,
+                queries,
+                k=settings.retrieval_k,
+                rrf_k=settings.rrf_k,
+                limit=max(
+                    settings.retrieval_k * 2 - len(session_chunks), settings.retrieval_k
+                ),
+            )
+        except DeadlineExceededError:
+            return {
+                "chunks": build_chunk_table(session_chunks),
+                "status": "partial",
+            }
+
+    return {"chunks": build_chunk_table(_merge_session_chunks(state, new_records))}
+
+
+def _user_prompt(context: str, question: str, *sections: str, label: str = "Context") -> str:
+    """User message with the stable context first, per-call parts after it.
+
+    Providers cache prompt prefixes: with the static system prompt and the
+    context ahead of the question, draft or sentence, calls sharing an agent
+    and context (e.g. the per-sentence verification calls of a request)
+    reuse the cached prefix.
+    """
+    return "\n\n".join([f"{label}:\n{context}", f"Question: {question}", *sections])
+
+
+def _extract_evidence(question: str, group: ChunkTable) -> Tuple[List[str], int]:
+    """Map step: evidence notes of one chunk group, citing only its chunks.
+
+    Returns the notes and the prompt's input tokens.
+    """
+    user_content = _user_prompt(render_context(group), question)
+    result = evidence_extraction_agent.invoke(
+        {"messages": [HumanMessage(content=user_content)]}
+    )
+    notes = parse_evidence_notes(
+        _extract_last_ai_content(result.get("messages", [])), set(group)
+    )
+    return notes, prompt_tokens(EVIDENCE_EXTRACTION_SYSTEM_PROMPT, user_content)
+
+
+def _map_evidence(question: str, groups: List[ChunkTable]) -> List[str]:
+    """Run the map step for every group concurrently; notes in group order."""
+    # One context copy per group keeps the caller's deadline and trace.
+    contexts = [contextvars.copy_context() for _ in groups]
+    workers = min(len(groups), max(get_settings().map_reduce_workers, 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(
+            executor.map(
+                lambda context, group: context.run(_extract_evidence, question, group),
+                contexts,
+                groups,
+            )
+        )
+    for _notes, tokens in results:
+        record_prompt_tokens("evidence_extraction", tokens)
+    return [note for notes, _tokens in results for note in notes]
+
+
+def _summarization_request(state: QAState) -> Tuple[Any, str]:
+    """Agent and user message that write the draft answer.
+
+    Small contexts are summarized in a single pass, keeping the
+    highest-ranked chunks that fit `summarization_max_input_tokens`. Above
+    `map_reduce_threshold_tokens`, evidence notes are extracted from groups
+    of chunks first (under the current deadline) and the Evidence Synthesis
+    Agent writes the draft from the notes, citing the original chunk IDs;
+    the lowest-ranked notes are dropped to fit the same budget.
+    """
+    settings = get_settings()
+    question = state["question"]
+    chunks = state.get("chunks") or {}
+    budget = settings.summarization_max_input_tokens
+
+    threshold = settings.map_reduce_threshold_tokens
+    if threshold and context_tokens(chunks) > threshold:
+        groups = group_chunks(chunks, settings.map_reduce_group_tokens)
+        if len(groups) > 1:
+            metrics.increment("summarization_runs_total", mode="map_reduce")
+            notes = call_with_deadline(_map_evidence, question, groups)
+            while True:
+                user_content = _user_prompt(
+                    render_notes(notes) or "NONE", question, label="Evidence notes"
+                )
+                tokens = prompt_tokens(EVIDENCE_SYNTHESIS_SYSTEM_PROMPT, user_content)
+                if not budget or tokens <= budget or len(notes) <= 1:
+                    break
+                notes = notes[:-1]
+            record_prompt_tokens("summarization", tokens)
+            return evidence_synthesis_agent, user_content
+
+    metrics.increment("summarization_runs_total", mode="single_pass")
+    reserved = prompt_tokens(SUMMARIZATION_SYSTEM_PROMPT, _user_prompt("", question))
+    context = render_context(fit_chunks(chunks, budget, reserved))
+    user_content = _user_prompt(context, question)
+    record_prompt_tokens(
+        "summarization", prompt_tokens(SUMMARIZATION_SYSTEM_PROMPT, user_content)
+    )
+    return summarization_agent, user_content
+
+
+def _verification_context(
+    chunks: ChunkTable, text: str, reserved: int = 0
+) -> str:
+    """Context for verifying `text`.
+
+    Above `map_reduce_threshold_tokens` only the chunks `text` cites are
+    included (all chunks if it cites none), so verification does not grow
+    with the retrieval set. Chunks are then fitted into
+    `verification_max_input_tokens` minus the `reserved` tokens of the rest
+    of the prompt, keeping cited chunks first.
+    """
+    settings = get_settings()
+    threshold = settings.map_reduce_threshold_tokens
+    if threshold and context_tokens(chunks) > threshold:
+        chunks = cited_chunks(chunks, text) or chunks
+    return render_context(
+        fit_chunks(
+            chunks,
+            settings.verification_max_input_tokens,
+            reserved,
+            priority=cited_chunks(chunks, text),
+        )
+    )
 
 
 def summarization_node(state: QAState) -> QAState:
@@ -105,15 +445,22 @@ def summarization_node(state: QAState) -> QAState:
     - Agent responds with a draft answer grounded only in the context.
     - Context includes citation IDs [C1], [C2], etc. for agent to cite.
     - Stores the draft answer in `state["draft_answer"]`.
+    - Large contexts are summarized map-reduce (see `_summarization_request`).
+    - Returns `status: "partial"` (no draft) when less than
+      `summarization_min_seconds` remain or the call runs out of time.
     """
-    question = state["question"]
-    context = state.get("context")
-
-    user_content = f"Question: {question}\n\nContext:\n{context}"
-
-    result = summarization_agent.invoke(
-        {"messages": [HumanMessage(content=user_content)]}
-    )
+    if not _has_budget(state, get_settings().summarization_min_seconds):
+        return {"status": "partial"}
+
+    try:
+        with deadline_scope(state.get("deadline")):
+            agent, user_content = _summarization_request(state)
+            result = call_with_deadline(
+                agent.invoke,
+                {"messages": [HumanMessage(content=user_content)]},
+            )
+    except _DEADLINE_ERRORS:
+        return {"status": "partial"}
     messages = result.get("messages", [])
     draft_answer = _extract_last_ai_content(messages)
 
@@ -122,6 +469,35 @@ def summarization_node(state: QAState) -> QAState:
     }
 
 
+def grounding_node(state: QAState) -> QAState:
+    """Local grounding check node: scores the draft against its citations.
+
+    This node:
+    - Splits the draft answer into sentences.
+    - Checks that every cited [Cn] exists in the chunk table.
+    - Scores each sentence's lexical support in the chunk(s) it cites.
+    - If every sentence reaches `grounding_threshold` (and skipping is
+      enabled), accepts the draft as the final `answer` so the graph can
+      skip the Verification Agent.
+
+    Returns:
+        Dictionary with `grounding` (per-sentence reports) and, for grounded
+        drafts, `answer` and `verified`.
+    """
+    settings = get_settings()
+    draft_answer = state.get("draft_answer") or ""
+
+    result = check_grounding(
+        draft_answer, state.get("chunks"), settings.grounding_threshold
+    )
+
+    update: QAState = {"grounding": result.sentences}
+    if result.grounded and settings.grounding_skip_verification:
+        update["answer"] = draft_answer
+        update["verified"] = True
+    return update
+
+
 def verification_node(state: QAState) -> QAState:
     """Verification Agent node: verifies and corrects the draft answer.
 
@@ -130,28 +506,226 @@ def verification_node(state: QAState) -> QAState:
     - Agent checks for hallucinations and unsupported claims.
     - Maintains citation integrity (preserves citations from draft answer).
     - Stores the final verified answer in `state["answer"]`.
+    - Returns the draft unverified (`verified: False`) when less than
+      `verification_min_seconds` remain or the call runs out of time.
+
+    With `verification_output = "edits"` the agent returns sentence edits
+    that are applied to the draft locally (see `_verify_with_edits`).
     """
-    question = state["question"]
-    context = state.get("context", "")
     draft_answer = state.get("draft_answer", "")
+    settings = get_settings()
+    if not _has_budget(state, settings.verification_min_seconds):
+        return {"answer": draft_answer, "verified": False}
 
-    user_content = f"""Question: {question}
-
-Context:
-{context}
+    if settings.verification_output == "edits":
+        return _verify_with_edits(state, draft_answer)
 
-Draft Answer:
-{draft_answer}
-
-Please verify and correct the draft answer, removing any unsupported claims.
-Maintain all citations [C1], [C2], etc. in the final answer."""
-
-    result = verification_agent.invoke(
-        {"messages": [HumanMessage(content=user_content)]}
+    question = state["question"]
+    sections = (
+        f"Draft Answer:\n{draft_answer}",
+        "Please verify and correct the draft answer, removing any unsupported claims.\n"
+        "Maintain all citations [C1], [C2], etc. in the final answer.",
     )
+    reserved = prompt_tokens(
+        VERIFICATION_SYSTEM_PROMPT, _user_prompt("", question, *sections)
+    )
+    context = _verification_context(state.get("chunks") or {}, draft_answer, reserved)
+    user_content = _user_prompt(context, question, *sections)
+    record_prompt_tokens(
+        "verification", prompt_tokens(VERIFICATION_SYSTEM_PROMPT, user_content)
+    )
+
+    try:
+        with deadline_scope(state.get("deadline")):
+            result = call_with_deadline(
+                verification_agent.invoke,
+                {"messages": [HumanMessage(content=user_content)]},
+            )
+    except _DEADLINE_ERRORS:
+        return {"answer": draft_answer, "verified": False}
     messages = result.get("messages", [])
     answer = _extract_last_ai_content(messages)
 
     return {
         "answer": answer,
+        "verified": True,
+    }
+
+
+def _verify_with_edits(state: QAState, draft_answer: str) -> QAState:
+    """Verify the draft as numbered sentences and apply the returned edits."""
+    question = state["question"]
+    sentences = split_sentences(draft_answer)
+    sections = (
+        f"Draft Answer (numbered sentences):\n{number_sentences(sentences)}",
+        "List the edits needed to remove unsupported claims.",
+    )
+    reserved = prompt_tokens(
+        EDIT_VERIFICATION_SYSTEM_PROMPT, _user_prompt("", question, *sections)
+    )
+    context = _verification_context(state.get("chunks") or {}, draft_answer, reserved)
+    user_content = _user_prompt(context, question, *sections)
+    record_prompt_tokens(
+        "verification", prompt_tokens(EDIT_VERIFICATION_SYSTEM_PROMPT, user_content)
+    )
+
+    try:
+        with deadline_scope(state.get("deadline")):
+            result = call_with_deadline(
+                edit_verification_agent.invoke,
+                {"messages": [HumanMessage(content=user_content)]},
+            )
+    except _DEADLINE_ERRORS:
+        return {"answer": draft_answer, "verified": False}
+
+    edits = result.get("structured_response")
+    if not isinstance(edits, VerificationEdits):
+        # No usable verdict: keep the draft, flagged as unverified.
+        return {"answer": draft_answer, "verified": False}
+    for edit in edits.edits:
+        metrics.increment("verification_edits_total", action=edit.action)
+    return {
+        "answer": apply_edits(sentences, edits, state.get("chunks") or {}),
+        "verified": True,
+    }
+
+
+def _verify_sentence(
+    question: str, chunks: ChunkTable, sentence: str
+) -> Tuple[str, dict]:
+    """Verify one draft sentence; returns "" when it should be deleted.
+
+    Sentences that pass the local grounding check are kept without an LLM
+    call. Returns the verified sentence and its grounding report.
+    """
+    settings = get_settings()
+    report = score_sentences([sentence], chunks, settings.grounding_threshold)
+    if report.grounded and settings.grounding_skip_verification:
+        return sentence, report.sentences[0]
+
+    section = f"Sentence:\n{sentence}"
+    reserved = prompt_tokens(
+        SENTENCE_VERIFICATION_SYSTEM_PROMPT, _user_prompt("", question, section)
+    )
+    user_content = _user_prompt(
+        _verification_context(chunks, sentence, reserved), question, section
+    )
+    record_prompt_tokens(
+        "sentence_verification",
+        prompt_tokens(SENTENCE_VERIFICATION_SYSTEM_PROMPT, user_content),
+    )
+
+    result = sentence_verification_agent.invoke(
+        {"messages": [HumanMessage(content=user_content)]}
+    )
+    verified = _extract_last_ai_content(result.get("messages", [])).strip()
+    return ("" if verified.upper() == "DELETE" else verified), report.sentences[0]
+
+
+def pipelined_answer_node(state: QAState) -> QAState:
+    """Pipelined Summarization + Verification node.
+
+    This node:
+    - Streams the Summarization Agent's draft answer token by token.
+    - Cuts the stream into sentences as soon as each one is complete.
+    - Verifies finished sentences concurrently while later ones are still
+      being generated.
+    - Reassembles the verified sentences in their original order with their
+      citations intact.
+
+    End-to-end latency approaches max(summarize, verify) plus the
+    verification of the last sentence instead of their sum.
+
+    Sentences that pass the local grounding check are kept as they are
+    without a verification call.
+
+    Large contexts go through the map step first and the synthesis of the
+    evidence notes is streamed instead (see `_summarization_request`).
+
+    Under a deadline, streaming stops when the budget runs out (the answer
+    keeps the complete sentences so far and the status is "partial"), and
+    sentences whose verification has not finished by the deadline are kept
+    unverified (`verified: False`).
+
+    Returns:
+        Dictionary with `draft_answer` (the streamed draft), `answer`
+        (the verified sentences joined back together), `grounding` and
+        `verified`, plus `status` when the draft was cut short.
+    """
+    settings = get_settings()
+    if not _has_budget(state, settings.summarization_min_seconds):
+        return {"status": "partial"}
+
+    question = state["question"]
+    chunks = state.get("chunks") or {}
+    deadline = state.get("deadline")
+
+    sentence_stream = SentenceStream()
+    draft_parts: List[str] = []
+    pending: List[Tuple[Sentence, Future]] = []
+    truncated = False
+
+    executor = ThreadPoolExecutor(max_workers=settings.pipelined_verification_workers)
+    try:
+        with deadline_scope(deadline):
+
+            def submit(sentences: List[Sentence]) -> None:
+                for sentence in sentences:
+                    # Verification threads see the same deadline.
+                    future = executor.submit(
+                        contextvars.copy_context().run,
+                        _verify_sentence,
+                        question,
+                        chunks,
+                        sentence.text,
+                    )
+                    pending.append((sentence, future))
+
+            try:
+                agent, user_content = _summarization_request(state)
+                for chunk, _metadata in agent.stream(
+                    {"messages": [HumanMessage(content=user_content)]},
+                    stream_mode="messages",
+                ):
+                    if not isinstance(chunk, AIMessage):
+                        continue
+                    delta = _message_text(chunk)
+                    draft_parts.append(delta)
+                    submit(sentence_stream.feed(delta))
+                    if not _has_budget(state, 0):
+                        truncated = True
+                        break
+            except _DEADLINE_ERRORS:
+                truncated = True
+
+            if not truncated:
+                submit(sentence_stream.close())
+
+        results = []
+        verified_all = True
+        for sentence, future in pending:
+            try:
+                text, report = future.result(timeout=remaining(deadline))
+            except (FutureTimeoutError, *_DEADLINE_ERRORS):
+                # No verdict in time: keep the sentence as drafted.
+                text, report = sentence.text, None
+                verified_all = False
+            results.append((sentence, text, report))
+    finally:
+        # Do not wait for verifications abandoned at the deadline.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    verified = [
+        Sentence(text=text, separator=sentence.separator)
+        for sentence, text, _report in results
+    ]
+
+    update: QAState = {
+        "draft_answer": "".join(draft_parts).strip(),
+        "answer": join_sentences(verified),
+        "grounding": [report for _sentence, _text, report in results if report],
+        "verified": verified_all,
     }
+    if truncated:
+        update["status"] = "partial"
+    return update
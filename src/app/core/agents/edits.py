@@ -0,0 +1,76 @@
+"""Edit-list verification: apply the Verification Agent's edits locally.
+
+With `verification_output = "edits"`, the Verification Agent sees the draft
+as numbered sentences and returns structured output listing only the
+sentences to change (delete, or replace with corrected text and
+citations). An unchanged draft is `{"edits": []}`, so output tokens no
+longer grow with the draft length. The final answer is rebuilt here from
+the draft's sentences, keeping their original separators.
+"""
+
+import re
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+
+from ..retrieval.chunks import ChunkTable
+from .sentences import Sentence, join_sentences
+
+_CITATION_PATTERN = re.compile(r"\s*\[(C\d+)\]")
+
+
+class SentenceEdit(BaseModel):
+    """One change to a numbered draft sentence."""
+
+    index: int = Field(description="Number of the draft sentence, starting at 1.")
+    action: Literal["keep", "delete", "replace"]
+    text: str | None = Field(
+        default=None,
+        description="Corrected sentence with its citations (replace only).",
+    )
+
+
+class VerificationEdits(BaseModel):
+    """Structured verdict of the Verification Agent."""
+
+    edits: List[SentenceEdit] = Field(
+        default_factory=list,
+        description="Sentences to delete or replace; empty when the draft is correct.",
+    )
+
+
+def number_sentences(sentences: List[Sentence]) -> str:
+    """Render draft sentences as "[n] sentence" lines for the agent."""
+    return "\n".join(
+        f"[{number}] {sentence.text}" for number, sentence in enumerate(sentences, start=1)
+    )
+
+
+def _drop_unknown_citations(text: str, chunks: ChunkTable) -> str:
+    text = _CITATION_PATTERN.sub(
+        lambda match: match.group(0) if match.group(1) in chunks else "", text
+    )
+    return re.sub(r"[ \t]{2,}", " ", text).strip()
+
+
+def apply_edits(
+    sentences: List[Sentence], edits: VerificationEdits, chunks: ChunkTable
+) -> str:
+    """Apply structured edits to the draft sentences and join them.
+
+    Edits with an out-of-range index are ignored; replacement citations of
+    chunks missing from `chunks` are dropped. A sentence edited more than
+    once keeps the last edit.
+    """
+    texts = [sentence.text for sentence in sentences]
+    for edit in edits.edits:
+        if not 1 <= edit.index <= len(texts):
+            continue
+        if edit.action == "delete":
+            texts[edit.index - 1] = ""
+        elif edit.action == "replace" and edit.text:
+            texts[edit.index - 1] = _drop_unknown_citations(edit.text, chunks)
+    return join_sentences(
+        Sentence(text=text, separator=sentence.separator)
+        for text, sentence in zip(texts, sentences)
+    )
@@ -1,40 +1,127 @@
 """LangGraph orchestration for the linear multi-agent QA flow."""
 
-from functools import lru_cache
-from typing import Any, Dict
+import threading
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict
 
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.constants import END, START
 from langgraph.graph import StateGraph
 
-from .agents import retrieval_node, summarization_node, verification_node
+from .. import tracing
+from ..config import get_settings
+from ..deadline import new_deadline
+from .agents import (
+    grounding_node,
+    multi_query_retrieval_node,
+    pipelined_answer_node,
+    retrieval_node,
+    summarization_node,
+    verification_node,
+)
+from .sessions import (
+    SessionRegistry,
+    carry_over_chunks,
+    create_checkpointer,
+    extend_history,
+)
 from .state import QAState
 
 
-def create_qa_graph() -> Any:
+class QARunCancelledError(Exception):
+    """The QA run was cancelled by its caller before it finished."""
+
+
+def _traced(name: str, node: Callable[[QAState], QAState]) -> Callable[[QAState], QAState]:
+    """Run a node inside a tracing span that records what it produced."""
+
+    @wraps(node)
+    def run(state: QAState) -> QAState:
+        with tracing.span(f"node.{name}") as current:
+            update = node(state)
+            if update.get("chunks") is not None:
+                current.set_attribute("chunk_ids", list(update["chunks"]))
+            for key in ("status", "verified"):
+                if key in update:
+                    current.set_attribute(key, update[key])
+            return update
+
+    return run
+
+
+def _route_after_summarization(state: QAState) -> str:
+    """End early with citations only when summarization ran out of time."""
+    return END if state.get("status") == "partial" else "grounding"
+
+
+def _route_after_grounding(state: QAState) -> str:
+    """Skip verification when the grounding node already accepted the draft."""
+    return END if state.get("answer") else "verification"
+
+
+def create_qa_graph(checkpointer: BaseCheckpointSaver | None = None) -> Any:
     """Create and compile the linear multi-agent QA graph.
 
     The graph executes in order:
-    1. Retrieval Agent: gathers context from vector store
+    1. Retrieval Agent: gathers context from vector store (or, when
+       `retrieval_mode` is "multi_query", a single query-expansion call
+       followed by concurrent retrieval and rank fusion)
     2. Summarization Agent: generates draft answer from context
-    3. Verification Agent: verifies and corrects the answer
+    3. Grounding check: scores the draft's citations locally and skips
+       verification when every sentence is well supported
+    4. Verification Agent: verifies and corrects the answer
+
+    Nodes degrade against the request deadline in the state: summarization
+    that runs out of time ends the run with citations only, and
+    verification without enough budget returns the draft unverified.
+
+    With `verification_mode` set to "pipelined", steps 2 to 4 run as a
+    single node that verifies each streamed sentence while summarization is
+    still generating the rest of the draft.
+
+    Args:
+        checkpointer: Optional checkpointer; when given, the graph persists
+            state per `thread_id` so conversation sessions can be resumed.
 
     Returns:
         Compiled graph ready for execution.
     """
+    settings = get_settings()
     builder = StateGraph(QAState)
 
     # Add nodes for each agent
-    builder.add_node("retrieval", retrieval_node)
-    builder.add_node("summarization", summarization_node)
-    builder.add_node("verification", verification_node)
-
-    # Define linear flow: START -> retrieval -> summarization -> verification -> END
+    if settings.retrieval_mode == "multi_query":
+        builder.add_node("retrieval", _traced("retrieval", multi_query_retrieval_node))
+    else:
+        builder.add_node("retrieval", _traced("retrieval", retrieval_node))
     builder.add_edge(START, "retrieval")
+
+    if settings.verification_mode == "pipelined":
+        # START -> retrieval -> pipelined summarization/verification -> END
+        builder.add_node("answer", _traced("answer", pipelined_answer_node))
+        builder.add_edge("retrieval", "answer")
+        builder.add_edge("answer", END)
+        return builder.compile(checkpointer=checkpointer)
+
+    builder.add_node("summarization", _traced("summarization", summarization_node))
+    builder.add_node("grounding", _traced("grounding", grounding_node))
+    builder.add_node("verification", _traced("verification", verification_node))
+
+    # START -> retrieval -> summarization -> [grounding -> [verification]] -> END
     builder.add_edge("retrieval", "summarization")
-    builder.add_edge("summarization", "verification")
+    builder.add_conditional_edges(
+        "summarization",
+        _route_after_summarization,
+        {"grounding": "grounding", END: END},
+    )
+    builder.add_conditional_edges(
+        "grounding",
+        _route_after_grounding,
+        {"verification": "verification", END: END},
+    )
     builder.add_edge("verification", END)
 
-    return builder.compile()
+    return builder.compile(checkpointer=checkpointer)
 
 
 @lru_cache(maxsize=1)
@@ -43,7 +130,98 @@ def get_qa_graph() -> Any:
     return create_qa_graph()
 
 
-def run_qa_flow(question: str) -> Dict[str, Any]:
+@lru_cache(maxsize=1)
+def get_session_graph() -> tuple[Any, SessionRegistry]:
+    """Get the checkpointed session graph and its session registry."""
+    settings = get_settings()
+    checkpointer = create_checkpointer()
+    registry = SessionRegistry(
+        checkpointer,
+        ttl_seconds=settings.session_ttl_seconds,
+        max_sessions=settings.session_max_sessions,
+        db_path=(
+            settings.session_db_path if settings.session_checkpointer == "sqlite" else None
+        ),
+    )
+    return create_qa_graph(checkpointer=checkpointer), registry
+
+
+def _execute(
+    graph: Any,
+    initial_state: QAState,
+    config: Dict[str, Any] | None,
+    cancel_event: threading.Event | None,
+) -> Dict[str, Any]:
+    """Run the graph, stopping between nodes once `cancel_event` is set.
+
+    Raises:
+        QARunCancelledError: `cancel_event` was set before the run finished.
+    """
+    if cancel_event is None:
+        return graph.invoke(initial_state, config=config)
+
+    final_state: Dict[str, Any] = dict(initial_state)
+    for final_state in graph.stream(initial_state, config=config, stream_mode="values"):
+        if cancel_event.is_set():
+            # Leaving the loop closes the stream, so no further node runs.
+            raise QARunCancelledError("QA run cancelled.")
+    return final_state
+
+
+def _run_session_turn(
+    question: str,
+    session_id: str,
+    cancel_event: threading.Event | None,
+    deadline: float | None,
+) -> Dict[str, Any]:
+    """Run one turn of a conversation session on a new checkpointed thread.
+
+    The previous turn's thread is only dropped once this turn has finished;
+    the carried-over keys hold everything later turns need.
+    """
+    settings = get_settings()
+    graph, registry = get_session_graph()
+
+    previous: Dict[str, Any] = {}
+    previous_thread = registry.touch(session_id)
+    if previous_thread is not None:
+        previous = dict(
+            graph.get_state({"configurable": {"thread_id": previous_thread}}).values
+        )
+
+    initial_state: QAState = {
+        "question": question,
+        "chunks": None,
+        "draft_answer": None,
+        "answer": None,
+        "history": extend_history(previous, settings.session_max_turns),
+        "session_chunks": carry_over_chunks(
+            previous, question, settings.session_max_chunks
+        ),
+        "grounding": None,
+        "deadline": deadline,
+        "verified": None,
+        "status": None,
+    }
+
+    thread_id = registry.new_thread_id(session_id)
+    try:
+        result = _execute(
+            graph, initial_state, {"configurable": {"thread_id": thread_id}}, cancel_event
+        )
+    except BaseException:
+        registry.discard_thread(thread_id)
+        raise
+    registry.commit_turn(session_id, thread_id)
+    return result
+
+
+def run_qa_flow(
+    question: str,
+    session_id: str | None = None,
+    cancel_event: threading.Event | None = None,
+    deadline: float | None = None,
+) -> Dict[str, Any]:
     """Run the complete multi-agent QA flow for a question.
 
     This is the main entry point for the QA system. It:
@@ -53,22 +231,44 @@ def run_qa_flow(question: str) -> Dict[str, Any]:
 
     Args:
         question: The user's question about the vector databases paper.
+        session_id: Optional conversation session. Follow-up questions in the
+            same session reuse still-relevant chunks from the previous turn
+            and only retrieve incrementally.
+        cancel_event: Optional event; once set (e.g. because the client
+            disconnected), the run stops before the next node starts.
+        deadline: Absolute `time.time()` by which the run must finish;
+            defaults to `qa_deadline_seconds` from now.
 
     Returns:
-        Dictionary with keys:
+        Final graph state with keys:
         - `answer`: Final verified answer
         - `draft_answer`: Initial draft answer from summarization agent
-        - `context`: Retrieved context from vector store
+        - `chunks`: Chunk table of the retrieved context (citation ID ->
+          ChunkRecord); render it with `render_context`/`render_citations`
+        - `verified` / `status`: How the run degraded under its deadline
+
+    Raises:
+        QARunCancelledError: `cancel_event` was set before the run finished.
     """
+    if deadline is None:
+        deadline = new_deadline(get_settings().qa_deadline_seconds)
+
+    if session_id:
+        return _run_session_turn(question, session_id, cancel_event, deadline)
+
     graph = get_qa_graph()
 
     initial_state: QAState = {
         "question": question,
-        "context": None,
+        "chunks": None,
         "draft_answer": None,
         "answer": None,
+        "history": None,
+        "session_chunks": None,
+        "grounding": None,
+        "deadline": deadline,
+        "verified": None,
+        "status": None,
     }
 
-    final_state = graph.invoke(initial_state)
-
-    return final_state
+    return _execute(graph, initial_state, None, cancel_event)
@@ -0,0 +1,142 @@
+"""Local, deterministic citation-grounding checks.
+
+Before paying for a Verification Agent call, the draft answer is scored
+locally against the request's chunk table (citation ID -> ChunkRecord).
+For each sentence we check that every cited `[Cn]` exists and measure how
+many of the sentence's word unigrams and bigrams appear in the cited
+chunk(s). Scoring is vectorized with NumPy: one
+binary sentence × n-gram matrix, one chunk × n-gram matrix and one
+sentence × chunk citation mask.
+
+When every sentence scores at or above the threshold, the draft is
+considered grounded and verification can be skipped.
+"""
+
+import re
+from typing import List, NamedTuple, Sequence
+
+import numpy as np
+
+from ..retrieval.chunks import ChunkTable
+from .sentences import split_sentences
+
+_CITATION_PATTERN = re.compile(r"\[(C\d+)\]")
+_WORD_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+# Function words carry no evidence; leaving them in inflates every score.
+_STOPWORDS = frozenset(
+    """a an and are as at be been but by can for from has have in into is it
+    its may of on or such that the their them these they this those to was
+    were which while with""".split()
+)
+
+
+class GroundingResult(NamedTuple):
+    """Outcome of a local grounding check.
+
+    Attributes:
+        grounded: True if every sentence reached the threshold.
+        sentences: Per-sentence reports with `sentence`, `citations`,
+            `missing_citations`, `score` and `grounded` keys.
+    """
+
+    grounded: bool
+    sentences: List[dict]
+
+
+def _ngrams(text: str) -> set:
+    """Unigrams and bigrams of content words (citation markers removed)."""
+    words = [
+        word
+        for word in _WORD_PATTERN.findall(_CITATION_PATTERN.sub(" ", text).lower())
+        if word not in _STOPWORDS
+    ]
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def score_sentences(
+    sentences: Sequence[str],
+    chunks: ChunkTable,
+    threshold: float,
+) -> GroundingResult:
+    """Score how well each sentence is supported by the chunks it cites.
+
+    A sentence's score is the fraction of its n-grams found in the union of
+    its cited chunks. Sentences citing unknown chunk IDs score 0; sentences
+    with no content words (e.g. "In summary:") score 1.
+
+    Args:
+        sentences: Sentences with inline `[Cn]` citations.
+        chunks: Chunk table of the request.
+        threshold: Minimum score for a sentence to count as grounded.
+
+    Returns:
+        GroundingResult with the overall verdict and per-sentence reports.
+    """
+    chunk_ids = list(chunks)
+    chunk_index = {chunk_id: idx for idx, chunk_id in enumerate(chunk_ids)}
+    sentence_ngrams = [_ngrams(sentence) for sentence in sentences]
+    sentence_citations = [_CITATION_PATTERN.findall(sentence) for sentence in sentences]
+
+    vocabulary = sorted(set().union(*sentence_ngrams)) if sentences else []
+    column = {ngram: idx for idx, ngram in enumerate(vocabulary)}
+
+    # Binary matrices: sentence x n-gram, chunk x n-gram, sentence x chunk.
+    sentence_matrix = np.zeros((len(sentences), len(vocabulary)), dtype=bool)
+    for row, ngrams in enumerate(sentence_ngrams):
+        sentence_matrix[row, [column[ngram] for ngram in ngrams]] = True
+
+    chunk_matrix = np.zeros((len(chunk_ids), len(vocabulary)), dtype=bool)
+    for row, chunk_id in enumerate(chunk_ids):
+        chunk_ngrams = _ngrams(chunks[chunk_id].text)
+        chunk_matrix[row, [column[n] for n in chunk_ngrams if n in column]] = True
+
+    citation_mask = np.zeros((len(sentences), len(chunk_ids)), dtype=bool)
+    for row, cited in enumerate(sentence_citations):
+        citation_mask[row, [chunk_index[c] for c in cited if c in chunk_index]] = True
+
+    # N-grams available to each sentence from the union of its cited chunks.
+    supported = (citation_mask.astype(np.int32) @ chunk_matrix.astype(np.int32)) > 0
+    totals = sentence_matrix.sum(axis=1)
+    hits = (sentence_matrix & supported).sum(axis=1)
+    scores = np.where(totals > 0, hits / np.maximum(totals, 1), 1.0)
+
+    reports = []
+    for row, sentence in enumerate(sentences):
+        missing = [c for c in sentence_citations[row] if c not in chunk_index]
+        score = 0.0 if missing else float(scores[row])
+        reports.append(
+            {
+                "sentence": sentence,
+                "citations": sentence_citations[row],
+                "missing_citations": missing,
+                "score": round(score, 3),
+                "grounded": score >= threshold,
+            }
+        )
+
+    return GroundingResult(
+        grounded=all(report["grounded"] for report in reports),
+        sentences=reports,
+    )
+
+
+def check_grounding(
+    answer: str,
+    chunks: ChunkTable | None,
+    threshold: float,
+) -> GroundingResult:
+    """Split an answer into sentences and score their citation grounding.
+
+    Args:
+        answer: Draft answer with inline citations.
+        chunks: Chunk table of the request.
+        threshold: Minimum score for a sentence to count as grounded.
+
+    Returns:
+        GroundingResult; an empty answer is never considered grounded.
+    """
+    sentences = [sentence.text for sentence in split_sentences(answer or "")]
+    if not sentences:
+        return GroundingResult(grounded=False, sentences=[])
+    return score_sentences(sentences, chunks or {}, threshold)
@@ -0,0 +1,74 @@
+"""Helpers for map-reduce summarization of large chunk tables.
+
+When the rendered context exceeds `map_reduce_threshold_tokens`, the chunk
+table is split into groups of at most `map_reduce_group_tokens` (in rank
+order, keeping each chunk whole). Every group is rendered with the chunks'
+original citation IDs and sent to an evidence-extraction call; the calls run
+concurrently. Each returns evidence notes, one per line, citing the chunks
+they come from. Notes citing chunks outside their group are stripped of
+those citations (and dropped if none is left), so the reduce call, which
+writes the answer from the notes alone, can only cite chunks of the table.
+"""
+
+import re
+from typing import List
+
+from ..llm.tokens import chunk_tokens
+from ..retrieval.chunks import ChunkTable
+
+_CITATION_PATTERN = re.compile(r"\[(C\d+)\]")
+_BULLET_PATTERN = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+
+def group_chunks(chunks: ChunkTable, max_tokens: int) -> List[ChunkTable]:
+    """Split a chunk table into consecutive groups of at most `max_tokens`.
+
+    A chunk larger than `max_tokens` forms a group of its own.
+    """
+    groups: List[ChunkTable] = []
+    current: ChunkTable = {}
+    current_tokens = 0
+    for chunk_id, record in chunks.items():
+        tokens = chunk_tokens(chunk_id, record)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = {}, 0
+        current[chunk_id] = record
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def parse_evidence_notes(text: str, chunk_ids: set) -> List[str]:
+    """Parse one-per-line evidence notes, keeping only valid citations.
+
+    Args:
+        text: Output of an evidence-extraction call.
+        chunk_ids: Citation IDs of the group the call was given.
+
+    Returns:
+        Notes citing at least one chunk of the group, with citations of
+        other chunks removed.
+    """
+    notes = []
+    for line in text.splitlines():
+        note = _BULLET_PATTERN.sub("", line).strip()
+        cited = set(_CITATION_PATTERN.findall(note))
+        if not cited & chunk_ids:
+            continue
+        for chunk_id in cited - chunk_ids:
+            note = note.replace(f"[{chunk_id}]", "")
+        notes.append(re.sub(r"\s{2,}", " ", note).strip())
+    return notes
+
+
+def render_notes(notes: List[str]) -> str:
+    """Render evidence notes as the bullet list given to the reduce call."""
+    return "\n".join(f"- {note}" for note in notes)
+
+
+def cited_chunks(chunks: ChunkTable, text: str) -> ChunkTable:
+    """The chunks of `chunks` cited in `text`, in table order."""
+    cited = set(_CITATION_PATTERN.findall(text))
+    return {chunk_id: record for chunk_id, record in chunks.items() if chunk_id in cited}
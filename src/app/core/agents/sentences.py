@@ -0,0 +1,125 @@
+"""Sentence segmentation for cited answers.
+
+Answers produced by the agents cite chunks inline ("Statement [C1]." or
+"Statement. [C1]"). These helpers cut such text into sentences while keeping
+each sentence's citations attached to it and remembering the whitespace that
+followed it, so a list of (possibly rewritten) sentences can be joined back
+into text with the original layout.
+"""
+
+import re
+from typing import Iterable, List, NamedTuple
+
+# End of a sentence: terminal punctuation or a line break, optionally followed
+# by citation markers, then whitespace. The next sentence must start with a
+# non-space character that is not a citation marker; citations after the
+# punctuation belong to the sentence before it.
+_SENTENCE_END = re.compile(
+    r"(?:[.!?]|(?=\n))"  # terminal punctuation or line break
+    r"(?:[ \t]*\[C\d+\])*"  # trailing citation markers
+    r"\s+"  # separator
+    r"(?=[^\s\[]|\[(?:[^C]|C\D))"  # start of the next sentence
+)
+
+# Abbreviations whose period does not end a sentence (compared lowercased,
+# without the period).
+_ABBREVIATIONS = frozenset(
+    {
+        "al", "approx", "cf", "ch", "corp", "dept", "dr", "e.g", "eq", "eqs",
+        "fig", "figs", "i.e", "jr", "mr", "mrs", "prof", "ref", "refs", "sec",
+        "sect", "sr", "st", "tab", "vol", "vs",
+    }
+)
+# Dotted abbreviations and initialisms such as "e.g", "U.S" or "Ph.D".
+_DOTTED_ABBREVIATION = re.compile(r"(?:[A-Za-z]{1,2}\.)+[A-Za-z]{1,2}")
+# Opening punctuation stripped from the word before a period.
+_LEADING_PUNCTUATION = "([{\"'"
+
+
+class Sentence(NamedTuple):
+    """A sentence and the whitespace that followed it in the source text."""
+
+    text: str
+    separator: str
+
+
+def _is_sentence_end(text: str, match: re.Match) -> bool:
+    """Whether a `_SENTENCE_END` match in `text` really ends a sentence.
+
+    A bare period (no citation markers after it) does not end a sentence
+    when it closes an abbreviation ("e.g.", "Fig.", "Mr.") or an initial
+    ("J."), or when the next word starts with a lowercase letter or a digit.
+    """
+    if text[match.start()] != "." or "[" in match.group(0):
+        return True
+    following = text[match.end()]
+    if following.islower() or following.isdigit():
+        return False
+    words = text[: match.start()].split()
+    word = words[-1].lstrip(_LEADING_PUNCTUATION) if words else ""
+    if len(word) == 1 and word.isalpha():
+        return False
+    return not (
+        word.lower() in _ABBREVIATIONS or _DOTTED_ABBREVIATION.fullmatch(word)
+    )
+
+
+def _to_sentence(piece: str) -> Sentence:
+    """Split a raw piece of text into its sentence and trailing whitespace."""
+    text = piece.rstrip()
+    return Sentence(text=text.strip(), separator=piece[len(text):])
+
+
+def split_sentences(text: str) -> List[Sentence]:
+    """Split cited answer text into sentences.
+
+    Args:
+        text: Answer text with inline citations.
+
+    Returns:
+        Sentences in order; empty pieces are dropped.
+    """
+    stream = SentenceStream()
+    return [*stream.feed(text), *stream.close()]
+
+
+def join_sentences(sentences: Iterable[Sentence]) -> str:
+    """Join sentences back into text using their original separators."""
+    return "".join(
+        sentence.text + sentence.separator for sentence in sentences if sentence.text
+    ).strip()
+
+
+class SentenceStream:
+    """Incrementally cut streamed text into complete sentences.
+
+    A sentence is only emitted once the start of the following sentence has
+    been seen, so trailing citation markers are never split off and a period
+    after an abbreviation can be told apart from a sentence end.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[Sentence]:
+        """Add streamed text and return the sentences completed by it."""
+        self._buffer += delta
+
+        sentences = []
+        position = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            if not _is_sentence_end(self._buffer, match):
+                continue
+            sentence = _to_sentence(self._buffer[position : match.end()])
+            position = match.end()
+            if sentence.text:
+                sentences.append(sentence)
+
+        self._buffer = self._buffer[position:]
+        return sentences
+
+    def close(self) -> List[Sentence]:
+        """Return the final, unterminated sentence (if any)."""
+        sentence = _to_sentence(self._buffer)
+        self._buffer = ""
+        return [sentence] if sentence.text else []
@@ -0,0 +1,270 @@
+"""Conversation sessions for follow-up questions.
+
+A session is a LangGraph thread: the session graph is compiled with a
+checkpointer and every `/qa` call carrying the same `session_id` runs on the
+same thread. Before a turn runs, the previous turn's state is read back from
+the checkpointer so that still-relevant chunks and a bounded question/answer
+history can be carried into the new turn.
+
+Each turn runs on a fresh thread; once it has finished, the session points
+at the new thread and the previous turn's thread is deleted, so a failed turn
+leaves the conversation as it was.
+
+Sessions are bounded in three ways:
+- Only the thread of the latest turn is kept; older turns survive only
+  through the bounded `history` and `session_chunks` state keys.
+- Idle sessions expire after `session_ttl_seconds`.
+- At most `session_max_sessions` sessions are kept (least recently used
+  sessions are evicted first).
+"""
+
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from ..config import get_settings
+from ..retrieval.chunks import ChunkRecord
+
+_CITATION_PATTERN = re.compile(r"\[(C\d+)\]")
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def create_checkpointer() -> BaseCheckpointSaver:
+    """Create the checkpointer configured by `session_checkpointer`.
+
+    "memory" keeps sessions in process; "sqlite" persists them to
+    `session_db_path` and requires the optional `langgraph-checkpoint-sqlite`
+    package. Checkpoint deserialization is restricted to LangGraph's safe
+    types plus ChunkRecord.
+    """
+    settings = get_settings()
+    serde = JsonPlusSerializer(
+        allowed_msgpack_modules=[(ChunkRecord.__module__, ChunkRecord.__name__)]
+    )
+
+    if settings.session_checkpointer == "sqlite":
+        try:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "SESSION_CHECKPOINTER=sqlite requires the "
+                "`langgraph-checkpoint-sqlite` package."
+            ) from exc
+
+        db_path = Path(settings.session_db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        return SqliteSaver(
+            sqlite3.connect(str(db_path), check_same_thread=False), serde=serde
+        )
+
+    return InMemorySaver(serde=serde)
+
+
+class SessionRegistry:
+    """Track session activity and evict expired or excess sessions.
+
+    The registry maps each session to the thread holding its latest turn
+    and stores its last-access time; the session state itself lives in the
+    checkpointer, whose threads are deleted on eviction. With the sqlite
+    checkpointer the registry is a table in the same database, so the
+    bounds keep applying across restarts; threads found in the checkpointer
+    without a registry entry (e.g. orphaned by a crash) are adopted on
+    startup and expire like any other session.
+    """
+
+    def __init__(
+        self,
+        checkpointer: BaseCheckpointSaver,
+        ttl_seconds: float,
+        max_sessions: int,
+        db_path: str | Path | None = None,
+    ) -> None:
+        self._checkpointer = checkpointer
+        self._ttl_seconds = ttl_seconds
+        self._max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(db_path) if db_path else ":memory:",
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_registry (session_id TEXT PRIMARY KEY,"
+            " thread_id TEXT NOT NULL, last_seen REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS session_registry_last_seen"
+            " ON session_registry (last_seen)"
+        )
+        with self._lock:
+            self._adopt_untracked_threads()
+            self._evict(time.time())
+
+    def touch(self, session_id: str) -> str | None:
+        """Mark a session as active and evict expired or excess sessions.
+
+        Returns:
+            The thread holding the session's previous turn if the session
+            was still alive (a follow-up turn), None if it is new or had
+            expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT thread_id, last_seen FROM session_registry WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            thread_id = None
+            if row is not None:
+                if now - row[1] <= self._ttl_seconds:
+                    thread_id = row[0]
+                    self._conn.execute(
+                        "UPDATE session_registry SET last_seen = ? WHERE session_id = ?",
+                        (now, session_id),
+                    )
+                else:
+                    self._drop(session_id, row[0])
+            self._evict(now)
+        return thread_id
+
+    @staticmethod
+    def new_thread_id(session_id: str) -> str:
+        """A fresh thread for the next turn of a session."""
+        return f"{session_id}#{uuid.uuid4().hex[:12]}"
+
+    def commit_turn(self, session_id: str, thread_id: str) -> None:
+        """Make `thread_id` the session's thread and drop the previous one.
+
+        Called only after the turn on `thread_id` finished, so a failed turn
+        leaves the previous turn in place.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT thread_id FROM session_registry WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            self._conn.execute(
+                "INSERT INTO session_registry (session_id, thread_id, last_seen)"
+                " VALUES (?, ?, ?) ON CONFLICT(session_id) DO UPDATE SET"
+                " thread_id = excluded.thread_id, last_seen = excluded.last_seen",
+                (session_id, thread_id, now),
+            )
+            if row is not None and row[0] != thread_id:
+                self._checkpointer.delete_thread(row[0])
+            self._evict(now)
+
+    def discard_thread(self, thread_id: str) -> None:
+        """Drop the checkpoints of a turn that did not finish."""
+        self._checkpointer.delete_thread(thread_id)
+
+    def _drop(self, session_id: str, thread_id: str) -> None:
+        self._conn.execute("DELETE FROM session_registry WHERE session_id = ?", (session_id,))
+        self._checkpointer.delete_thread(thread_id)
+
+    def _adopt_untracked_threads(self) -> None:
+        """Register checkpointer threads the registry does not know about."""
+        tracked = {
+            row[0] for row in self._conn.execute("SELECT thread_id FROM session_registry")
+        }
+        threads = {
+            checkpoint.config["configurable"]["thread_id"]
+            for checkpoint in self._checkpointer.list(None)
+        }
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO session_registry (session_id, thread_id, last_seen)"
+            " VALUES (?, ?, ?)",
+            [(thread_id, thread_id, now) for thread_id in threads - tracked],
+        )
+
+    def _evict(self, now: float) -> None:
+        """Evict expired sessions and the least recently used overflow."""
+        expired = self._conn.execute(
+            "SELECT session_id, thread_id FROM session_registry WHERE last_seen < ?",
+            (now - self._ttl_seconds,),
+        ).fetchall()
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM session_registry").fetchone()
+        overflow = count - len(expired) - self._max_sessions
+        if overflow > 0:
+            expired += self._conn.execute(
+                "SELECT session_id, thread_id FROM session_registry WHERE last_seen >= ?"
+                " ORDER BY last_seen LIMIT ?",
+                (now - self._ttl_seconds, overflow),
+            ).fetchall()
+        for session_id, thread_id in expired:
+            self._drop(session_id, thread_id)
+
+
+def _terms(text: str) -> set:
+    """Lower-cased word set used for lexical relevance checks."""
+    return {word for word in _WORD_PATTERN.findall(text.lower()) if len(word) > 2}
+
+
+def carry_over_chunks(
+    previous: Dict[str, Any], question: str, limit: int
+) -> List[ChunkRecord]:
+    """Select chunks from the previous turn that are still relevant.
+
+    Chunks cited by the previous answer are kept first (a follow-up usually
+    refers to what was just said), followed by uncited chunks that share
+    terms with the new question.
+
+    Args:
+        previous: State values of the session's previous turn.
+        question: The follow-up question.
+        limit: Maximum number of chunks to carry over.
+
+    Returns:
+        Still-relevant chunks, most relevant first.
+    """
+    chunks = previous.get("chunks") or {}
+    if not chunks or limit <= 0:
+        return []
+
+    cited_ids = set(_CITATION_PATTERN.findall(previous.get("answer") or ""))
+    question_terms = _terms(question)
+
+    cited: List[ChunkRecord] = []
+    related: List[ChunkRecord] = []
+    for chunk_id, record in chunks.items():
+        if chunk_id in cited_ids:
+            cited.append(record)
+        elif question_terms & _terms(record.text):
+            related.append(record)
+
+    return (cited + related)[:limit]
+
+
+def extend_history(previous: Dict[str, Any], max_turns: int) -> List[Dict[str, str]]:
+    """Append the previous turn to the session history, keeping `max_turns`."""
+    history = list(previous.get("history") or [])
+    if previous.get("question"):
+        history.append(
+            {
+                "question": previous["question"],
+                "answer": previous.get("answer") or "",
+            }
+        )
+    return history[-max_turns:] if max_turns > 0 else []
+
+
+def contextualize_question(question: str, history: List[Dict[str, str]] | None) -> str:
+    """Prefix a follow-up question with the previous questions of the session.
+
+    Retrieval for a follow-up such as "and how does it compare to IVF?" needs
+    the earlier questions to form a standalone search.
+    """
+    if not history:
+        return question
+
+    previous = "\n".join(f"- {turn['question']}" for turn in history)
+    return f"Previous questions in this conversation:\n{previous}\n\nFollow-up question: {question}"
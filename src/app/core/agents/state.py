@@ -2,23 +2,44 @@
 
 from typing import TypedDict
 
+from ..retrieval.chunks import ChunkRecord, ChunkTable
+
 
 class QAState(TypedDict):
     """State schema for the linear multi-agent QA flow.
 
     The state flows through three agents:
-    1. Retrieval Agent: populates `context` from `question`
-    2. Summarization Agent: generates `draft_answer` from `question` + `context`
-    3. Verification Agent: produces final `answer` from `question` + `context` + `draft_answer`
-    
-    Enhancement (Feature 4: Citations):
-    - `citations`: Mapping of chunk IDs (C1, C2, etc.) to metadata
-    - `raw_docs`: Original Document objects for citation extraction
+    1. Retrieval Agent: populates `chunks` from `question`
+    2. Summarization Agent: generates `draft_answer` from `question` + context
+    3. Verification Agent: produces final `answer` from `question` + context + `draft_answer`
+
+    Chunk table (Feature 4: Citations):
+    - `chunks`: Ordered mapping of citation IDs (C1, C2, etc.) to compact
+      ChunkRecords. The CONTEXT string and the citation map are rendered
+      from it on demand rather than stored in the state.
+
+    Conversation sessions:
+    - `history`: Previous question/answer turns of the session (bounded)
+    - `session_chunks`: Still-relevant chunks carried over from the previous turn
+
+    Local grounding check:
+    - `grounding`: Per-sentence citation support scores of the draft answer
+
+    Deadlines:
+    - `deadline`: Absolute time (`time.time()`) by which the request must finish
+    - `verified`: False when the answer was returned without (complete)
+      verification because the deadline was near
+    - `status`: "partial" when the deadline passed before a full answer was
+      drafted; None otherwise
     """
 
     question: str
-    context: str | None
+    chunks: ChunkTable | None
     draft_answer: str | None
     answer: str | None
-    citations: dict[str, dict] | None
-    raw_docs: list | None
+    history: list[dict] | None
+    session_chunks: list[ChunkRecord] | None
+    grounding: list[dict] | None
+    deadline: float | None
+    verified: bool | None
+    status: str | None
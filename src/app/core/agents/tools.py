@@ -2,11 +2,10 @@
 
 from langchain_core.tools import tool
 
+from .. import tracing
+from ..retrieval.chunks import build_chunk_table, to_records
+from ..retrieval.serialization import render_context
 from ..retrieval.vector_store import retrieve
-from ..retrieval.serialization import (
-    serialize_chunks,
-    serialize_chunks_with_citations,
-)
 
 
 @tool(response_format="content_and_artifact")
@@ -23,17 +22,15 @@ def retrieval_tool(query: str):
     Returns:
         Tuple of (serialized_content, artifact) where:
         - serialized_content: A formatted string containing the retrieved chunks
-          with metadata. Format: "Chunk 1 (page=X): ...\n\nChunk 2 (page=Y): ..."
-        - artifact: List of Document objects with full metadata for reference
+          with metadata. Format: "[C1] Chunk from page X:\n...\n\n[C2] ..."
+        - artifact: List of compact ChunkRecord objects; retrieval_node builds
+          the request's chunk table from them without re-serializing
     """
-    # Retrieve documents from vector store
-    docs = retrieve(query, k=4)
+    # Retrieve documents from vector store and convert them once
+    with tracing.span("tool.retrieval_tool", query=query, k=4) as current:
+        records = to_records(retrieve(query, k=4))
+        current.set_attribute("results", len(records))
 
-    # Serialize chunks with citations for Feature 4
-    # Returns: (context_string_with_IDs, citation_map_dict)
-    context, citations = serialize_chunks_with_citations(docs)
-
-    # Return tuple: (serialized content with citations, artifact documents)
+    # Return tuple: (content for the agent, artifact records)
     # This follows LangChain's content_and_artifact response format
-    # artifacts (docs) are used by agents.py to extract citations
-    return context, docs
+    return render_context(build_chunk_table(records)), records
@@ -0,0 +1,366 @@
+"""Cache backends shared by the retrieval and LLM layers.
+
+`get_cache()` returns the backend selected by `cache_backend`:
+
+- "none" (default): caching is disabled.
+- "memory": a per-process LRU. Each uvicorn worker has its own copy.
+- "sqlite": a SQLite database in WAL mode at `cache_path`, shared by all
+  worker processes on the host (readers never block the single writer).
+
+Entries expire after their TTL and the least recently used entries are
+evicted beyond `cache_max_entries`. Entries stored with `corpus_bound=True`
+(e.g. retrieval results) are tagged with the corpus version; indexing calls
+`bump_corpus_version()`, which invalidates all of them at once, in every
+worker for the SQLite backend. Entries can also carry tags (e.g. the
+sources of retrieved chunks) and be dropped with `invalidate_tag`.
+
+Values are pickled, so only cache data this service produced itself.
+Process-local objects such as the vector store client or the compiled graph
+stay per-process singletons.
+"""
+
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Tuple
+
+from . import metrics
+from .config import get_settings
+
+
+def make_key(namespace: str, *parts: Any) -> str:
+    """Stable cache key for `parts` (hashed, so any length is fine)."""
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class CacheBackend(ABC):
+    """Key-value cache with TTL, bounded size and corpus-version tagging."""
+
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        """Cached value for `key`, or None on a miss."""
+
+    @abstractmethod
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float | None = None,
+        corpus_bound: bool = False,
+        tags: Iterable[str] = (),
+    ) -> None:
+        """Store `value` for `ttl` seconds (forever if None).
+
+        `corpus_bound` entries become invalid when the corpus version changes;
+        tagged entries are removed by `invalidate_tag`.
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove `key` if present."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+    @abstractmethod
+    def invalidate_tag(self, tag: str) -> None:
+        """Remove every entry stored with `tag`."""
+
+    @abstractmethod
+    def corpus_version(self) -> int:
+        """Current corpus version."""
+
+    @abstractmethod
+    def bump_corpus_version(self) -> int:
+        """Invalidate corpus-bound entries; returns the new version."""
+
+
+class NullCache(CacheBackend):
+    """Backend used when caching is disabled."""
+
+    def get(self, key: str) -> Any | None:
+        return None
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float | None = None,
+        corpus_bound: bool = False,
+        tags: Iterable[str] = (),
+    ) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def invalidate_tag(self, tag: str) -> None:
+        pass
+
+    def corpus_version(self) -> int:
+        return 0
+
+    def bump_corpus_version(self) -> int:
+        return 0
+
+
+class MemoryCache(CacheBackend):
+    """Thread-safe in-process LRU cache."""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max(max_entries, 1)
+        # key -> (value, expires_at, corpus version or None, tags)
+        self._entries: "OrderedDict[str, Tuple[Any, float | None, int | None, frozenset]]" = (
+            OrderedDict()
+        )
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, version, _ = entry
+            if (expires_at is not None and expires_at <= time.time()) or (
+                version is not None and version != self._version
+            ):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float | None = None,
+        corpus_bound: bool = False,
+        tags: Iterable[str] = (),
+    ) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            version = self._version if corpus_bound else None
+            self._entries[key] = (value, expires_at, version, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate_tag(self, tag: str) -> None:
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if tag in entry[3]]:
+                del self._entries[key]
+
+    def corpus_version(self) -> int:
+        return self._version
+
+    def bump_corpus_version(self) -> int:
+        with self._lock:
+            self._version += 1
+            # Corpus-bound entries can never be hit again; drop them now.
+            stale = [key for key, entry in self._entries.items() if entry[2] is not None]
+            for key in stale:
+                del self._entries[key]
+            return self._version
+
+
+class SqliteCache(CacheBackend):
+    """Cache in a WAL-mode SQLite file, shared by the processes on a host.
+
+    Each thread uses its own connection. Eviction runs every
+    `_EVICT_EVERY` writes and trims the table back to `max_entries` by last
+    access time. A hit only updates the access time when it is older than
+    `_TOUCH_INTERVAL` seconds, so hot entries do not turn every read into a
+    write; LRU order is approximate at that granularity.
+    """
+
+    _EVICT_EVERY = 64
+    _TOUCH_INTERVAL = 60.0
+
+    def __init__(self, path: str | Path, max_entries: int) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_entries = max(max_entries, 1)
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL,"
+                " corpus_version INTEGER, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_entries_accessed"
+                " ON cache_entries (accessed_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT NOT NULL, key TEXT NOT NULL,"
+                " PRIMARY KEY (tag, key))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value INTEGER)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO cache_meta (name, value) VALUES ('corpus_version', 0)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any | None:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT e.value, e.expires_at, e.corpus_version, e.accessed_at, m.value"
+            " FROM cache_entries e, cache_meta m"
+            " WHERE e.key = ? AND m.name = 'corpus_version'",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, version, accessed_at, current_version = row
+        now = time.time()
+        if (expires_at is not None and expires_at <= now) or (
+            version is not None and version != current_version
+        ):
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return None
+        if now - accessed_at >= self._TOUCH_INTERVAL:
+            conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return pickle.loads(value)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float | None = None,
+        corpus_bound: bool = False,
+        tags: Iterable[str] = (),
+    ) -> None:
+        now = time.time()
+        conn = self._connect()
+        version = self.corpus_version() if corpus_bound else None
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries"
+            " (key, value, expires_at, corpus_version, accessed_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (
+                key,
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                now + ttl if ttl is not None else None,
+                version,
+                now,
+            ),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)",
+            [(tag, key) for tag in tags],
+        )
+        with self._writes_lock:
+            self._writes += 1
+            evict = self._writes % self._EVICT_EVERY == 0
+        if evict:
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop expired and stale entries, then the least recently used."""
+        conn.execute(
+            "DELETE FROM cache_entries WHERE expires_at <= ? OR corpus_version <"
+            " (SELECT value FROM cache_meta WHERE name = 'corpus_version')",
+            (time.time(),),
+        )
+        conn.execute(
+            "DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_entries"
+            " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self._max_entries,),
+        )
+        conn.execute(
+            "DELETE FROM cache_tags WHERE key NOT IN (SELECT key FROM cache_entries)"
+        )
+
+    def delete(self, key: str) -> None:
+        self._connect().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        conn = self._connect()
+        conn.execute("DELETE FROM cache_entries")
+        conn.execute("DELETE FROM cache_tags")
+
+    def invalidate_tag(self, tag: str) -> None:
+        conn = self._connect()
+        conn.execute(
+            "DELETE FROM cache_entries WHERE key IN"
+            " (SELECT key FROM cache_tags WHERE tag = ?)",
+            (tag,),
+        )
+        conn.execute("DELETE FROM cache_tags WHERE tag = ?", (tag,))
+
+    def corpus_version(self) -> int:
+        row = self._connect().execute(
+            "SELECT value FROM cache_meta WHERE name = 'corpus_version'"
+        ).fetchone()
+        return row[0]
+
+    def bump_corpus_version(self) -> int:
+        conn = self._connect()
+        conn.execute(
+            "UPDATE cache_meta SET value = value + 1 WHERE name = 'corpus_version'"
+        )
+        conn.execute("DELETE FROM cache_entries WHERE corpus_version IS NOT NULL")
+        return self.corpus_version()
+
+
+BACKENDS = ("none", "memory", "sqlite")
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> CacheBackend:
+    """Get the process-wide cache backend selected by `cache_backend`."""
+    settings = get_settings()
+    backend = settings.cache_backend
+    if backend == "memory":
+        return MemoryCache(settings.cache_max_entries)
+    if backend == "sqlite":
+        return SqliteCache(settings.cache_path, settings.cache_max_entries)
+    if backend == "none":
+        return NullCache()
+    raise ValueError(
+        f"Unknown cache_backend {backend!r}; expected one of {', '.join(BACKENDS)}."
+    )
+
+
+def cached_lookup(namespace: str, key: str) -> Any | None:
+    """`get_cache().get(key)`, counted in `cache_requests_total`."""
+    cache = get_cache()
+    if isinstance(cache, NullCache):
+        return None
+    value = cache.get(key)
+    metrics.increment(
+        "cache_requests_total", namespace=namespace, result="miss" if value is None else "hit"
+    )
+    return value
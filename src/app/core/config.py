@@ -14,6 +14,33 @@ class Settings(BaseSettings):
     openai_api_key: str
     openai_model_name: str = "gpt-4o-mini"
     openai_embedding_model_name: str = "text-embedding-3-large"
+    # Reduced output dimensions for text-embedding-3 models (None = native).
+    # Must match the dimension of the index being queried.
+    openai_embedding_dimensions: int | None = None
+    # Account quota shared by all agents / all embedding calls in the
+    # process (0 disables pacing). QA calls are served before indexing.
+    openai_rpm_limit: int = 500
+    openai_tpm_limit: int = 200_000
+    openai_embedding_rpm_limit: int = 3_000
+    openai_embedding_tpm_limit: int = 1_000_000
+
+    # Embedding Provider
+    # "openai", "hashing" (deterministic and offline, for tests) or
+    # "sentence-transformers" (local CPU model `local_embedding_model`, needs
+    # the optional package). Indexes record which provider built them.
+    embedding_provider: str = "openai"
+    local_embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    local_embedding_dimensions: int = 384
+    local_embedding_batch_size: int = 32
+    local_embedding_workers: int = 2
+
+    # Vector Store Configuration
+    # "pinecone" uses the hosted index; "local" uses a memory-mapped store
+    # under `local_vector_store_path` with optional int8/binary quantization.
+    vector_store_backend: str = "pinecone"
+    local_vector_store_path: str = "data/vector_store"
+    vector_quantization: str = "none"
+    quantization_rescore_factor: int = 4
 
     # Pinecone Configuration
     pinecone_api_key: str
@@ -21,6 +48,151 @@ class Settings(BaseSettings):
 
     # Retrieval Configuration
     retrieval_k: int = 4
+    # "agent" lets the Retrieval Agent drive tool calls; "multi_query"
+    # generates several formulations in one call and retrieves concurrently.
+    retrieval_mode: str = "agent"
+    multi_query_count: int = 3
+    rrf_k: int = 60
+    # "flat" embeds 500-character chunks; "parent_child" embeds small child
+    # chunks and answers with their page-bounded parent windows, searching
+    # `parent_child_fanout` children per requested parent.
+    chunk_strategy: str = "flat"
+    child_chunk_size: int = 250
+    child_chunk_overlap: int = 25
+    parent_chunk_size: int = 2000
+    parent_chunk_overlap: int = 0
+    parent_child_fanout: int = 3
+
+    # Upload Configuration
+    upload_dir: str = "data/uploads"
+    max_upload_bytes: int = 25 * 1024 * 1024
+    upload_chunk_bytes: int = 1024 * 1024
+
+    # Verification Configuration
+    # "sequential" verifies the whole draft after summarization finishes;
+    # "pipelined" streams the draft and verifies each finished sentence
+    # while later sentences are still being generated.
+    verification_mode: str = "sequential"
+    # "rewrite" has the Verification Agent return the whole corrected answer;
+    # "edits" has it return only sentence edits (structured output), which
+    # are applied locally. Applies to the sequential mode.
+    verification_output: str = "rewrite"
+    pipelined_verification_workers: int = 4
+    # Drafts whose sentences all reach this local citation-grounding score
+    # skip the Verification Agent (set skip to False to always verify).
+    grounding_threshold: float = 0.8
+    grounding_skip_verification: bool = True
+
+    # Map-Reduce Summarization
+    # Contexts above `map_reduce_threshold_tokens` (0 disables) are split
+    # into groups of at most `map_reduce_group_tokens`; evidence notes are
+    # extracted from the groups concurrently (`map_reduce_workers`) and the
+    # answer is written from the notes. Verification then only sees the
+    # chunks the answer cites.
+    map_reduce_threshold_tokens: int = 4000
+    map_reduce_group_tokens: int = 1500
+    map_reduce_workers: int = 4
+
+    # Prompt Budgets
+    # Input token budgets (counted with the model's tokenizer; 0 disables)
+    # of the summarization and verification prompts. Chunks that do not fit
+    # are dropped from the prompt, lowest-ranked first.
+    summarization_max_input_tokens: int = 12_000
+    verification_max_input_tokens: int = 12_000
+
+    # Conversation Sessions
+    # "memory" keeps sessions in process; "sqlite" persists them to
+    # `session_db_path` (requires langgraph-checkpoint-sqlite).
+    session_checkpointer: str = "memory"
+    session_db_path: str = "data/sessions.sqlite"
+    session_ttl_seconds: float = 1800.0
+    session_max_sessions: int = 1000
+    session_max_turns: int = 5
+    session_max_chunks: int = 6
+
+    # Request Deadlines
+    # Every QA request must finish within `qa_deadline_seconds` of arriving
+    # (0 disables); each LLM call's timeout is the remaining budget. With
+    # less than `verification_min_seconds` left the draft is returned
+    # unverified; with less than `summarization_min_seconds` left only the
+    # retrieved citations are returned with a "partial" status.
+    qa_deadline_seconds: float = 30.0
+    summarization_min_seconds: float = 5.0
+    verification_min_seconds: float = 4.0
+
+    # LLM Request Hedging
+    # Summarization/verification calls still running after the
+    # `hedge_percentile` latency of the node's recent calls (once
+    # `hedge_min_samples` were seen) are duplicated; the first response
+    # wins. At most `hedge_max_ratio` of a node's calls are hedged.
+    hedge_enabled: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_samples: int = 20
+    hedge_max_ratio: float = 0.1
+
+    # QA Admission Control
+    # At most `qa_max_concurrency` graph runs execute at once; up to
+    # `qa_max_queue` more wait for `qa_max_queue_wait_seconds` before being
+    # rejected with 429. Queued and running requests are cancelled when the
+    # client disconnects (checked every `qa_disconnect_poll_seconds`).
+    qa_max_concurrency: int = 8
+    qa_max_queue: int = 32
+    qa_max_queue_wait_seconds: float = 10.0
+    qa_disconnect_poll_seconds: float = 0.5
+
+    # Tracing
+    # When enabled, each /qa request is recorded as a tree of spans (graph
+    # nodes, LLM and embedding calls, retrieval) appended as JSON lines to
+    # `tracing_file`. Disabled tracing costs one flag check per span.
+    tracing_enabled: bool = False
+    tracing_file: str = "data/traces/spans.jsonl"
+
+    # Request Profiling
+    # When enabled, /qa and /index-pdf requests carrying `profiling_header`
+    # (or sampled at `profiling_sample_rate`) are profiled with a stack
+    # sampler ("sampling", collapsed stacks) or cProfile ("cprofile",
+    # pstats). At most `profiling_max_files` artifacts are kept.
+    profiling_enabled: bool = False
+    profiling_header: str = "X-Profile"
+    profiling_sample_rate: float = 0.0
+    profiling_mode: str = "sampling"
+    profiling_interval_seconds: float = 0.005
+    profiling_dir: str = "data/profiles"
+    profiling_max_files: int = 50
+
+    # Shared Cache
+    # "none", "memory" (per process) or "sqlite" (WAL database at
+    # `cache_path`, shared by all workers on the host). Holds at most
+    # `cache_max_entries` entries; retrieval results are invalidated
+    # whenever documents are indexed.
+    cache_backend: str = "none"
+    cache_path: str = "data/cache/cache.sqlite3"
+    cache_max_entries: int = 10_000
+    retrieval_cache_ttl_seconds: float = 3600.0
+    # Exact-match cache of temperature-0 chat responses in the same backend
+    # (keyed on model parameters, tools and messages; 0 TTL = no expiry).
+    # Requires a cache_backend other than "none".
+    llm_cache_enabled: bool = False
+    llm_cache_ttl_seconds: float = 7 * 24 * 3600.0
+
+    # Document Registry
+    # SQLite database mapping each indexed document (stored file name) to
+    # its content hash and chunk IDs, for incremental replace and delete.
+    document_registry_path: str = "data/documents.sqlite3"
+
+    # Retrieval Prefetch
+    # When enabled, `/qa/prefetch` retrieves for the partial question once a
+    # client has sent nothing newer for `prefetch_debounce_seconds` (on top
+    # of the frontend's own debounce) and keeps the results for
+    # `prefetch_ttl_seconds`. A question extending a prefetched one by at
+    # most `prefetch_extension_chars` characters reuses them.
+    prefetch_enabled: bool = False
+    prefetch_debounce_seconds: float = 0.15
+    prefetch_ttl_seconds: float = 30.0
+    prefetch_min_chars: int = 12
+    prefetch_extension_chars: int = 8
+    prefetch_max_per_minute: int = 30
+    prefetch_max_entries: int = 256
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,94 @@
+"""Per-request deadlines for the QA flow.
+
+A QA request gets an absolute deadline (`time.time()` based, so it can be
+stored in the checkpointed graph state) when it arrives. Nodes read it from
+the state and run their LLM calls inside `deadline_scope`, which:
+
+- makes the remaining budget available to the chat model, which turns it
+  into the HTTP timeout of each OpenAI call (see `llm.rate_limit`), and
+- lets `call_with_deadline` stop waiting for a call once the budget is
+  spent, even if the SDK is still retrying.
+
+Nodes decide how to degrade when the budget is too small for their step.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "qa_deadline", default=None
+)
+
+
+class DeadlineExceededError(Exception):
+    """The request's deadline passed before the work finished."""
+
+
+def new_deadline(budget_seconds: float) -> float | None:
+    """Absolute deadline `budget_seconds` from now (None if budget <= 0)."""
+    return time.time() + budget_seconds if budget_seconds > 0 else None
+
+
+def remaining(deadline: float | None) -> float | None:
+    """Seconds left until `deadline` (None when there is no deadline)."""
+    return None if deadline is None else deadline - time.time()
+
+
+@contextmanager
+def deadline_scope(deadline: float | None) -> Iterator[None]:
+    """Make `deadline` the current deadline for the enclosed calls."""
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def current_timeout() -> float | None:
+    """Remaining budget of the current deadline scope, for an HTTP timeout.
+
+    Raises:
+        DeadlineExceededError: The current deadline has already passed.
+    """
+    left = remaining(_deadline.get())
+    if left is not None and left <= 0:
+        raise DeadlineExceededError("Request deadline exceeded.")
+    return left
+
+
+def call_with_deadline(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call `fn`, giving up once the current deadline passes.
+
+    Without a deadline `fn` runs inline. Otherwise it runs in a daemon thread
+    (with the caller's context) and is abandoned at the deadline; its HTTP
+    calls time out on their own shortly after.
+
+    Raises:
+        DeadlineExceededError: `fn` did not finish before the deadline.
+    """
+    timeout = current_timeout()
+    if timeout is None:
+        return fn(*args, **kwargs)
+
+    outcome: dict = {}
+    context = contextvars.copy_context()
+
+    def run() -> None:
+        try:
+            outcome["value"] = context.run(fn, *args, **kwargs)
+        except BaseException as exc:  # re-raised in the caller's thread
+            outcome["error"] = exc
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        raise DeadlineExceededError("Request deadline exceeded.")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
@@ -0,0 +1,187 @@
+"""Factory for the embeddings used at index and query time.
+
+`embedding_provider` selects:
+
+- "openai" (default): OpenAI embeddings paced by the shared rate scheduler.
+- "hashing": a deterministic signed hashed bag of words
+  (`local_embedding_dimensions` wide). Needs no network or model, which
+  makes it suitable for tests and offline development; its quality is
+  lexical only.
+- "sentence-transformers": a small transformer model (`local_embedding_model`,
+  downloaded once and then loaded from the local cache) run on the CPU in
+  batches of `local_embedding_batch_size`, spread over
+  `local_embedding_workers` threads. Requires the optional
+  `sentence-transformers` package.
+
+Vectors of different providers are not comparable, so every store records
+`embedding_fingerprint()` (provider, model and dimension); the local store
+and Pinecone indexes refuse to be used with another fingerprint (or
+dimension).
+"""
+
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .. import tracing
+from ..config import get_settings
+from .rate_limit import RateLimitedOpenAIEmbeddings, configure_embedding_limits
+
+EMBEDDING_PROVIDERS = ("openai", "hashing", "sentence-transformers")
+
+# Native output dimensions of OpenAI embedding models.
+_NATIVE_DIMENSIONS = {
+    "text-embedding-3-large": 3072,
+    "text-embedding-3-small": 1536,
+    "text-embedding-ada-002": 1536,
+}
+
+_WORD = re.compile(r"\w+")
+
+
+class HashingEmbeddings(Embeddings):
+    """Signed hashed bag of lowercase words, L2-normalized."""
+
+    def __init__(self, dimensions: int = 384) -> None:
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in _WORD.findall(text.lower()):
+            digest = int.from_bytes(hashlib.md5(word.encode()).digest()[:8], "little")
+            vector[digest % self.dimensions] += 1.0 if digest & (1 << 63) else -1.0
+        return (vector / max(float(np.linalg.norm(vector)), 1e-12)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with tracing.span("llm.embed", model="hashing", texts=len(texts)):
+            return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+@lru_cache(maxsize=2)
+def _load_sentence_transformer(model_name: str) -> Any:
+    """Load (and cache) a sentence-transformers model on the CPU."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError(
+            "EMBEDDING_PROVIDER=sentence-transformers requires the "
+            "`sentence-transformers` package."
+        ) from exc
+    return SentenceTransformer(model_name, device="cpu")
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """Local CPU transformer embeddings with batched, threaded inference.
+
+    The model releases the GIL during inference, so batches encoded on
+    several threads use several cores.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 32, workers: int = 2) -> None:
+        self.model_name = model_name
+        self._model = _load_sentence_transformer(model_name)
+        self._batch_size = max(batch_size, 1)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(workers, 1), thread_name_prefix="local-embeddings"
+        )
+
+    @property
+    def dimensions(self) -> int:
+        return self._model.get_sentence_embedding_dimension()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self._model.encode(
+            texts,
+            batch_size=self._batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with tracing.span("llm.embed", model=self.model_name, texts=len(texts)):
+            batches = [
+                texts[start : start + self._batch_size]
+                for start in range(0, len(texts), self._batch_size)
+            ]
+            return [
+                row.tolist() for batch in self._executor.map(self._encode, batches) for row in batch
+            ]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+
+def create_embeddings(dimensions: int | None = None) -> Embeddings:
+    """Create the embeddings selected by `embedding_provider`.
+
+    Args:
+        dimensions: Output dimensions of OpenAI `text-embedding-3-*` models;
+            defaults to `openai_embedding_dimensions`. Ignored by the local
+            providers.
+
+    Raises:
+        ValueError: `embedding_provider` is not a known provider.
+    """
+    settings = get_settings()
+    provider = settings.embedding_provider
+    if provider == "hashing":
+        return HashingEmbeddings(settings.local_embedding_dimensions)
+    if provider == "sentence-transformers":
+        return SentenceTransformerEmbeddings(
+            settings.local_embedding_model,
+            batch_size=settings.local_embedding_batch_size,
+            workers=settings.local_embedding_workers,
+        )
+    if provider != "openai":
+        raise ValueError(
+            f"Unknown embedding_provider {provider!r}; "
+            f"expected one of {', '.join(EMBEDDING_PROVIDERS)}."
+        )
+
+    configure_embedding_limits(settings.openai_embedding_model_name)
+    return RateLimitedOpenAIEmbeddings(
+        model=settings.openai_embedding_model_name,
+        api_key=settings.openai_api_key,
+        dimensions=dimensions or settings.openai_embedding_dimensions,
+    )
+
+
+def native_embedding_dimension() -> int | None:
+    """Full output dimension of the configured OpenAI model (None if unknown).
+
+    Unlike `embedding_dimension`, ignores `openai_embedding_dimensions`.
+    """
+    return _NATIVE_DIMENSIONS.get(get_settings().openai_embedding_model_name)
+
+
+def embedding_dimension() -> int | None:
+    """Dimension of the configured embeddings (None if unknown)."""
+    settings = get_settings()
+    if settings.embedding_provider == "hashing":
+        return settings.local_embedding_dimensions
+    if settings.embedding_provider == "sentence-transformers":
+        return _load_sentence_transformer(
+            settings.local_embedding_model
+        ).get_sentence_embedding_dimension()
+    return settings.openai_embedding_dimensions or native_embedding_dimension()
+
+
+def embedding_fingerprint() -> str:
+    """Identifier of the configured embedding space (provider, model, size)."""
+    settings = get_settings()
+    if settings.embedding_provider == "hashing":
+        return f"hashing:{settings.local_embedding_dimensions}"
+    if settings.embedding_provider == "sentence-transformers":
+        return f"sentence-transformers:{settings.local_embedding_model}:{embedding_dimension()}"
+    # OpenAI keeps the format local stores were created with.
+    dimensions = settings.openai_embedding_dimensions or "native"
+    return f"{settings.openai_embedding_model_name}:{dimensions}"
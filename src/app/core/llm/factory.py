@@ -1,22 +1,50 @@
-"""Factory functions for creating LangChain v1 LLM instances."""
+"""Factory functions for creating LangChain v1 LLM instances.
+
+Chat models are paced by the process-wide OpenAI rate scheduler (see
+`rate_limit.py`) and, when `hedge_enabled` is set, models created for a
+hedged node duplicate calls that run into the latency tail (see
+`hedging.py`).
+
+With `llm_cache_enabled`, deterministic (temperature 0) models answer
+repeated identical prompts from the response cache (see
+`response_cache.py`).
+"""
 
 from langchain_openai import ChatOpenAI
 
 from ..config import get_settings
+from .hedging import HedgedChatOpenAI
+from .rate_limit import RateLimitedChatOpenAI, configure_chat_limits
+from .response_cache import get_response_cache
 
 
-def create_chat_model(temperature: float = 0.0) -> ChatOpenAI:
+def create_chat_model(
+    temperature: float = 0.0, hedge_node: str | None = None
+) -> ChatOpenAI:
     """Create a LangChain v1 ChatOpenAI instance.
 
     Args:
         temperature: Model temperature (default: 0.0 for deterministic outputs).
+        hedge_node: Name of the node the model serves; when given and
+            `hedge_enabled` is set, slow calls are hedged with a budget and
+            latency history kept per node.
+
+    Temperature-0 models use the response cache when `llm_cache_enabled`
+    is set.
 
     Returns:
         Configured ChatOpenAI instance.
     """
     settings = get_settings()
-    return ChatOpenAI(
-        model=settings.openai_model_name,
-        api_key=settings.openai_api_key,
-        temperature=temperature,
-    )
+    configure_chat_limits(settings.openai_model_name)
+    params = {
+        "model": settings.openai_model_name,
+        "api_key": settings.openai_api_key,
+        "temperature": temperature,
+    }
+    if settings.llm_cache_enabled and temperature == 0:
+        # Only deterministic calls may be replayed from the cache.
+        params["cache"] = get_response_cache()
+    if hedge_node and settings.hedge_enabled:
+        return HedgedChatOpenAI(hedge_node=hedge_node, **params)
+    return RateLimitedChatOpenAI(**params)
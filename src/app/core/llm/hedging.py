@@ -0,0 +1,209 @@
+"""Hedged chat completions for tail-latency reduction.
+
+A hedged model tracks the latency of its recent calls. When a call is still
+running after the `hedge_percentile` latency of those calls, an identical
+request is fired; the first successful response wins and the other request
+is cancelled. The hedge rate is capped per node at `hedge_max_ratio` of its
+recent calls so that a generally slow API does not double our traffic.
+
+Attempts run as asyncio tasks on a dedicated event loop thread, so the
+losing HTTP request is really cancelled rather than left running. Callback
+events of each attempt are buffered; only those of the attempt whose result
+is returned are replayed on the caller's run manager. Only
+`invoke`-style calls are hedged; streaming calls go through unchanged.
+
+Metrics (labelled by node): `llm_hedges_fired_total`,
+`llm_hedges_won_total` and `llm_hedge_delay_seconds`.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+import numpy as np
+from langchain_core.outputs import ChatResult
+
+from .. import metrics
+from ..config import get_settings
+from .rate_limit import RateLimitedChatOpenAI
+
+# Number of recent calls per node used for percentiles and the hedge budget.
+_WINDOW = 200
+
+
+class LatencyTracker:
+    """Recent successful-call latencies of one node."""
+
+    def __init__(self, window: int = _WINDOW) -> None:
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, percentile: float, min_samples: int) -> float | None:
+        """Latency percentile, or None until `min_samples` calls were seen."""
+        with self._lock:
+            if len(self._latencies) < max(min_samples, 1):
+                return None
+            return float(np.percentile(self._latencies, percentile))
+
+
+class HedgeBudget:
+    """Caps hedged calls at `max_ratio` of a node's recent calls."""
+
+    def __init__(self, max_ratio: float, window: int = _WINDOW) -> None:
+        self._max_ratio = max_ratio
+        self._hedged: Deque[bool] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_call(self, hedged: bool) -> None:
+        with self._lock:
+            self._hedged.append(hedged)
+
+    def allows_hedge(self) -> bool:
+        with self._lock:
+            calls = len(self._hedged) + 1
+            return sum(self._hedged) + 1 <= self._max_ratio * calls
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+_budgets: Dict[str, HedgeBudget] = {}
+_registry_lock = threading.Lock()
+
+
+def _node_state(node: str) -> tuple[LatencyTracker, HedgeBudget]:
+    with _registry_lock:
+        if node not in _trackers:
+            _trackers[node] = LatencyTracker()
+            _budgets[node] = HedgeBudget(get_settings().hedge_max_ratio)
+        return _trackers[node], _budgets[node]
+
+
+class _BufferedRunManager:
+    """Async run manager for one attempt that records its callback events.
+
+    `on_*` events are kept until the attempt wins and are then replayed on
+    the caller's (sync) run manager; other attributes are read from it.
+    """
+
+    def __init__(self, run_manager: Any) -> None:
+        self._run_manager = run_manager
+        self._events: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        if not name.startswith("on_"):
+            return getattr(self._run_manager, name)
+
+        async def record(*args: Any, **kwargs: Any) -> None:
+            self._events.append((name, args, kwargs))
+
+        return record
+
+    def replay(self) -> None:
+        for name, args, kwargs in self._events:
+            callback: Callable[..., Any] = getattr(self._run_manager, name)
+            callback(*args, **kwargs)
+
+
+@lru_cache(maxsize=1)
+def _hedge_loop() -> asyncio.AbstractEventLoop:
+    """Event loop thread on which hedged attempts run."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="llm-hedging", daemon=True).start()
+    return loop
+
+
+class HedgedChatOpenAI(RateLimitedChatOpenAI):
+    """Rate-limited ChatOpenAI that hedges slow calls of one node."""
+
+    hedge_node: str = "default"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        context = contextvars.copy_context()
+        future = asyncio.run_coroutine_threadsafe(
+            self._hedged(messages, stop, run_manager, kwargs, context), _hedge_loop()
+        )
+        result, manager = future.result()
+        if manager is not None:
+            # Replayed on the calling thread, as unhedged callbacks would be.
+            manager.replay()
+        return result
+
+    async def _attempt(
+        self,
+        messages,
+        stop,
+        run_manager: _BufferedRunManager | None,
+        kwargs: Dict[str, Any],
+        tracker: LatencyTracker,
+    ) -> ChatResult:
+        started = time.monotonic()
+        result = await RateLimitedChatOpenAI._agenerate(
+            self, messages, stop=stop, run_manager=run_manager, **dict(kwargs)
+        )
+        tracker.record(time.monotonic() - started)
+        return result
+
+    async def _hedged(
+        self,
+        messages,
+        stop,
+        run_manager: Any,
+        kwargs: Dict[str, Any],
+        context: contextvars.Context,
+    ) -> Tuple[ChatResult, _BufferedRunManager | None]:
+        """Run the primary attempt and, if it is slow, one hedge.
+
+        Each attempt gets its own buffered run manager. Returns the first
+        successful result with the manager of the attempt that produced it,
+        whose events are the only ones to reach `run_manager`.
+        """
+        settings = get_settings()
+        tracker, budget = _node_state(self.hedge_node)
+        delay = tracker.percentile(settings.hedge_percentile, settings.hedge_min_samples)
+
+        managers: Dict[asyncio.Task, _BufferedRunManager | None] = {}
+
+        def start_attempt() -> asyncio.Task:
+            manager = _BufferedRunManager(run_manager) if run_manager else None
+            # Attempts run in a copy of the caller's context (deadline, rate
+            # priority) each, so one attempt's context changes (tracing spans,
+            # the rate limiter's state) never leak into the other.
+            task = asyncio.create_task(
+                self._attempt(messages, stop, manager, kwargs, tracker),
+                context=context.copy(),
+            )
+            managers[task] = manager
+            return task
+
+        primary = start_attempt()
+        tasks = {primary}
+        hedge = None
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and budget.allows_hedge():
+                hedge = start_attempt()
+                tasks.add(hedge)
+                metrics.increment("llm_hedges_fired_total", node=self.hedge_node)
+                metrics.observe("llm_hedge_delay_seconds", delay, node=self.hedge_node)
+        budget.record_call(hedge is not None)
+
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            metrics.increment("llm_hedges_won_total", node=self.hedge_node)
+                        return task.result(), managers[task]
+            # Every attempt failed: surface the primary's error.
+            return primary.result(), managers[primary]
+        finally:
+            for task in tasks:
+                task.cancel()
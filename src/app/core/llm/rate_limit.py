@@ -0,0 +1,346 @@
+"""Process-wide OpenAI rate scheduling (requests and tokens per minute).
+
+Every chat model and embeddings client created by this package goes through
+one `RateScheduler`, so the agents and the embeddings share a single view of
+the account's RPM/TPM quota instead of each bursting into 429s and SDK
+retries.
+
+- Each model has two token buckets refilled continuously: requests per
+  minute and tokens per minute. A call's token cost is estimated before it is
+  sent (prompt characters / 4 plus the completion allowance) and corrected
+  with the reported usage afterwards.
+- Callers queue per model in priority order: QA traffic (the default) is
+  always served before indexing traffic, which is marked with
+  `rate_priority(INDEXING)`.
+- Time spent waiting for quota is recorded in the
+  `openai_rate_wait_seconds{model,priority}` metric.
+
+Chat calls made inside a `deadline_scope` (see `core.deadline`) are sent
+with the remaining request budget as their HTTP timeout, after any wait for
+quota.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, List, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from .. import metrics, tracing
+from ..config import get_settings
+from ..deadline import current_timeout
+
+QA = 0
+INDEXING = 1
+_PRIORITY_NAMES = {QA: "qa", INDEXING: "indexing"}
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "openai_rate_priority", default=QA
+)
+
+# Rough size of an English token, used before the real usage is known.
+_CHARS_PER_TOKEN = 4
+# Completion allowance for chat calls without `max_tokens`.
+_DEFAULT_COMPLETION_TOKENS = 512
+
+
+@contextmanager
+def rate_priority(priority: int) -> Iterator[None]:
+    """Run the enclosed OpenAI calls at `priority` (QA or INDEXING)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for quota accounting."""
+    return max(1, math.ceil(len(text) / _CHARS_PER_TOKEN))
+
+
+class TokenBucket:
+    """Continuously refilled bucket holding at most one minute of quota.
+
+    The level may go negative when a single call costs more than is
+    available; later calls then wait until the debt is repaid.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now).
+
+        Amounts larger than the capacity only wait for a full bucket.
+        """
+        self._refill(now)
+        missing = min(amount, self.capacity) - self._level
+        return max(0.0, missing / self._rate)
+
+    def take(self, amount: float) -> None:
+        self._level -= amount
+
+    def refund(self, amount: float) -> None:
+        """Return (or, if negative, additionally charge) `amount`."""
+        self._level = min(self.capacity, self._level + amount)
+
+
+class RateScheduler:
+    """Per-model RPM/TPM pacing with priority queueing across threads."""
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._buckets: Dict[str, Tuple[TokenBucket | None, TokenBucket | None]] = {}
+        self._queues: Dict[str, List[Tuple[int, int]]] = {}
+        self._sequence = itertools.count()
+
+    def configure(self, model: str, rpm: int, tpm: int) -> None:
+        """Set the limits of a model (0 disables a limit). First call wins."""
+        with self._condition:
+            if model not in self._buckets:
+                self._buckets[model] = (
+                    TokenBucket(rpm) if rpm > 0 else None,
+                    TokenBucket(tpm) if tpm > 0 else None,
+                )
+                self._queues[model] = []
+
+    def acquire(self, model: str, tokens: int, requests: int = 1) -> float:
+        """Block until `requests` calls costing `tokens` fit the model's quota.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        request_bucket, token_bucket = self._buckets.get(model, (None, None))
+        if request_bucket is None and token_bucket is None:
+            return 0.0
+
+        priority = _priority.get()
+        started = time.monotonic()
+        with self._condition:
+            queue = self._queues[model]
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(queue, ticket)
+            self._condition.notify_all()
+            try:
+                while True:
+                    if queue[0] != ticket:
+                        self._condition.wait()
+                        continue
+                    now = time.monotonic()
+                    delay = max(
+                        request_bucket.delay(requests, now) if request_bucket else 0.0,
+                        token_bucket.delay(tokens, now) if token_bucket else 0.0,
+                    )
+                    if delay <= 0:
+                        break
+                    # Woken early when a higher-priority caller queues up.
+                    self._condition.wait(timeout=delay)
+
+                if request_bucket:
+                    request_bucket.take(requests)
+                if token_bucket:
+                    token_bucket.take(tokens)
+            finally:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                self._condition.notify_all()
+
+        waited = time.monotonic() - started
+        metrics.observe(
+            "openai_rate_wait_seconds",
+            waited,
+            model=model,
+            priority=_PRIORITY_NAMES.get(priority, str(priority)),
+        )
+        return waited
+
+    async def aacquire(self, model: str, tokens: int, requests: int = 1) -> float:
+        """Async variant of `acquire` (waits in a worker thread)."""
+        context = contextvars.copy_context()
+        return await asyncio.to_thread(context.run, self.acquire, model, tokens, requests)
+
+    def reconcile(self, model: str, estimated: int, actual: int | None) -> None:
+        """Correct the token bucket once the real usage is known."""
+        _, token_bucket = self._buckets.get(model, (None, None))
+        if token_bucket is None or actual is None:
+            return
+        with self._condition:
+            token_bucket.refund(estimated - actual)
+            self._condition.notify_all()
+        metrics.increment("openai_tokens_total", actual, model=model)
+
+
+@lru_cache(maxsize=1)
+def get_rate_scheduler() -> RateScheduler:
+    """Get the process-wide rate scheduler."""
+    return RateScheduler()
+
+
+def _estimate_chat_tokens(messages: Sequence[BaseMessage], max_tokens: int | None) -> int:
+    prompt = sum(estimate_tokens(str(message.content)) for message in messages)
+    return prompt + (max_tokens or _DEFAULT_COMPLETION_TOKENS)
+
+
+def _apply_deadline(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Use the remaining request budget as the call's timeout."""
+    timeout = current_timeout()
+    if timeout is not None:
+        kwargs.setdefault("timeout", timeout)
+    return kwargs
+
+
+def _usage_total(usage: Any) -> int | None:
+    if not usage:
+        return None
+    return usage.get("total_tokens")
+
+
+def _trace_usage(current: Any, usage: Any) -> None:
+    """Record token usage (API or LangChain key names) on a span."""
+    if usage:
+        current.set_attributes(
+            prompt_tokens=usage.get("prompt_tokens", usage.get("input_tokens")),
+            completion_tokens=usage.get("completion_tokens", usage.get("output_tokens")),
+            total_tokens=usage.get("total_tokens"),
+        )
+
+
+class RateLimitedChatOpenAI(ChatOpenAI):
+    """ChatOpenAI that paces every call through the shared scheduler.
+
+    Each call is traced as an `llm.chat` span with the model, the estimated
+    and reported token counts and the time spent waiting for quota.
+    """
+
+    def _estimate(self, messages: Sequence[BaseMessage]) -> int:
+        return _estimate_chat_tokens(messages, self.max_tokens)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        scheduler = get_rate_scheduler()
+        estimated = self._estimate(messages)
+        with tracing.span(
+            "llm.chat", model=self.model_name, estimated_tokens=estimated
+        ) as current:
+            waited = scheduler.acquire(self.model_name, estimated)
+            current.set_attribute("rate_wait_ms", round(waited * 1000, 3))
+            result = super()._generate(
+                messages, stop=stop, run_manager=run_manager, **_apply_deadline(kwargs)
+            )
+            usage = (result.llm_output or {}).get("token_usage")
+            _trace_usage(current, usage)
+        scheduler.reconcile(self.model_name, estimated, _usage_total(usage))
+        return result
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        scheduler = get_rate_scheduler()
+        estimated = self._estimate(messages)
+        with tracing.span(
+            "llm.chat", model=self.model_name, estimated_tokens=estimated
+        ) as current:
+            waited = await scheduler.aacquire(self.model_name, estimated)
+            current.set_attribute("rate_wait_ms", round(waited * 1000, 3))
+            result = await super()._agenerate(
+                messages, stop=stop, run_manager=run_manager, **_apply_deadline(kwargs)
+            )
+            usage = (result.llm_output or {}).get("token_usage")
+            _trace_usage(current, usage)
+        scheduler.reconcile(self.model_name, estimated, _usage_total(usage))
+        return result
+
+    def _stream(self, messages, *args: Any, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        scheduler = get_rate_scheduler()
+        estimated = self._estimate(messages)
+        with tracing.span(
+            "llm.chat", model=self.model_name, estimated_tokens=estimated, stream=True
+        ) as current:
+            waited = scheduler.acquire(self.model_name, estimated)
+            current.set_attribute("rate_wait_ms", round(waited * 1000, 3))
+            usage = None
+            for chunk in super()._stream(messages, *args, **_apply_deadline(kwargs)):
+                usage = getattr(chunk.message, "usage_metadata", None) or usage
+                yield chunk
+            _trace_usage(current, usage)
+        scheduler.reconcile(self.model_name, estimated, _usage_total(usage))
+
+    async def _astream(
+        self, messages, *args: Any, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        scheduler = get_rate_scheduler()
+        estimated = self._estimate(messages)
+        with tracing.span(
+            "llm.chat", model=self.model_name, estimated_tokens=estimated, stream=True
+        ) as current:
+            waited = await scheduler.aacquire(self.model_name, estimated)
+            current.set_attribute("rate_wait_ms", round(waited * 1000, 3))
+            usage = None
+            async for chunk in super()._astream(messages, *args, **_apply_deadline(kwargs)):
+                usage = getattr(chunk.message, "usage_metadata", None) or usage
+                yield chunk
+            _trace_usage(current, usage)
+        scheduler.reconcile(self.model_name, estimated, _usage_total(usage))
+
+
+class RateLimitedOpenAIEmbeddings(OpenAIEmbeddings):
+    """OpenAIEmbeddings that paces every batch through the shared scheduler."""
+
+    def _cost(self, texts: List[str], chunk_size: int | None) -> Tuple[int, int]:
+        tokens = sum(estimate_tokens(text) for text in texts)
+        requests = max(1, math.ceil(len(texts) / (chunk_size or self.chunk_size)))
+        return tokens, requests
+
+    def embed_documents(
+        self, texts: List[str], chunk_size: int | None = None, **kwargs: Any
+    ) -> List[List[float]]:
+        tokens, requests = self._cost(texts, chunk_size)
+        with tracing.span(
+            "llm.embed", model=self.model, texts=len(texts), estimated_tokens=tokens
+        ) as current:
+            waited = get_rate_scheduler().acquire(self.model, tokens, requests=requests)
+            current.set_attribute("rate_wait_ms", round(waited * 1000, 3))
+            return super().embed_documents(texts, chunk_size=chunk_size, **kwargs)
+
+    async def aembed_documents(
+        self, texts: List[str], chunk_size: int | None = None, **kwargs: Any
+    ) -> List[List[float]]:
+        tokens, requests = self._cost(texts, chunk_size)
+        with tracing.span(
+            "llm.embed", model=self.model, texts=len(texts), estimated_tokens=tokens
+        ) as current:
+            waited = await get_rate_scheduler().aacquire(
+                self.model, tokens, requests=requests
+            )
+            current.set_attribute("rate_wait_ms", round(waited * 1000, 3))
+            return await super().aembed_documents(texts, chunk_size=chunk_size, **kwargs)
+
+
+def configure_chat_limits(model: str) -> None:
+    """Register the configured chat RPM/TPM limits for `model`."""
+    settings = get_settings()
+    get_rate_scheduler().configure(model, settings.openai_rpm_limit, settings.openai_tpm_limit)
+
+
+def configure_embedding_limits(model: str) -> None:
+    """Register the configured embedding RPM/TPM limits for `model`."""
+    settings = get_settings()
+    get_rate_scheduler().configure(
+        model, settings.openai_embedding_rpm_limit, settings.openai_embedding_tpm_limit
+    )
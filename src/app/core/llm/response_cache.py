@@ -0,0 +1,75 @@
+"""Exact-match cache of chat model responses.
+
+With `llm_cache_enabled`, chat models created at temperature 0 by
+`create_chat_model` look up their responses in the shared cache backend
+(`core.cache`) before calling the API. LangChain keys a lookup on the
+serialized messages (system prompt included, message IDs removed) and the
+model's parameters (model name, temperature, bound tools and response
+format); both are hashed into the key here.
+
+Responses are corpus-bound: indexing bumps the corpus version, so answers
+written over context from an older corpus are not reused. Entries expire
+after `llm_cache_ttl_seconds` and are evicted with the backend's LRU bound;
+use `cache_backend = "sqlite"` to keep them on disk across restarts and
+workers. Lookups are counted in `cache_requests_total{namespace="llm"}`.
+
+The cache needs a real backend: with `cache_backend = "none"` nothing would
+be stored, so `get_response_cache()` refuses that configuration and the
+service fails to start instead of silently running uncached.
+"""
+
+from functools import lru_cache
+from typing import Any, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.outputs import Generation
+
+from ..cache import cached_lookup, get_cache, make_key
+from ..config import get_settings
+
+# Tag of every cached response, used by `clear()`.
+LLM_CACHE_TAG = "llm"
+
+
+class ResponseCache(BaseCache):
+    """LangChain cache adapter over the shared cache backend."""
+
+    def __init__(self, ttl_seconds: float | None = None) -> None:
+        self._ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return make_key("llm", llm_string, prompt)
+
+    def lookup(self, prompt: str, llm_string: str) -> Sequence[Generation] | None:
+        return cached_lookup("llm", self._key(prompt, llm_string))
+
+    def update(
+        self, prompt: str, llm_string: str, return_val: Sequence[Generation]
+    ) -> None:
+        get_cache().set(
+            self._key(prompt, llm_string),
+            list(return_val),
+            ttl=self._ttl_seconds,
+            corpus_bound=True,
+            tags=[LLM_CACHE_TAG],
+        )
+
+    def clear(self, **kwargs: Any) -> None:
+        get_cache().invalidate_tag(LLM_CACHE_TAG)
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide chat response cache.
+
+    Raises:
+        ValueError: `cache_backend` is "none".
+    """
+    settings = get_settings()
+    if settings.cache_backend == "none":
+        raise ValueError(
+            'llm_cache_enabled requires cache_backend "memory" or "sqlite"; '
+            'with "none" no response would be cached.'
+        )
+    return ResponseCache(ttl_seconds=settings.llm_cache_ttl_seconds or None)
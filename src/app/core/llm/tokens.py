@@ -0,0 +1,134 @@
+"""Prompt token accounting and per-node input budgets.
+
+Tokens are counted locally with the model's `tiktoken` encoding. If the
+encoding cannot be loaded (it is downloaded on first use, so offline
+environments may not have it), the character-based estimate used for rate
+pacing is used instead.
+
+Nodes fit the chunk table into their input budget
+(`summarization_max_input_tokens`, `verification_max_input_tokens`; 0
+disables) with `fit_chunks`, which drops the lowest-ranked chunks first and
+keeps the remaining chunks' citation IDs. The token count of each rendered
+chunk is memoized (`chunk_tokens`), so the threshold checks and budget
+fits repeated for every verification call of a request only tokenize each
+chunk once; `context_tokens` adds them up for a whole table. The size of every prompt is
+reported by `record_prompt_tokens` in the `llm_prompt_tokens{node}` summary
+and, summed per node, as the `prompt_tokens.<node>` attribute of the
+current span.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable
+
+from .. import metrics, tracing
+from ..config import get_settings
+from ..retrieval.chunks import ChunkRecord, ChunkTable
+from ..retrieval.serialization import render_context
+from .rate_limit import estimate_tokens
+
+# Separator between chunks in the rendered context.
+_CONTEXT_SEPARATOR = "\n\n"
+# Memoized per-chunk counts (a few requests' worth of chunk tables).
+_CHUNK_TOKENS_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=4)
+def _encoding(model_name: str) -> Any | None:
+    """The tiktoken encoding of `model_name`, or None if unavailable."""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:  # not installed, or the encoding could not be fetched
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens of `text` for the configured chat model."""
+    encoding = _encoding(get_settings().openai_model_name)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=_CHUNK_TOKENS_CACHE_SIZE)
+def chunk_tokens(chunk_id: str, record: ChunkRecord) -> int:
+    """Tokens of one chunk as rendered in the context (memoized)."""
+    return count_tokens(render_context({chunk_id: record}))
+
+
+def context_tokens(chunks: ChunkTable) -> int:
+    """Tokens of the rendered context of a chunk table.
+
+    The sum of the memoized per-chunk counts plus the separators; may differ
+    by a token or so per chunk boundary from tokenizing the whole string.
+    """
+    if not chunks:
+        return 0
+    separators = (len(chunks) - 1) * count_tokens(_CONTEXT_SEPARATOR)
+    return sum(chunk_tokens(cid, record) for cid, record in chunks.items()) + separators
+
+
+def fit_chunks(
+    chunks: ChunkTable,
+    budget: int,
+    reserved: int = 0,
+    priority: Iterable[str] = (),
+) -> ChunkTable:
+    """Keep the highest-ranked chunks whose rendered context fits the budget.
+
+    Args:
+        chunks: Chunk table in rank order.
+        budget: Input budget of the prompt in tokens (0 = unlimited).
+        reserved: Tokens of the rest of the prompt (system prompt, question,
+            draft).
+        priority: Citation IDs to keep before any other chunk (e.g. the
+            chunks a draft cites).
+
+    Returns:
+        The kept chunks in their original order. The best chunk is always
+        kept, even if it alone exceeds the budget.
+    """
+    if not budget or not chunks:
+        return chunks
+
+    preferred = [chunk_id for chunk_id in priority if chunk_id in chunks]
+    order = [*dict.fromkeys(preferred), *(cid for cid in chunks if cid not in preferred)]
+    available = budget - reserved
+    separator = count_tokens(_CONTEXT_SEPARATOR)
+
+    kept = set()
+    used = 0
+    for chunk_id in order:
+        tokens = chunk_tokens(chunk_id, chunks[chunk_id])
+        if kept:
+            tokens += separator
+        if kept and used + tokens > available:
+            break
+        kept.add(chunk_id)
+        used += tokens
+
+    if len(kept) < len(chunks):
+        metrics.increment("prompt_chunks_dropped_total", amount=len(chunks) - len(kept))
+    return {chunk_id: record for chunk_id, record in chunks.items() if chunk_id in kept}
+
+
+def prompt_tokens(system_prompt: str, user_content: str) -> int:
+    """Input tokens of a system prompt plus user message."""
+    return count_tokens(system_prompt) + count_tokens(user_content)
+
+
+def record_prompt_tokens(node: str, tokens: int) -> None:
+    """Report the input tokens of one of `node`'s prompts.
+
+    Every prompt is observed in `llm_prompt_tokens{node}`; the current span
+    accumulates the node's total in its `prompt_tokens.<node>` attribute.
+    """
+    metrics.observe("llm_prompt_tokens", tokens, node=node)
+    current = tracing.current_span()
+    if isinstance(current, tracing.Span):
+        key = f"prompt_tokens.{node}"
+        current.set_attribute(key, current.attributes.get(key, 0) + tokens)
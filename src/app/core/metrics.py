@@ -0,0 +1,105 @@
+"""Process-wide metrics exposed at `GET /metrics`.
+
+A minimal, dependency-free registry with three kinds of series:
+
+- counters (`increment`): monotonically increasing totals,
+- gauges (`set_gauge` / `add_gauge`): current values such as queue depth,
+- summaries (`observe`): count, sum and max of observed values such as
+  waiting times.
+
+Series are identified by a name plus optional labels and are rendered in the
+Prometheus text exposition format by `render_prometheus`.
+"""
+
+import threading
+from typing import Dict, Tuple
+
+_SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_lock = threading.Lock()
+_counters: Dict[_SeriesKey, float] = {}
+_gauges: Dict[_SeriesKey, float] = {}
+_summaries: Dict[_SeriesKey, list] = {}
+
+
+def _key(name: str, labels: Dict[str, object]) -> _SeriesKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def increment(name: str, amount: float = 1.0, **labels: object) -> None:
+    """Add `amount` to a counter."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + amount
+
+
+def set_gauge(name: str, value: float, **labels: object) -> None:
+    """Set a gauge to `value`."""
+    with _lock:
+        _gauges[_key(name, labels)] = float(value)
+
+
+def add_gauge(name: str, amount: float, **labels: object) -> None:
+    """Add `amount` (possibly negative) to a gauge."""
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = _gauges.get(key, 0.0) + amount
+
+
+def observe(name: str, value: float, **labels: object) -> None:
+    """Record one observation in a summary (count, sum and max)."""
+    key = _key(name, labels)
+    with _lock:
+        summary = _summaries.setdefault(key, [0, 0.0, float("-inf")])
+        summary[0] += 1
+        summary[1] += value
+        summary[2] = max(summary[2], value)
+
+
+def snapshot() -> Dict[str, Dict[str, object]]:
+    """Copy of every series, keyed by kind and then by rendered series name."""
+    with _lock:
+        return {
+            "counters": {_series(key): value for key, value in _counters.items()},
+            "gauges": {_series(key): value for key, value in _gauges.items()},
+            "summaries": {
+                _series(key): {"count": count, "sum": total, "max": peak}
+                for key, (count, total, peak) in _summaries.items()
+            },
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _series(key: _SeriesKey, suffix: str = "") -> str:
+    name, labels = key
+    if not labels:
+        return f"{name}{suffix}"
+    rendered = ",".join(f'{label}="{_escape(value)}"' for label, value in labels)
+    return f"{name}{suffix}{{{rendered}}}"
+
+
+def render_prometheus() -> str:
+    """Render all series in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for kind, series in (("counter", _counters), ("gauge", _gauges)):
+            typed = set()
+            for key in sorted(series):
+                if key[0] not in typed:
+                    lines.append(f"# TYPE {key[0]} {kind}")
+                    typed.add(key[0])
+                lines.append(f"{_series(key)} {series[key]:g}")
+
+        typed = set()
+        for key in sorted(_summaries):
+            count, total, peak = _summaries[key]
+            if key[0] not in typed:
+                lines.append(f"# TYPE {key[0]} summary")
+                typed.add(key[0])
+            lines.append(f"{_series(key, '_count')} {count}")
+            lines.append(f"{_series(key, '_sum')} {total:g}")
+            lines.append(f"{_series(key, '_max')} {peak:g}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,205 @@
+"""On-demand CPU profiling of individual API requests.
+
+With `profiling_enabled`, a `/qa` or `/index-pdf` request is profiled when it
+carries the `profiling_header` (value `1`, `sampling` or `cprofile`) or when
+it is picked by `profiling_sample_rate`. Two profilers are available:
+
+- `sampling` (default `profiling_mode`): a background thread samples the
+  Python stacks of every thread that used CPU since the previous sample and
+  writes them as collapsed stacks (`<name>.collapsed`, one `frame;frame
+  count` line per stack) for flamegraph.pl or speedscope. It sees the graph
+  nodes' worker threads, but also threads of concurrent requests.
+- `cprofile`: deterministic profiling of the request's own worker thread
+  (graph driver, checkpoint serialization, PDF parsing and splitting),
+  written as `<name>.pstats` for `pstats`/snakeviz.
+
+Artifacts go to `profiling_dir`, which keeps at most `profiling_max_files`
+files (oldest deleted first).
+
+Example:
+    with profile_request("qa", mode) as profile:
+        result = await run_in_threadpool(profiled(answer_question), question)
+"""
+
+import cProfile
+import contextvars
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping, TypeVar
+
+from . import metrics
+from .config import get_settings
+
+T = TypeVar("T")
+
+MODES = ("sampling", "cprofile")
+
+# Deepest stack recorded by the sampler; deeper frames are cut at the root.
+_MAX_STACK_DEPTH = 128
+
+
+def requested_mode(headers: Mapping[str, str]) -> str | None:
+    """Profiler to use for a request, or None to not profile it.
+
+    The profiling header selects a mode (`sampling`/`cprofile`, anything else
+    truthy means `profiling_mode`); without it, requests are sampled at
+    `profiling_sample_rate`.
+    """
+    settings = get_settings()
+    if not settings.profiling_enabled:
+        return None
+    value = headers.get(settings.profiling_header, "").strip().lower()
+    if value in MODES:
+        return value
+    if value in ("1", "true", "yes", "on"):
+        return settings.profiling_mode
+    if settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate:
+        return settings.profiling_mode
+    return None
+
+
+class StackSampler:
+    """Collapsed-stack sampler over the threads that are using CPU."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self._interval = interval_seconds
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+        self._cpu_clocks: dict[int, float] = {}
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        self._thread.join()
+        return self._stacks
+
+    def _used_cpu(self, thread_id: int) -> bool:
+        """Whether a thread ran since the previous sample (True if unknown)."""
+        try:
+            clock = time.clock_gettime(time.pthread_getcpuclockid(thread_id))
+        except (AttributeError, OSError):
+            # No per-thread CPU clocks on this platform: sample wall-clock.
+            return True
+        previous = self._cpu_clocks.get(thread_id)
+        self._cpu_clocks[thread_id] = clock
+        return previous is None or clock > previous
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self._interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id and self._used_cpu(thread_id):
+                    self._stacks[_collapse(frame)] += 1
+
+
+def _collapse(frame: Any) -> str:
+    frames = []
+    while frame is not None and len(frames) < _MAX_STACK_DEPTH:
+        code = frame.f_code
+        frames.append(f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+class RequestProfile:
+    """Profiling of one request; see `profile_request`."""
+
+    def __init__(self, name: str, mode: str) -> None:
+        self.name = name
+        self.mode = mode
+        self.profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{name}-{uuid.uuid4().hex[:8]}"
+        self._profiler: cProfile.Profile | None = None
+
+    def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call `fn`, under cProfile in `cprofile` mode."""
+        if self.mode != "cprofile":
+            return fn(*args, **kwargs)
+        profiler = cProfile.Profile()
+        self._profiler = profiler
+        return profiler.runcall(fn, *args, **kwargs)
+
+    def write(self, stacks: Counter[str] | None, directory: Path) -> Path | None:
+        directory.mkdir(parents=True, exist_ok=True)
+        if self._profiler is not None:
+            path = directory / f"{self.profile_id}.pstats"
+            self._profiler.dump_stats(path)
+            return path
+        if stacks:
+            path = directory / f"{self.profile_id}.collapsed"
+            path.write_text(
+                "".join(f"{stack} {count}\n" for stack, count in stacks.most_common()),
+                encoding="utf-8",
+            )
+            return path
+        return None
+
+
+_active: contextvars.ContextVar[RequestProfile | None] = contextvars.ContextVar(
+    "request_profile", default=None
+)
+
+
+def _prune(directory: Path, max_files: int) -> None:
+    """Delete the oldest artifacts beyond `max_files`."""
+    artifacts = sorted(
+        (path for path in directory.iterdir() if path.suffix in (".pstats", ".collapsed")),
+        key=lambda path: path.stat().st_mtime,
+    )
+    for path in artifacts[: max(len(artifacts) - max_files, 0)]:
+        path.unlink(missing_ok=True)
+
+
+@contextmanager
+def profile_request(name: str, mode: str | None) -> Iterator[RequestProfile | None]:
+    """Profile the enclosed request handling (no-op when `mode` is None).
+
+    Synchronous work must be wrapped with `profiled` to be seen by cProfile.
+    Artifacts are written when the block exits, also on errors.
+    """
+    if mode is None:
+        yield None
+        return
+
+    settings = get_settings()
+    profile = RequestProfile(name, mode)
+    sampler = None
+    if mode == "sampling":
+        sampler = StackSampler(settings.profiling_interval_seconds)
+        sampler.start()
+    token = _active.set(profile)
+    try:
+        yield profile
+    finally:
+        _active.reset(token)
+        stacks = sampler.stop() if sampler else None
+        directory = Path(settings.profiling_dir)
+        if profile.write(stacks, directory) is not None:
+            metrics.increment("profiles_written_total", endpoint=name, mode=mode)
+            _prune(directory, settings.profiling_max_files)
+
+
+def profiled(fn: Callable[..., T]) -> Callable[..., T]:
+    """Wrap `fn` so that it runs under the current request's profiler.
+
+    The wrapper looks the profile up in its context, so it works in the
+    threads `run_in_threadpool` uses.
+    """
+
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        profile = _active.get()
+        if profile is None:
+            return fn(*args, **kwargs)
+        return profile.run(fn, *args, **kwargs)
+
+    return wrapper
@@ -1,5 +1,15 @@
 """Retrieval module for vector store operations."""
 
+from .chunks import ChunkRecord, build_chunk_table, to_records
+from .fusion import multi_query_retrieve, reciprocal_rank_fusion
 from .vector_store import get_retriever, retrieve
 
-__all__ = ["get_retriever", "retrieve"]
+__all__ = [
+    "ChunkRecord",
+    "build_chunk_table",
+    "get_retriever",
+    "multi_query_retrieve",
+    "reciprocal_rank_fusion",
+    "retrieve",
+    "to_records",
+]
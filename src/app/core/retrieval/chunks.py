@@ -0,0 +1,64 @@
+"""Compact chunk records and the per-request chunk table.
+
+Retrieved chunks are converted once, right after retrieval, from LangChain
+`Document` objects into `ChunkRecord`s. The same record objects are then
+shared by the retrieval tool's artifact, the graph state and the API
+response:
+
+- The graph state holds a chunk table: an ordered mapping from citation ID
+  (C1, C2, ...) to `ChunkRecord`. Nodes refer to chunks by ID.
+- The CONTEXT string and the citation map are rendered from the table only
+  when they are needed (see `serialization.render_context` and
+  `serialization.render_citations`) instead of being stored next to it.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from langchain_core.documents import Document
+
+# Ordered mapping of citation ID -> record for one request.
+ChunkTable = Dict[str, "ChunkRecord"]
+
+
+@dataclass(slots=True, frozen=True)
+class ChunkRecord:
+    """One retrieved chunk: its stripped text plus the metadata we cite.
+
+    Uses `__slots__` (no per-instance `__dict__`) and keeps only the fields
+    the pipeline reads, unlike `Document` which carries the full metadata
+    dict and pydantic machinery.
+    """
+
+    text: str
+    source: str
+    page: int | str
+    doc_id: str | None = None
+
+    @classmethod
+    def from_document(cls, doc: Document) -> "ChunkRecord":
+        """Convert a retrieved Document into a compact record."""
+        page = doc.metadata.get("page")
+        if page is None or page == "":
+            page = doc.metadata.get("page_number", "unknown")
+        return cls(
+            text=doc.page_content.strip(),
+            source=str(doc.metadata.get("source", "unknown")),
+            page=page,
+            doc_id=doc.id,
+        )
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        """Identity of the chunk across result lists, for de-duplication."""
+        return self.source, str(self.page), self.text
+
+
+def to_records(docs: Iterable[Document]) -> List[ChunkRecord]:
+    """Convert retrieved Documents into chunk records."""
+    return [ChunkRecord.from_document(doc) for doc in docs]
+
+
+def build_chunk_table(records: Iterable[ChunkRecord]) -> ChunkTable:
+    """Assign citation IDs (C1, C2, ...) to records in rank order."""
+    return {f"C{idx}": record for idx, record in enumerate(records, start=1)}
@@ -0,0 +1,300 @@
+"""Per-document bookkeeping for incremental replace and delete.
+
+Every document indexed through the API is registered under its source key
+(the stored file name) with its content hash and the IDs of its chunks.
+Chunk IDs are derived from the source and the chunk text, so re-indexing a
+new revision of a document only embeds and upserts chunks whose text
+changed and deletes the chunks that disappeared; unchanged chunks keep
+their vectors.
+
+The registry is a small SQLite database (`document_registry_path`) so that
+all API workers see the same state. It also stores the parent windows of
+the small-to-big chunk strategy (see `parents.py`); a child's ID includes
+its parent ID, so children of a changed parent are re-embedded with the new
+parent reference.
+
+Cache invalidation after a change:
+- removed chunks: only cached retrievals that returned chunks of this
+  source are dropped (they are tagged with it, see `source_tag`);
+- added chunks: they may enter the results of any query, so all
+  corpus-bound entries are invalidated with the corpus version.
+The warm prefetch cache (see `prefetch.py`) is invalidated the same way:
+by source for removed chunks, entirely for added ones.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Sequence
+
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from .. import tracing
+from ..cache import get_cache
+from ..config import get_settings
+from ..llm.rate_limit import INDEXING, rate_priority
+from .prefetch import get_warm_cache
+
+# Largest number of IDs per vector delete call (Pinecone's limit).
+DELETE_BATCH_SIZE = 1000
+
+_source_locks: Dict[str, threading.Lock] = {}
+_source_locks_guard = threading.Lock()
+
+
+class DocumentNotFoundError(Exception):
+    """No document is registered under the given source."""
+
+
+class SyncResult(NamedTuple):
+    """Chunk counts of one document replace."""
+
+    added: int
+    deleted: int
+    unchanged: int
+
+
+def source_key(source: str | Path) -> str:
+    """Registry key of a source: its file name."""
+    return Path(source).name
+
+
+def source_tag(source: str | Path) -> str:
+    """Cache tag of entries holding chunks of `source`."""
+    return f"source:{source_key(source)}"
+
+
+def chunk_ids(source: str, texts: Iterable[str]) -> List[str]:
+    """Content-derived chunk IDs; repeated texts get an occurrence suffix."""
+    seen: Counter[str] = Counter()
+    ids = []
+    for text in texts:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+        ids.append(f"{source}#{digest}-{seen[digest]}")
+        seen[digest] += 1
+    return ids
+
+
+class DocumentRegistry:
+    """SQLite registry of source -> content hash and chunk IDs."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents (source TEXT PRIMARY KEY,"
+            " sha256 TEXT, version INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS document_chunks (source TEXT NOT NULL,"
+            " chunk_id TEXT NOT NULL, PRIMARY KEY (source, chunk_id))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS document_parents (parent_id TEXT PRIMARY KEY,"
+            " source TEXT NOT NULL, text TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS document_parents_source"
+            " ON document_parents (source)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, source: str) -> Dict | None:
+        """`{"sha256", "version", "updated_at"}` of a source, or None."""
+        row = self._connect().execute(
+            "SELECT sha256, version, updated_at FROM documents WHERE source = ?", (source,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"sha256": row[0], "version": row[1], "updated_at": row[2]}
+
+    def list_sources(self) -> List[Dict]:
+        rows = self._connect().execute(
+            "SELECT d.source, d.sha256, d.version, d.updated_at, COUNT(c.chunk_id)"
+            " FROM documents d LEFT JOIN document_chunks c ON c.source = d.source"
+            " GROUP BY d.source ORDER BY d.source"
+        ).fetchall()
+        return [
+            {"source": r[0], "sha256": r[1], "version": r[2], "updated_at": r[3], "chunks": r[4]}
+            for r in rows
+        ]
+
+    def chunk_ids(self, source: str) -> List[str]:
+        rows = self._connect().execute(
+            "SELECT chunk_id FROM document_chunks WHERE source = ?", (source,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_parents(self, parent_ids: List[str]) -> Dict[str, Document]:
+        """Stored parent windows by ID (missing IDs are left out)."""
+        if not parent_ids:
+            return {}
+        placeholders = ",".join("?" * len(parent_ids))
+        rows = self._connect().execute(
+            "SELECT parent_id, text, metadata FROM document_parents"
+            f" WHERE parent_id IN ({placeholders})",
+            parent_ids,
+        ).fetchall()
+        return {
+            row[0]: Document(id=row[0], page_content=row[1], metadata=json.loads(row[2]))
+            for row in rows
+        }
+
+    def record(
+        self,
+        source: str,
+        sha256: str | None,
+        ids: List[str],
+        parents: Sequence[Document] = (),
+    ) -> None:
+        """Store the current revision of a source, bumping its version."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO documents (source, sha256, version, updated_at)"
+                " VALUES (?, ?, 1, ?) ON CONFLICT(source) DO UPDATE SET"
+                " sha256 = excluded.sha256, version = version + 1,"
+                " updated_at = excluded.updated_at",
+                (source, sha256, time.time()),
+            )
+            conn.execute("DELETE FROM document_chunks WHERE source = ?", (source,))
+            conn.executemany(
+                "INSERT INTO document_chunks (source, chunk_id) VALUES (?, ?)",
+                [(source, chunk_id) for chunk_id in ids],
+            )
+            conn.execute("DELETE FROM document_parents WHERE source = ?", (source,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO document_parents (parent_id, source, text, metadata)"
+                " VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        parent.metadata["parent_id"],
+                        source,
+                        parent.page_content,
+                        json.dumps(parent.metadata, default=str),
+                    )
+                    for parent in parents
+                ],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def remove(self, source: str) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM document_chunks WHERE source = ?", (source,))
+            conn.execute("DELETE FROM document_parents WHERE source = ?", (source,))
+            conn.execute("DELETE FROM documents WHERE source = ?", (source,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+@lru_cache(maxsize=1)
+def get_document_registry() -> DocumentRegistry:
+    """Get the process-wide document registry."""
+    return DocumentRegistry(get_settings().document_registry_path)
+
+
+def _source_lock(source: str) -> threading.Lock:
+    """Lock serializing changes to one source within this process."""
+    with _source_locks_guard:
+        return _source_locks.setdefault(source, threading.Lock())
+
+
+def _delete_vectors(vector_store: VectorStore, ids: List[str]) -> None:
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        vector_store.delete(ids=ids[start : start + DELETE_BATCH_SIZE])
+
+
+def sync_document(
+    vector_store: VectorStore,
+    source: str,
+    chunks: List[Document],
+    sha256: str | None = None,
+    parents: Sequence[Document] = (),
+) -> SyncResult:
+    """Make the indexed chunks of `source` equal to `chunks`.
+
+    Only chunks whose ID (text and parent) is new are embedded and upserted;
+    IDs no longer present are deleted in batches. `parents` replace the
+    stored parent windows of the source.
+    """
+    registry = get_document_registry()
+    ids = chunk_ids(
+        source,
+        [chunk.metadata.get("parent_id", "") + chunk.page_content for chunk in chunks],
+    )
+    new_ids = set(ids)
+
+    with _source_lock(source), tracing.span("documents.sync", source=source) as current:
+        old_ids = set(registry.chunk_ids(source))
+        added = [
+            (chunk_id, chunk) for chunk_id, chunk in zip(ids, chunks) if chunk_id not in old_ids
+        ]
+        removed = sorted(old_ids - new_ids)
+        current.set_attributes(added=len(added), deleted=len(removed))
+        if added:
+            with rate_priority(INDEXING):
+                vector_store.add_documents(
+                    [chunk for _, chunk in added], ids=[chunk_id for chunk_id, _ in added]
+                )
+        if removed:
+            _delete_vectors(vector_store, removed)
+        registry.record(source, sha256, ids, parents)
+
+    cache = get_cache()
+    warm_cache = get_warm_cache()
+    if removed:
+        cache.invalidate_tag(source_tag(source))
+        if warm_cache is not None:
+            warm_cache.invalidate_source(source)
+    if added:
+        cache.bump_corpus_version()
+        if warm_cache is not None:
+            warm_cache.clear()
+    return SyncResult(added=len(added), deleted=len(removed), unchanged=len(new_ids & old_ids))
+
+
+def delete_document(vector_store: VectorStore, source: str) -> int:
+    """Delete all chunks of `source` from the index and the registry.
+
+    Returns:
+        Number of chunks deleted.
+
+    Raises:
+        DocumentNotFoundError: `source` is not registered.
+    """
+    registry = get_document_registry()
+    with _source_lock(source), tracing.span("documents.delete", source=source) as current:
+        if registry.get(source) is None:
+            raise DocumentNotFoundError(f"No indexed document named {source!r}.")
+        ids = registry.chunk_ids(source)
+        current.set_attribute("deleted", len(ids))
+        _delete_vectors(vector_store, ids)
+        registry.remove(source)
+    get_cache().invalidate_tag(source_tag(source))
+    warm_cache = get_warm_cache()
+    if warm_cache is not None:
+        warm_cache.invalidate_source(source)
+    return len(ids)
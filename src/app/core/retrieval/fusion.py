@@ -0,0 +1,112 @@
+"""Multi-query retrieval with concurrent fan-out and rank fusion.
+
+Instead of letting the Retrieval Agent call the tool sequentially, a single
+LLM call produces several query formulations which are then run against the
+vector store concurrently. The ranked result lists are merged with
+Reciprocal Rank Fusion (RRF) and de-duplicated so that each chunk appears
+only once in the merged set.
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .chunks import ChunkRecord, to_records
+from .vector_store import retrieve
+
+
+def reciprocal_rank_fusion(
+    result_lists: Iterable[Sequence[ChunkRecord]],
+    rrf_k: int = 60,
+    limit: int | None = None,
+) -> List[ChunkRecord]:
+    """Fuse several ranked chunk lists into one de-duplicated ranking.
+
+    Each chunk scores ``sum(1 / (rrf_k + rank))`` over every list it
+    appears in, so chunks that several formulations agree on rise to the top.
+    Ties keep the order in which chunks were first seen.
+
+    Args:
+        result_lists: Ranked chunk lists, best match first.
+        rrf_k: RRF damping constant (60 is the value from the original paper).
+        limit: Maximum number of chunks to return (all if None).
+
+    Returns:
+        Chunks ordered by fused score, each chunk appearing once.
+    """
+    scores: Dict[Tuple[str, str, str], float] = {}
+    first_seen: Dict[Tuple[str, str, str], ChunkRecord] = {}
+
+    for records in result_lists:
+        for rank, record in enumerate(records, start=1):
+            key = record.key
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            first_seen.setdefault(key, record)
+
+    # sorted() is stable, so equal scores keep first-seen order.
+    ranked = sorted(first_seen, key=lambda key: scores[key], reverse=True)
+    if limit is not None:
+        ranked = ranked[:limit]
+    return [first_seen[key] for key in ranked]
+
+
+def deduplicate_chunks(records: Iterable[ChunkRecord]) -> List[ChunkRecord]:
+    """Drop repeated chunks, keeping the first occurrence of each."""
+    seen = set()
+    unique = []
+    for record in records:
+        if record.key not in seen:
+            seen.add(record.key)
+            unique.append(record)
+    return unique
+
+
+def _retrieve_records(query: str, k: int | None) -> List[ChunkRecord]:
+    return to_records(retrieve(query, k=k))
+
+
+def retrieve_many(queries: Sequence[str], k: int | None = None) -> List[List[ChunkRecord]]:
+    """Run `retrieve` for several queries concurrently.
+
+    Args:
+        queries: Query formulations to search for.
+        k: Number of documents to retrieve per query (defaults to config value).
+
+    Returns:
+        One ranked chunk list per query, in the same order as `queries`.
+    """
+    if not queries:
+        return []
+    if len(queries) == 1:
+        return [_retrieve_records(queries[0], k)]
+
+    # One context copy per query keeps the caller's deadline and trace.
+    contexts = [contextvars.copy_context() for _ in queries]
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        return list(
+            executor.map(
+                lambda context, query: context.run(_retrieve_records, query, k),
+                contexts,
+                queries,
+            )
+        )
+
+
+def multi_query_retrieve(
+    queries: Sequence[str],
+    k: int | None = None,
+    rrf_k: int = 60,
+    limit: int | None = None,
+) -> List[ChunkRecord]:
+    """Retrieve for every query concurrently and fuse the results by rank.
+
+    Args:
+        queries: Query formulations to search for.
+        k: Number of documents to retrieve per query (defaults to config value).
+        rrf_k: RRF damping constant.
+        limit: Maximum number of fused documents to return.
+
+    Returns:
+        De-duplicated chunks ordered by fused rank.
+    """
+    return reciprocal_rank_fusion(retrieve_many(queries, k=k), rrf_k=rrf_k, limit=limit)
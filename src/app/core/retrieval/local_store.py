@@ -0,0 +1,335 @@
+"""Local on-disk vector store with optional quantized search.
+
+Float32 vectors are appended to a flat file and memory-mapped, so the full
+precision copy lives in the OS page cache rather than the Python heap. With
+quantization enabled, the in-memory search index holds compact codes
+instead:
+
+- "int8": each vector scaled by its max magnitude into int8 (4x smaller).
+- "binary": one sign bit per dimension (32x smaller), searched by Hamming
+  distance.
+
+Quantized search selects `k * rescore_factor` candidates and rescores them
+with the exact float vectors read from the memory map. Deleting vectors
+rewrites both data files without the deleted rows.
+
+Directory layout:
+- `store.json`: embedding fingerprint (model and dimension) of the store
+- `vectors.f32`: row-major float32 vectors
+- `records.jsonl`: one `{"id", "text", "metadata"}` record per vector
+"""
+
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Iterable, List, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+# Number of set bits for every byte value, for Hamming distances.
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Scale each row into int8; returns (codes, per-row scales)."""
+    scales = np.abs(vectors).max(axis=1, keepdims=True) / 127.0
+    scales = np.maximum(scales, 1e-12).astype(np.float32)
+    codes = np.round(vectors / scales).astype(np.int8)
+    return codes, scales[:, 0]
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """Pack the sign bit of every dimension into bytes."""
+    return np.packbits(vectors > 0, axis=1)
+
+
+class LocalVectorStore(VectorStore):
+    """Memory-mapped float vectors with an optional quantized search index."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        embedding: Embeddings,
+        embedding_model: str,
+        quantization: str = "none",
+        rescore_factor: int = 4,
+    ) -> None:
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(
+                f"Unknown quantization {quantization!r}; "
+                f"expected one of {QUANTIZATION_MODES}."
+            )
+
+        self._path = Path(path)
+        self._embedding = embedding
+        self._embedding_model = embedding_model
+        self._quantization = quantization
+        self._rescore_factor = max(rescore_factor, 1)
+        self._lock = threading.Lock()
+
+        self._dimension: int | None = None
+        self._records: List[dict] = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._codes: np.ndarray | None = None
+        self._scales: np.ndarray | None = None
+
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    @property
+    def dimension(self) -> int | None:
+        """Vector dimension of the store (None while empty and new)."""
+        return self._dimension
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # Persistence -----------------------------------------------------------
+
+    @property
+    def _meta_path(self) -> Path:
+        return self._path / "store.json"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self._path / "vectors.f32"
+
+    @property
+    def _records_path(self) -> Path:
+        return self._path / "records.jsonl"
+
+    def _load(self) -> None:
+        """Load an existing store and rebuild the quantized index."""
+        if not self._meta_path.exists():
+            return
+
+        meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+        if meta["embedding_model"] != self._embedding_model:
+            raise ValueError(
+                f"Local vector store at {self._path} was built with "
+                f"{meta['embedding_model']!r}, not {self._embedding_model!r}. "
+                "Re-index or point LOCAL_VECTOR_STORE_PATH elsewhere."
+            )
+        self._dimension = int(meta["dimension"])
+
+        with self._records_path.open(encoding="utf-8") as records:
+            self._records = [json.loads(line) for line in records if line.strip()]
+        self._remap()
+
+    def _remap(self, new_vectors: np.ndarray | None = None) -> None:
+        """(Re)open the float memory map and update the quantized codes.
+
+        Args:
+            new_vectors: Rows just appended; only these are quantized and
+                appended to the codes. None rebuilds codes for every row.
+        """
+        if not self._records:
+            return
+
+        self._vectors = np.memmap(
+            self._vectors_path,
+            dtype=np.float32,
+            mode="r",
+            shape=(len(self._records), self._dimension),
+        )
+        if self._quantization == "none":
+            return
+
+        rows = self._vectors if new_vectors is None else new_vectors
+        if self._quantization == "int8":
+            codes, scales = quantize_int8(rows)
+        else:
+            codes, scales = quantize_binary(rows), None
+
+        if new_vectors is not None and self._codes is not None:
+            codes = np.concatenate([self._codes, codes])
+            if scales is not None:
+                scales = np.concatenate([self._scales, scales])
+        self._codes, self._scales = codes, scales
+
+    def _check_dimension(self, dimension: int) -> None:
+        if self._dimension is None:
+            self._dimension = dimension
+            self._meta_path.write_text(
+                json.dumps(
+                    {"embedding_model": self._embedding_model, "dimension": dimension}
+                ),
+                encoding="utf-8",
+            )
+        elif dimension != self._dimension:
+            raise ValueError(
+                f"Embedding dimension {dimension} does not match the local vector "
+                f"store dimension {self._dimension}."
+            )
+
+    # VectorStore API -------------------------------------------------------
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: List[dict] | None = None,
+        *,
+        ids: List[str] | None = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+
+        vectors = _normalize(
+            np.asarray(self._embedding.embed_documents(texts), dtype=np.float32)
+        )
+
+        with self._lock:
+            self._check_dimension(vectors.shape[1])
+            with self._vectors_path.open("ab") as out:
+                out.write(vectors.tobytes())
+            with self._records_path.open("a", encoding="utf-8") as out:
+                for doc_id, text, metadata in zip(ids, texts, metadatas):
+                    record = {"id": doc_id, "text": text, "metadata": metadata}
+                    out.write(json.dumps(record) + "\n")
+                    self._records.append(record)
+            self._remap(new_vectors=vectors)
+
+        return ids
+
+    def delete(self, ids: List[str] | None = None, **kwargs: Any) -> bool:
+        """Delete vectors by ID, rewriting the vector and record files."""
+        if not ids:
+            return False
+        doomed = set(ids)
+        with self._lock:
+            keep = [row for row, record in enumerate(self._records) if record["id"] not in doomed]
+            if len(keep) == len(self._records):
+                return False
+
+            vectors = np.asarray(self._vectors[keep], dtype=np.float32)
+            records = [self._records[row] for row in keep]
+            tmp_vectors = self._vectors_path.with_suffix(".tmp")
+            tmp_records = self._records_path.with_suffix(".tmp")
+            tmp_vectors.write_bytes(vectors.tobytes())
+            with tmp_records.open("w", encoding="utf-8") as out:
+                for record in records:
+                    out.write(json.dumps(record) + "\n")
+            os.replace(tmp_vectors, self._vectors_path)
+            os.replace(tmp_records, self._records_path)
+
+            self._records = records
+            self._codes = self._scales = None
+            if records:
+                self._remap()
+            else:
+                self._vectors = np.zeros((0, self._dimension or 0), dtype=np.float32)
+        return True
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: List[float], k: int = 4
+    ) -> List[Tuple[Document, float]]:
+        """Search by query vector; scores are cosine similarities."""
+        with self._lock:
+            if not self._records:
+                return []
+            query = _normalize(np.asarray([embedding], dtype=np.float32))[0]
+            if query.shape[0] != self._dimension:
+                raise ValueError(
+                    f"Query dimension {query.shape[0]} does not match the local "
+                    f"vector store dimension {self._dimension}."
+                )
+            rows, scores = self._search(query, k)
+            records = [self._records[row] for row in rows]
+
+        return [
+            (
+                Document(
+                    id=record["id"],
+                    page_content=record["text"],
+                    metadata=record["metadata"],
+                ),
+                float(score),
+            )
+            for record, score in zip(records, scores)
+        ]
+
+    def _search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (row indices, cosine scores) of the top-k vectors."""
+        count = len(self._records)
+        k = min(k, count)
+
+        if self._quantization == "none":
+            candidates = np.arange(count)
+        else:
+            if self._quantization == "int8":
+                query_codes, query_scale = quantize_int8(query[None, :])
+                dots = self._codes.astype(np.int32) @ query_codes[0].astype(np.int32)
+                approx = dots * (self._scales * query_scale[0])
+            else:
+                query_bits = quantize_binary(query[None, :])
+                distance = _POPCOUNT[np.bitwise_xor(self._codes, query_bits)]
+                approx = -distance.sum(axis=1, dtype=np.int32)
+            shortlist = min(k * self._rescore_factor, count)
+            candidates = np.argpartition(-approx, shortlist - 1)[:shortlist]
+
+        # Exact float rescoring of the candidates.
+        scores = np.asarray(self._vectors[candidates]) @ query
+        top = np.argsort(-scores)[:k]
+        return candidates[top], scores[top]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(
+            self._embedding.embed_query(query), k=k
+        )
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k)]
+
+    def _select_relevance_score_fn(self):
+        return lambda score: (score + 1.0) / 2.0
+
+    def memory_usage(self) -> dict:
+        """Bytes held by the search index in RAM and by the float file on disk."""
+        index_bytes = (
+            self._codes.nbytes + (self._scales.nbytes if self._scales is not None else 0)
+            if self._codes is not None
+            else self._vectors.nbytes
+        )
+        return {
+            "index_bytes": int(index_bytes),
+            "float_bytes": int(len(self._records) * (self._dimension or 0) * 4),
+        }
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: List[dict] | None = None,
+        *,
+        ids: List[str] | None = None,
+        path: str | Path = "data/vector_store",
+        embedding_model: str = "unknown",
+        **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(path, embedding, embedding_model=embedding_model, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -0,0 +1,87 @@
+"""Small-to-big retrieval: embed small child chunks, answer with parents.
+
+With `chunk_strategy = "parent_child"`, ingestion loads a PDF page by page
+and splits every page into parent windows of at most `parent_chunk_size`
+characters (a short page is a single parent), then every parent into child
+chunks of `child_chunk_size` characters. Only the children are embedded;
+each carries the `parent_id` of its window in its metadata. Parents are kept
+in the document registry's SQLite database, not in the vector index.
+
+At query time `retrieve()` searches `k * parent_child_fanout` children and
+returns the distinct parents of the best-ranked children, in rank order, as
+Documents with the parent text and page. The summarizer therefore sees whole
+passages cited by page, while similarity is computed on precise children.
+Children without a stored parent (e.g. indexed with the flat strategy) are
+returned as they are.
+"""
+
+import hashlib
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from ..config import get_settings
+from .documents import get_document_registry
+
+CHUNK_STRATEGIES = ("flat", "parent_child")
+
+
+def parent_id(source: str, page: int | str, text: str) -> str:
+    """Content-derived ID of a parent window."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+    return f"{source}#p{page}-{digest}"
+
+
+def split_parent_child(
+    pages: List[Document], source: str
+) -> Tuple[List[Document], List[Document]]:
+    """Split loaded pages into (children, parents).
+
+    Args:
+        pages: One Document per page, as loaded by `PyPDFLoader`.
+        source: Registry key of the document the pages belong to.
+    """
+    settings = get_settings()
+    parent_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=settings.parent_chunk_size,
+        chunk_overlap=settings.parent_chunk_overlap,
+    )
+    child_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=settings.child_chunk_size,
+        chunk_overlap=settings.child_chunk_overlap,
+    )
+
+    children: List[Document] = []
+    parents: List[Document] = []
+    for parent in parent_splitter.split_documents(pages):
+        pid = parent_id(source, parent.metadata.get("page", ""), parent.page_content)
+        parent.metadata["parent_id"] = pid
+        parents.append(parent)
+        children.extend(child_splitter.split_documents([parent]))
+    return children, parents
+
+
+def expand_to_parents(children: List[Document], k: int) -> List[Document]:
+    """Replace ranked child chunks by their distinct parents (at most `k`)."""
+    ranked_ids: List[str] = []
+    for child in children:
+        pid = child.metadata.get("parent_id")
+        if pid and pid not in ranked_ids:
+            ranked_ids.append(pid)
+    parents = get_document_registry().get_parents(ranked_ids)
+
+    results: List[Document] = []
+    seen = set()
+    for child in children:
+        pid = child.metadata.get("parent_id")
+        if pid in parents:
+            if pid in seen:
+                continue
+            seen.add(pid)
+            results.append(parents[pid])
+        else:
+            results.append(child)
+        if len(results) == k:
+            break
+    return results
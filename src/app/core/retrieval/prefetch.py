@@ -0,0 +1,142 @@
+"""Short-lived cache of retrieval results warmed by `/qa/prefetch`.
+
+While the user is still typing, the prefetch service retrieves for the
+partial question and stores the results here for `prefetch_ttl_seconds`.
+`retrieve()` consults this cache first: a query matches a warm entry when,
+after normalization (case, whitespace, trailing punctuation), it equals the
+prefetched text or extends it by at most `prefetch_extension_chars`
+characters, which covers the last keystrokes typed after the final prefetch.
+Like the shared cache, entries are invalidated when documents change (see
+`documents.sync_document` / `delete_document`): replacing or deleting a
+document drops the entries holding its chunks, and indexing new chunks
+clears the cache. Each change also bumps a generation number, so a prefetch
+that was already retrieving when the documents changed does not store its
+(possibly stale) results.
+
+Lookups are counted in `prefetch_lookups_total{result="hit"|"miss"}`, whose
+ratio is the prefetch hit rate.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from functools import lru_cache
+from typing import FrozenSet, List, Tuple
+
+from langchain_core.documents import Document
+
+from .. import metrics
+from ..config import get_settings
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """Canonical form used to match prefetched and submitted questions."""
+    return _WHITESPACE.sub(" ", text).strip().lower().rstrip("?.! ")
+
+
+def extends_prefetched(question: str, prefetched: str, extension_chars: int) -> bool:
+    """Whether `question` can reuse the results prefetched for `prefetched`.
+
+    True when, after normalization, it equals `prefetched` or extends it by
+    at most `extension_chars` characters.
+    """
+    question, prefetched = normalize_question(question), normalize_question(prefetched)
+    return (
+        question.startswith(prefetched)
+        and len(question) - len(prefetched) <= extension_chars
+    )
+
+
+class WarmRetrievalCache:
+    """Bounded, TTL-limited map of normalized query -> retrieved documents."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int, extension_chars: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_entries = max(max_entries, 1)
+        self._extension_chars = max(extension_chars, 0)
+        # query -> (expires_at, k, documents, sources of the documents)
+        self._entries: "OrderedDict[str, Tuple[float, int, List[Document], FrozenSet[str]]]" = (
+            OrderedDict()
+        )
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Number of invalidations so far; pass it back to `put`."""
+        return self._generation
+
+    def put(
+        self, query: str, k: int, docs: List[Document], generation: int | None = None
+    ) -> None:
+        """Store results retrieved for `query`.
+
+        Results retrieved before an invalidation (`generation` older than the
+        current one) are discarded.
+        """
+        key = normalize_question(query)
+        # Keyed by file name, like `documents.source_key`.
+        sources = frozenset(
+            Path(str(doc.metadata["source"])).name
+            for doc in docs
+            if doc.metadata.get("source")
+        )
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self._ttl, k, docs, sources)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_source(self, source: str) -> None:
+        """Drop every entry holding chunks of `source` (a file name)."""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key, entry in self._entries.items() if source in entry[3]]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def get(self, query: str, k: int) -> List[Document] | None:
+        """Warm results for `query` (or a prefix of it), or None."""
+        key = normalize_question(query)
+        now = time.monotonic()
+        with self._lock:
+            best = None
+            for warm_key, (expires_at, warm_k, docs, _) in list(self._entries.items()):
+                if expires_at <= now:
+                    del self._entries[warm_key]
+                    continue
+                if warm_k < k or not extends_prefetched(key, warm_key, self._extension_chars):
+                    continue
+                if best is None or len(warm_key) > len(best[0]):
+                    best = (warm_key, docs)
+        metrics.increment("prefetch_lookups_total", result="miss" if best is None else "hit")
+        return None if best is None else best[1][:k]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@lru_cache(maxsize=1)
+def _warm_cache() -> WarmRetrievalCache:
+    settings = get_settings()
+    return WarmRetrievalCache(
+        ttl_seconds=settings.prefetch_ttl_seconds,
+        max_entries=settings.prefetch_max_entries,
+        extension_chars=settings.prefetch_extension_chars,
+    )
+
+
+def get_warm_cache() -> WarmRetrievalCache | None:
+    """The process-wide warm cache, or None while prefetch is disabled."""
+    return _warm_cache() if get_settings().prefetch_enabled else None
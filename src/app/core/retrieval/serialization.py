@@ -1,9 +1,18 @@
-"""Utilities for serializing retrieved document chunks."""
+"""Utilities for serializing retrieved document chunks.
+
+`render_context` and `render_citations` render a per-request chunk table
+(see `chunks.py`) on demand; `serialize_chunks_with_citations` keeps the
+Document-based interface on top of them.
+"""
 
 from typing import List, Tuple
 
 from langchain_core.documents import Document
 
+from .chunks import ChunkTable, build_chunk_table, to_records
+
+SNIPPET_LENGTH = 100
+
 
 def serialize_chunks(docs: List[Document]) -> str:
     """Serialize a list of Document objects into a formatted CONTEXT string.
@@ -62,29 +71,35 @@ def serialize_chunks_with_citations(
                            ...
                        }
     """
-    context_parts = []
-    citation_map = {}
+    chunks = build_chunk_table(to_records(docs))
+    return render_context(chunks), render_citations(chunks)
 
-    for idx, doc in enumerate(docs, start=1):
-        chunk_id = f"C{idx}"
-        page_num = doc.metadata.get("page") or doc.metadata.get(
-            "page_number", "unknown"
-        )
-        source = doc.metadata.get("source", "unknown")
-        content = doc.page_content.strip()
 
-        # Create citation map entry with metadata
-        citation_map[chunk_id] = {
-            "page": page_num,
-            "snippet": content[:100] + "..." if len(content) > 100 else content,
-            "source": source,
-            "full_content": content,
-        }
+def render_context(chunks: ChunkTable) -> str:
+    """Render a chunk table as the CONTEXT string given to the agents.
 
-        # Format chunk with citation ID
-        chunk_header = f"[{chunk_id}] Chunk from page {page_num}:"
-        context_parts.append(f"{chunk_header}\n{content}")
+    Format: "[C1] Chunk from page X:\n<text>" blocks separated by blank lines.
+    """
+    return "\n\n".join(
+        f"[{chunk_id}] Chunk from page {record.page}:\n{record.text}"
+        for chunk_id, record in chunks.items()
+    )
 
-    context_str = "\n\n".join(context_parts)
 
-    return context_str, citation_map
+def render_citations(chunks: ChunkTable) -> dict:
+    """Render the citation map exposed in API responses.
+
+    Returns:
+        Dict mapping chunk IDs to `page`, `snippet`, `source` and
+        `full_content`.
+    """
+    citation_map = {}
+    for chunk_id, record in chunks.items():
+        text = record.text
+        citation_map[chunk_id] = {
+            "page": record.page,
+            "snippet": text[:SNIPPET_LENGTH] + "..." if len(text) > SNIPPET_LENGTH else text,
+            "source": record.source,
+            "full_content": text,
+        }
+    return citation_map
@@ -1,32 +1,159 @@
-"""Vector store wrapper for Pinecone integration with LangChain."""
+"""Vector store wrapper for Pinecone integration with LangChain.
 
+Embeddings can be requested with reduced output dimensions
+(`openai_embedding_dimensions`); the same setting is used at index and query
+time, and the store refuses to run against an index built with other
+embeddings. A Pinecone index records the `embedding_fingerprint()` it was
+built with in a marker record of a reserved namespace (see
+`check_index_embeddings`), like the local store does in its `store.json`.
+
+Embeddings come from the provider selected by `embedding_provider` (see
+`llm.embeddings`). OpenAI embedding calls are paced by the shared rate
+scheduler; indexing runs at lower priority than query embeddings.
+
+Retrieval results are cached in the shared cache (`core.cache`) for
+`retrieval_cache_ttl_seconds`, bound to the corpus version that indexing
+bumps, so no worker serves results from before a new document was indexed.
+Cached results are tagged with their sources so that deleting a document
+only invalidates the results that contained it.
+
+Documents are indexed per source (see `documents.py`), so a new revision
+of a PDF replaces its chunks incrementally instead of adding a second copy.
+With `chunk_strategy = "parent_child"`, small child chunks are embedded and
+`retrieve()` returns their parent windows (see `parents.py`).
+
+Results prefetched while the user was typing (see `prefetch.py`) are served
+before the shared cache is consulted.
+"""
+
+import logging
 from pathlib import Path
 from functools import lru_cache
-from typing import List
+from typing import Any, List, Tuple
 
 from pinecone import Pinecone
 from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
 from langchain_pinecone import PineconeVectorStore
-from langchain_openai import OpenAIEmbeddings
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 
+from .. import tracing
+from ..cache import cached_lookup, get_cache, make_key
 from ..config import get_settings
+from ..llm.embeddings import (  # noqa: F401 - re-exported for the scripts
+    create_embeddings,
+    embedding_dimension,
+    embedding_fingerprint,
+)
+from .documents import SyncResult, delete_document, source_key, source_tag, sync_document
+from .local_store import LocalVectorStore
+from .parents import expand_to_parents, split_parent_child
+from .prefetch import get_warm_cache
+
+logger = logging.getLogger(__name__)
+
+
+def check_index_dimension(index_dimension: int | None) -> None:
+    """Refuse to query or upsert into an index of a different dimension."""
+    expected = embedding_dimension()
+    if index_dimension and expected and index_dimension != expected:
+        raise ValueError(
+            f"Pinecone index dimension {index_dimension} does not match the "
+            f"configured embeddings ({embedding_fingerprint()}, {expected} "
+            "dimensions). Configure the provider and dimensions the index was "
+            "built with, or re-index."
+        )
+
+
+# Reserved namespace and ID of the record holding the index's embedding
+# fingerprint. Queries and upserts use the default namespace, so the marker
+# is never returned as a search result.
+FINGERPRINT_NAMESPACE = "__index_meta__"
+FINGERPRINT_RECORD_ID = "embedding-fingerprint"
+
+
+def check_index_embeddings(index: Any, claim: bool = False) -> dict:
+    """Refuse to use a Pinecone index built with other embeddings.
+
+    The index dimension must match the configured embeddings, and so must the
+    fingerprint recorded in the index's marker record. An empty index without
+    a marker is claimed by recording the current fingerprint. A non-empty
+    index without one (built before markers existed) is only claimed by the
+    indexing path (`claim=True`); the query path cannot tell which embeddings
+    built it, so it logs a warning and leaves the index unmarked.
+
+    Args:
+        index: Pinecone index client.
+        claim: Record the fingerprint on an unmarked non-empty index.
+
+    Returns:
+        The index stats (`describe_index_stats()`).
+
+    Raises:
+        ValueError: The dimension or the recorded fingerprint differs.
+    """
+    stats = index.describe_index_stats()
+    dimension = stats.get("dimension")
+    check_index_dimension(dimension)
+
+    fingerprint = embedding_fingerprint()
+    marker = index.fetch(ids=[FINGERPRINT_RECORD_ID], namespace=FINGERPRINT_NAMESPACE)
+    record = marker.vectors.get(FINGERPRINT_RECORD_ID)
+    if record is not None:
+        recorded = (record.metadata or {}).get("embedding_fingerprint")
+        if recorded != fingerprint:
+            raise ValueError(
+                f"Pinecone index was built with {recorded!r} embeddings, not "
+                f"{fingerprint!r}. Configure the provider and model the index "
+                "was built with, or re-index."
+            )
+    elif dimension and not (claim or stats.get("total_vector_count") == 0):
+        logger.warning(
+            "Pinecone index has no embedding fingerprint; assuming it was built "
+            "with %s embeddings. Run the indexer to record the fingerprint.",
+            fingerprint,
+        )
+    elif dimension:
+        # Dense vectors need a non-zero value; the marker is never queried.
+        values = [1.0] + [0.0] * (int(dimension) - 1)
+        index.upsert(
+            vectors=[
+                {
+                    "id": FINGERPRINT_RECORD_ID,
+                    "values": values,
+                    "metadata": {"embedding_fingerprint": fingerprint},
+                }
+            ],
+            namespace=FINGERPRINT_NAMESPACE,
+            show_progress=False,
+        )
+    return stats
 
 
 @lru_cache(maxsize=1)
-def _get_vector_store() -> PineconeVectorStore:
-    """Create a PineconeVectorStore instance configured from settings."""
+def _get_vector_store() -> VectorStore:
+    """Create the vector store configured from settings.
+
+    Returns a PineconeVectorStore by default, or a LocalVectorStore when
+    `vector_store_backend` is "local".
+    """
     settings = get_settings()
+    embeddings = create_embeddings()
+
+    if settings.vector_store_backend == "local":
+        return LocalVectorStore(
+            settings.local_vector_store_path,
+            embeddings,
+            embedding_model=embedding_fingerprint(),
+            quantization=settings.vector_quantization,
+            rescore_factor=settings.quantization_rescore_factor,
+        )
 
     pc = Pinecone(api_key=settings.pinecone_api_key)
     index = pc.Index(settings.pinecone_index_name)
-
-    embeddings = OpenAIEmbeddings(
-        model=settings.openai_embedding_model_name,
-        api_key=settings.openai_api_key,
-    )
+    check_index_embeddings(index)
 
     return PineconeVectorStore(
         index=index,
@@ -40,7 +167,7 @@ def get_retriever(k: int | None = None):
         k: Number of documents to retrieve (defaults to config value).
 
     Returns:
-        PineconeVectorStore instance configured as a retriever.
+        Retriever over the configured vector store.
     """
     settings = get_settings()
     if k is None:
@@ -50,34 +177,111 @@ def get_retriever(k: int | None = None):
     return vector_store.as_retriever(search_kwargs={"k": k})
 
 
-def retrieve(query: str, k: int | None = None) -> List[Document]:
+def retrieve(query: str, k: int | None = None, use_prefetched: bool = True) -> List[Document]:
     """Retrieve documents from Pinecone for a given query.
 
     Args:
         query: Search query string.
         k: Number of documents to retrieve (defaults to config value).
+        use_prefetched: Serve results prefetched for the query (or a prefix
+            of it) while the user was typing, when available.
 
     Returns:
         List of Document objects with metadata (including page numbers).
     """
-    retriever = get_retriever(k=k)
-    return retriever.invoke(query)
+    settings = get_settings()
+    k = k or settings.retrieval_k
+    with tracing.span("retrieve", k=k) as current:
+        warm_cache = get_warm_cache() if use_prefetched else None
+        if warm_cache is not None:
+            docs = warm_cache.get(query, k)
+            current.set_attribute("prefetch_hit", docs is not None)
+            if docs is not None:
+                current.set_attribute("results", len(docs))
+                return docs
 
-def index_documents(file_path: Path) -> int:
-    """Index a list of Document objects into the Pinecone vector store.
+        key = make_key(
+            "retrieve",
+            query,
+            k,
+            settings.vector_store_backend,
+            settings.pinecone_index_name,
+            embedding_fingerprint(),
+            settings.chunk_strategy,
+        )
+        docs = cached_lookup("retrieve", key)
+        current.set_attribute("cache_hit", docs is not None)
+        if docs is None:
+            if settings.chunk_strategy == "parent_child":
+                children = get_retriever(k=k * settings.parent_child_fanout).invoke(query)
+                docs = expand_to_parents(children, k)
+            else:
+                docs = get_retriever(k=k).invoke(query)
+            sources = {doc.metadata.get("source") for doc in docs} - {None}
+            get_cache().set(
+                key,
+                docs,
+                ttl=settings.retrieval_cache_ttl_seconds,
+                corpus_bound=True,
+                tags=[source_tag(source) for source in sources],
+            )
+        current.set_attribute("results", len(docs))
+        return docs
 
-    Args:
-        docs: Documents to embed and upsert into the vector index.
 
-    Returns:
-        The number of documents indexed.
-    """
+def _split_pdf(file_path: Path) -> Tuple[List[Document], List[Document]]:
+    """Split a PDF into indexable chunks and (small-to-big only) parents."""
+    if get_settings().chunk_strategy == "parent_child":
+        pages = PyPDFLoader(str(file_path), mode="page").load()
+        return split_parent_child(pages, source_key(file_path))
+
     loader = PyPDFLoader(str(file_path), mode="single")
     docs = loader.load()
 
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    texts = text_splitter.split_documents(docs)
+    return text_splitter.split_documents(docs), []
 
-    vector_store = _get_vector_store()
-    vector_store.add_documents(texts)
-    return len(texts)
\ No newline at end of file
+
+def replace_document(file_path: Path, sha256: str | None = None) -> SyncResult:
+    """Index a PDF as the current revision of its source (the file name).
+
+    Only chunks that are new in this revision are embedded and upserted;
+    chunks no longer present are deleted.
+
+    Args:
+        file_path: PDF on disk; its file name identifies the document.
+        sha256: Content hash recorded in the document registry.
+
+    Returns:
+        Counts of added, deleted and unchanged chunks.
+    """
+    chunks, parents = _split_pdf(file_path)
+    return sync_document(
+        _get_vector_store(), source_key(file_path), chunks, sha256, parents
+    )
+
+
+def remove_document(source: str) -> int:
+    """Delete every chunk of a document from the vector store.
+
+    Returns:
+        Number of chunks deleted.
+
+    Raises:
+        DocumentNotFoundError: No document is registered under `source`.
+    """
+    return delete_document(_get_vector_store(), source)
+
+
+def index_documents(file_path: Path, sha256: str | None = None) -> int:
+    """Index a PDF into the configured vector store.
+
+    Args:
+        file_path: PDF on disk; its file name identifies the document.
+        sha256: Content hash recorded in the document registry.
+
+    Returns:
+        The number of chunks of the document.
+    """
+    result = replace_document(file_path, sha256)
+    return result.added + result.unchanged
@@ -0,0 +1,166 @@
+"""Per-request tracing spans with a pluggable exporter.
+
+`span(name, **attributes)` opens a span as a child of the current span (a
+context variable, so it follows the request into worker threads that copy
+the context, as `run_in_threadpool` and the graph's helpers do). Finished
+spans are handed to the configured `SpanExporter`; `JsonLinesExporter`
+appends one JSON object per span to `tracing_file`.
+
+When `tracing_enabled` is false, `span` returns a shared no-op object, so
+instrumented code pays one flag check per span.
+
+Example:
+    with span("retrieve", k=4) as current:
+        docs = ...
+        current.set_attribute("results", len(docs))
+"""
+
+import json
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Dict
+
+from .config import get_settings
+
+
+class SpanExporter(ABC):
+    """Receives every finished span."""
+
+    @abstractmethod
+    def export(self, span: Dict[str, Any]) -> None:
+        """Export one finished span (as returned by `Span.to_dict`)."""
+
+
+class JsonLinesExporter(SpanExporter):
+    """Append spans as JSON lines to a local file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict[str, Any]) -> None:
+        line = json.dumps(span, default=str) + "\n"
+        with self._lock, self._path.open("a", encoding="utf-8") as out:
+            out.write(line)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "error",
+        "_token",
+    )
+
+    def __init__(self, name: str, parent: "Span | None", attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: str | None = None
+        self._token: Token | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled."""
+
+    __slots__ = ()
+    trace_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_exporter: SpanExporter | None = None
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def set_exporter(exporter: SpanExporter | None) -> None:
+    """Install an exporter (None disables tracing)."""
+    global _exporter, _configured
+    _exporter = exporter
+    _configured = True
+
+
+def _configure() -> None:
+    """Create the exporter selected by settings on first use."""
+    with _configure_lock:
+        if _configured:
+            return
+        settings = get_settings()
+        set_exporter(
+            JsonLinesExporter(settings.tracing_file) if settings.tracing_enabled else None
+        )
+
+
+def span(name: str, **attributes: Any) -> Span | _NoopSpan:
+    """Open a span (use as a context manager) under the current span."""
+    if not _configured:
+        _configure()
+    if _exporter is None:
+        return _NOOP_SPAN
+    return Span(name, _current_span.get(), attributes)
+
+
+def current_span() -> Span | _NoopSpan:
+    """The innermost open span (a no-op span outside any trace)."""
+    return _current_span.get() or _NOOP_SPAN
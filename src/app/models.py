@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class QuestionRequest(BaseModel):
@@ -6,9 +6,19 @@ class QuestionRequest(BaseModel):
 
     The PRD specifies a single field named `question` that contains
     the user's natural language question about the vector databases paper.
+
+    `session_id` is optional: requests sharing a session ID form a
+    conversation, so follow-up questions reuse earlier retrieval.
     """
 
     question: str
+    session_id: str | None = Field(default=None, max_length=128)
+
+
+class PrefetchRequest(BaseModel):
+    """Request body for the `/qa/prefetch` endpoint: the partial question."""
+
+    question: str = Field(max_length=2000)
 
 
 class QAResponse(BaseModel):
@@ -19,8 +29,22 @@ class QAResponse(BaseModel):
 
     Enhancement for Feature 4 (Evidence-Aware Answers):
     - `citations`: Maps chunk IDs (C1, C2, etc.) to metadata for traceable sources
+
+    `session_id` echoes the conversation session the answer belongs to.
+
+    `grounding` reports the local citation-support score of each draft
+    sentence (used to decide whether the Verification Agent could be skipped).
+
+    Deadlines: `verified` is False when the answer was returned without
+    (complete) verification because the request deadline was near, and
+    `status` is "partial" when the deadline passed before an answer was
+    drafted (the citations of the retrieved chunks are still returned).
     """
 
     answer: str
     context: str
     citations: dict[str, dict] | None = None
+    session_id: str | None = None
+    grounding: list[dict] | None = None
+    verified: bool | None = None
+    status: str = "complete"
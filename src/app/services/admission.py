@@ -0,0 +1,124 @@
+"""Admission control for QA requests.
+
+At most `qa_max_concurrency` QA graph runs execute at once. Further requests
+wait in a bounded queue (`qa_max_queue`) for at most
+`qa_max_queue_wait_seconds`; requests arriving at a full queue, or waiting
+too long, are rejected straight away with `OverloadedError` so the API can
+answer 429 with a `Retry-After` hint instead of accepting work that would
+only finish after the client has given up.
+
+Metrics:
+- `qa_active_requests` / `qa_queue_depth` gauges
+- `qa_admitted_total` and `qa_rejected_total{reason}` counters
+- `qa_queue_wait_seconds` summary
+"""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator
+
+from ..core import metrics
+from ..core.config import get_settings
+
+# Weight of the latest run in the moving average of run durations.
+_DURATION_SMOOTHING = 0.2
+# Assumed run duration before the first run has finished.
+_INITIAL_RUN_SECONDS = 5.0
+
+
+class OverloadedError(Exception):
+    """The QA service is at capacity; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, time-limited wait queue.
+
+    Must be used from a single event loop (the API server's).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        max_wait_seconds: float,
+    ) -> None:
+        self._max_concurrency = max(max_concurrency, 1)
+        self._max_queue = max(max_queue, 0)
+        self._max_wait_seconds = max_wait_seconds
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._waiting = 0
+        self._run_seconds = _INITIAL_RUN_SECONDS
+
+    def retry_after(self) -> int:
+        """Estimate in whole seconds until a queue slot is likely to free up."""
+        batches = (self._waiting + 1) / self._max_concurrency
+        return max(1, math.ceil(self._run_seconds * batches))
+
+    def _reject(self, reason: str, message: str) -> OverloadedError:
+        metrics.increment("qa_rejected_total", reason=reason)
+        return OverloadedError(message, retry_after=self.retry_after())
+
+    async def _wait_for_slot(self) -> None:
+        """Queue for a slot for at most `max_wait_seconds`."""
+        self._waiting += 1
+        metrics.set_gauge("qa_queue_depth", self._waiting)
+        try:
+            await asyncio.wait_for(
+                self._semaphore.acquire(), timeout=self._max_wait_seconds
+            )
+        except asyncio.TimeoutError:
+            raise self._reject(
+                "queue_timeout", "Timed out waiting for a free QA slot."
+            ) from None
+        finally:
+            self._waiting -= 1
+            metrics.set_gauge("qa_queue_depth", self._waiting)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Wait for an execution slot and hold it for the `async with` body.
+
+        Raises:
+            OverloadedError: The queue is full or the wait exceeded
+                `max_wait_seconds`.
+        """
+        queued_at = time.monotonic()
+        if not self._semaphore.locked():
+            # A free slot is taken without suspending, so concurrent
+            # arrivals cannot all see the semaphore as free.
+            await self._semaphore.acquire()
+        elif self._waiting >= self._max_queue:
+            raise self._reject("queue_full", "The QA service is at capacity.")
+        else:
+            await self._wait_for_slot()
+
+        metrics.observe("qa_queue_wait_seconds", time.monotonic() - queued_at)
+        metrics.increment("qa_admitted_total")
+        metrics.add_gauge("qa_active_requests", 1)
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+            metrics.add_gauge("qa_active_requests", -1)
+            self._run_seconds += _DURATION_SMOOTHING * (
+                time.monotonic() - started_at - self._run_seconds
+            )
+
+
+@lru_cache(maxsize=1)
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide QA admission controller."""
+    settings = get_settings()
+    return AdmissionController(
+        max_concurrency=settings.qa_max_concurrency,
+        max_queue=settings.qa_max_queue,
+        max_wait_seconds=settings.qa_max_queue_wait_seconds,
+    )
@@ -1,21 +1,305 @@
-"""Service functions for indexing documents into the vector database."""
+"""Service functions for indexing documents into the vector database.
 
+PDF uploads are copied to disk in fixed-size chunks rather than read into
+memory. While copying, the upload is checked for the PDF magic bytes,
+capped at `max_upload_bytes` and hashed, so that oversized, non-PDF and
+duplicate uploads are rejected before any parsing happens. (The request
+body itself is capped while it is received, by the API's
+`RequestSizeLimitMiddleware`.)
+
+A document is identified by its stored file name. Uploading a new revision
+under the same name (`replace_stored_upload`) re-indexes only the chunks
+that changed; the previous file is kept aside until the new revision is
+indexed, and `delete_uploaded_document` removes a document from the index,
+the manifest and the upload directory.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
 from pathlib import Path
+from typing import NamedTuple
+
+from fastapi import UploadFile
+
+from ..core.config import get_settings
+from ..core.retrieval.documents import SyncResult
+from ..core.retrieval.vector_store import (
+    index_documents,
+    remove_document,
+    replace_document,
+)
+
+PDF_MAGIC = b"%PDF-"
+_MANIFEST_NAME = ".manifest.json"
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+_manifest_lock = threading.Lock()
+_in_flight: set[str] = set()
+
+
+class UploadError(Exception):
+    """Base class for uploads rejected before indexing."""
+
+
+class InvalidUploadError(UploadError):
+    """The upload is empty or is not a PDF."""
+
+
+class UploadTooLargeError(UploadError):
+    """The upload exceeds `max_upload_bytes`."""
+
+
+class DuplicateUploadError(UploadError):
+    """A file with identical content was already uploaded."""
+
+
+class StoredUpload(NamedTuple):
+    """An upload saved to disk but not yet indexed.
+
+    `previous` is the backup of the file a replacement overwrote (None for
+    new documents); it is restored if the new revision fails to index.
+    """
+
+    path: Path
+    sha256: str
+    size: int
+    previous: Path | None = None
+
+
+def _safe_filename(filename: str | None) -> str:
+    """Reduce a client-supplied filename to a safe basename ending in .pdf."""
+    name = Path((filename or "").replace("\\", "/")).name
+    stem = _UNSAFE_FILENAME_CHARS.sub("_", Path(name).stem).strip("._") or "upload"
+    return f"{stem[:100]}.pdf"
+
+
+def check_source_name(source: str) -> None:
+    """Reject document names that are not plain stored PDF file names.
+
+    Raises:
+        InvalidUploadError: `source` is not a name `store_pdf_upload` produces.
+    """
+    if source != _safe_filename(source):
+        raise InvalidUploadError(f"Invalid document name {source!r}.")
+
+
+def _manifest_path(upload_dir: Path) -> Path:
+    return upload_dir / _MANIFEST_NAME
+
+
+def _load_manifest(upload_dir: Path) -> dict[str, str]:
+    """Load the content-hash -> filename manifest of indexed uploads."""
+    path = _manifest_path(upload_dir)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _reserve_hash(upload_dir: Path, sha256: str, replacing: str | None = None) -> None:
+    """Claim a content hash for indexing, rejecting duplicates.
+
+    Content already stored under `replacing` (the file being replaced) is
+    not a duplicate.
+    """
+    with _manifest_lock:
+        existing = _load_manifest(upload_dir).get(sha256)
+        if (existing is not None and existing != replacing) or sha256 in _in_flight:
+            raise DuplicateUploadError(
+                f"This file was already uploaded as {existing or 'another upload'}."
+            )
+        _in_flight.add(sha256)
+
+
+def _write_manifest(upload_dir: Path, manifest: dict[str, str]) -> None:
+    tmp_path = _manifest_path(upload_dir).with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_path, _manifest_path(upload_dir))
+
+
+def _commit_hash(upload_dir: Path, sha256: str, filename: str) -> None:
+    """Record an indexed upload as the only revision of `filename`."""
+    with _manifest_lock:
+        manifest = {
+            digest: name
+            for digest, name in _load_manifest(upload_dir).items()
+            if name != filename
+        }
+        manifest[sha256] = filename
+        _write_manifest(upload_dir, manifest)
+        _in_flight.discard(sha256)
+
 
-from langchain_community.document_loaders import PyPDFLoader
+def _forget_file(upload_dir: Path, filename: str) -> None:
+    """Drop every manifest entry of `filename`."""
+    with _manifest_lock:
+        manifest = _load_manifest(upload_dir)
+        kept = {digest: name for digest, name in manifest.items() if name != filename}
+        if kept != manifest:
+            _write_manifest(upload_dir, kept)
 
-from ..core.retrieval.vector_store import index_documents
+
+def _release_hash(sha256: str) -> None:
+    """Give up a reserved hash after a failed upload or indexing run."""
+    with _manifest_lock:
+        _in_flight.discard(sha256)
+
+
+async def store_pdf_upload(
+    upload: UploadFile, replace_source: str | None = None
+) -> StoredUpload:
+    """Copy a received PDF upload to `upload_dir` without loading it in memory.
+
+    The upload (already spooled by the multipart parser) is copied chunk by
+    chunk to a temporary file while its SHA-256 is computed. It is rejected
+    as soon as the first chunk lacks the PDF magic bytes or the running size
+    exceeds `max_upload_bytes`, and after copying if a file with the same
+    content was already uploaded.
+
+    Args:
+        upload: The multipart upload received by the API.
+        replace_source: Store the upload as a new revision of this document
+            instead of under the upload's file name. The current file is
+            moved aside until `replace_stored_upload` succeeds.
+
+    Returns:
+        StoredUpload describing the saved file; its hash stays reserved until
+        `index_stored_upload` indexes it.
+
+    Raises:
+        InvalidUploadError: Empty or non-PDF content.
+        UploadTooLargeError: Content larger than `max_upload_bytes`.
+        DuplicateUploadError: Content identical to an earlier upload.
+    """
+    settings = get_settings()
+    upload_dir = Path(settings.upload_dir)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_name = tempfile.mkstemp(dir=upload_dir, suffix=".part")
+    tmp_path = Path(tmp_name)
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await upload.read(settings.upload_chunk_bytes):
+                if size == 0 and not chunk.startswith(PDF_MAGIC):
+                    raise InvalidUploadError("Only PDF files are supported.")
+                size += len(chunk)
+                if size > settings.max_upload_bytes:
+                    raise UploadTooLargeError(
+                        f"File exceeds the {settings.max_upload_bytes} byte limit."
+                    )
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+
+        if size == 0:
+            raise InvalidUploadError("The uploaded file is empty.")
+
+        sha256 = digest.hexdigest()
+        _reserve_hash(upload_dir, sha256, replacing=replace_source)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    previous = None
+    try:
+        if replace_source is not None:
+            file_path = upload_dir / replace_source
+            if file_path.exists():
+                # The chunks' source is the file name, so the new revision
+                # must be indexed under it; keep the old file until then.
+                previous = file_path.with_name(f"{file_path.name}.{sha256[:8]}.prev")
+                os.replace(file_path, previous)
+        else:
+            file_path = upload_dir / _safe_filename(upload.filename)
+            if file_path.exists():
+                # Different content under the same name: keep both revisions.
+                file_path = file_path.with_stem(f"{file_path.stem}-{sha256[:8]}")
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if previous is not None:
+            os.replace(previous, file_path)
+        _release_hash(sha256)
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return StoredUpload(path=file_path, sha256=sha256, size=size, previous=previous)
+
+
+def index_stored_upload(stored: StoredUpload) -> int:
+    """Index a stored upload and record its content hash.
+
+    If indexing fails the upload is removed and the hash released so the
+    same file can be retried.
+
+    Returns:
+        Number of document chunks indexed.
+    """
+    try:
+        chunks_indexed = index_pdf_file(stored.path, stored.sha256)
+    except BaseException:
+        stored.path.unlink(missing_ok=True)
+        _release_hash(stored.sha256)
+        raise
+
+    _commit_hash(stored.path.parent, stored.sha256, stored.path.name)
+    return chunks_indexed
+
+
+def replace_stored_upload(stored: StoredUpload) -> SyncResult:
+    """Index a stored upload as the new revision of its document.
+
+    If indexing fails, the previous file is put back (or, for a new
+    document, the upload removed) and the hash released.
+
+    Returns:
+        Counts of added, deleted and unchanged chunks.
+    """
+    try:
+        result = replace_document(stored.path, stored.sha256)
+    except BaseException:
+        if stored.previous is not None:
+            os.replace(stored.previous, stored.path)
+        else:
+            stored.path.unlink(missing_ok=True)
+        _release_hash(stored.sha256)
+        raise
+
+    _commit_hash(stored.path.parent, stored.sha256, stored.path.name)
+    if stored.previous is not None:
+        stored.previous.unlink(missing_ok=True)
+    return result
+
+
+def delete_uploaded_document(source: str) -> int:
+    """Remove a document from the index, the manifest and `upload_dir`.
+
+    Returns:
+        Number of chunks deleted from the index.
+
+    Raises:
+        DocumentNotFoundError: No document is registered under `source`.
+    """
+    deleted = remove_document(source)
+    upload_dir = Path(get_settings().upload_dir)
+    _forget_file(upload_dir, source)
+    (upload_dir / source).unlink(missing_ok=True)
+    return deleted
 
 
-def index_pdf_file(file_path: Path) -> int:
+def index_pdf_file(file_path: Path, sha256: str | None = None) -> int:
     """Load a PDF from disk and index it into the vector DB.
 
     Args:
         file_path: Path to the PDF file on disk.
+        sha256: Content hash recorded in the document registry.
 
     Returns:
         Number of document chunks indexed.
     """
-    loader = PyPDFLoader(str(file_path))
-    docs = loader.load()
-    return index_documents(docs)
+    return index_documents(file_path, sha256)
@@ -0,0 +1,195 @@
+"""Speculative retrieval while the user is still typing.
+
+The frontend posts the partial question to `/qa/prefetch` once the user
+pauses typing. Each client (the `X-Client-Id` header, else the peer
+address) has at most one pending prefetch: a new partial question replaces
+it. The retrieval only starts once the client has sent nothing newer for
+`prefetch_debounce_seconds`, so a burst of requests (from a client that
+does not debounce) is cancelled before it costs an embedding and a vector
+query; a retrieval already running in the thread pool cannot be stopped.
+The results land in the warm retrieval cache (see
+`core/retrieval/prefetch.py`), where the real `/qa` request finds them.
+
+When the client's `/qa` request arrives, a prefetch for the same question
+(or one it extends by at most `prefetch_extension_chars`) that is already
+retrieving is awaited, so the request reuses its results instead of
+retrieving again; any other pending prefetch is cancelled.
+
+Each client may schedule at most `prefetch_max_per_minute` prefetches per
+sliding minute; beyond that `PrefetchRateLimitedError` is raised.
+
+Metrics:
+- `prefetch_requests_total{result}`: scheduled, ignored or rate_limited
+- `prefetch_runs_total{result}`: completed, cancelled or failed
+- `prefetch_awaited_total`: `/qa` requests that waited for their prefetch
+- `prefetch_lookups_total{result}` (retrieval side): hit or miss
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Deque, Dict
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..core import metrics
+from ..core.config import get_settings
+from ..core.retrieval.prefetch import extends_prefetched, get_warm_cache
+from ..core.retrieval.vector_store import retrieve
+
+_RATE_WINDOW_SECONDS = 60.0
+# Clients idle for this long are forgotten.
+_CLIENT_IDLE_SECONDS = 300.0
+
+
+class PrefetchRateLimitedError(Exception):
+    """The client exceeded its prefetch rate; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class _ClientState:
+    requests: Deque[float] = field(default_factory=deque)
+    task: asyncio.Task | None = None
+    question: str = ""
+    # Whether the pending prefetch has finished its debounce delay.
+    retrieving: bool = False
+    last_seen: float = 0.0
+
+
+class PrefetchScheduler:
+    """Per-client debounced, cancellable retrieval prefetches.
+
+    Must be used from a single event loop (the API server's).
+    """
+
+    def __init__(
+        self,
+        debounce_seconds: float,
+        max_per_minute: int,
+        min_chars: int,
+        extension_chars: int,
+    ) -> None:
+        self._debounce_seconds = debounce_seconds
+        self._max_per_minute = max(max_per_minute, 1)
+        self._min_chars = min_chars
+        self._extension_chars = max(extension_chars, 0)
+        self._clients: Dict[str, _ClientState] = {}
+
+    def schedule(self, client_id: str, question: str) -> str:
+        """Schedule a prefetch for `question`, replacing the client's pending one.
+
+        Returns:
+            "scheduled", or "ignored" when the question is too short.
+
+        Raises:
+            PrefetchRateLimitedError: The client exceeded `max_per_minute`.
+        """
+        now = time.monotonic()
+        self._forget_idle(now)
+        state = self._clients.setdefault(client_id, _ClientState())
+        state.last_seen = now
+
+        if len(question) < self._min_chars:
+            self._cancel(state)
+            metrics.increment("prefetch_requests_total", result="ignored")
+            return "ignored"
+
+        while state.requests and state.requests[0] <= now - _RATE_WINDOW_SECONDS:
+            state.requests.popleft()
+        if len(state.requests) >= self._max_per_minute:
+            metrics.increment("prefetch_requests_total", result="rate_limited")
+            retry_after = state.requests[0] + _RATE_WINDOW_SECONDS - now
+            raise PrefetchRateLimitedError(
+                "Too many prefetch requests.", retry_after=max(1, math.ceil(retry_after))
+            )
+        state.requests.append(now)
+
+        self._cancel(state)
+        state.task = asyncio.create_task(self._run(state, question))
+        state.question = question
+        state.retrieving = False
+        metrics.increment("prefetch_requests_total", result="scheduled")
+        return "scheduled"
+
+    async def settle(self, client_id: str, question: str) -> None:
+        """Resolve the client's pending prefetch before answering `question`.
+
+        A prefetch whose results `question` can reuse and that is already
+        retrieving is awaited (it is not cancelled if the caller is); any
+        other pending prefetch, including a matching one still in its
+        debounce delay, is cancelled.
+        """
+        state = self._clients.get(client_id)
+        if state is None or state.task is None or state.task.done():
+            return
+        if not state.retrieving or not extends_prefetched(
+            question, state.question, self._extension_chars
+        ):
+            self._cancel(state)
+            return
+        metrics.increment("prefetch_awaited_total")
+        # wait() neither raises the prefetch's outcome nor cancels it.
+        await asyncio.wait({state.task})
+
+    def cancel(self, client_id: str) -> None:
+        """Cancel the client's pending prefetch, if any."""
+        state = self._clients.get(client_id)
+        if state is not None:
+            self._cancel(state)
+
+    @staticmethod
+    def _cancel(state: _ClientState) -> None:
+        if state.task is not None and not state.task.done():
+            # A retrieval already running in the thread pool finishes, but
+            # its results are discarded.
+            state.task.cancel()
+        state.task = None
+
+    def _forget_idle(self, now: float) -> None:
+        idle = [
+            client_id
+            for client_id, state in self._clients.items()
+            if now - state.last_seen > _CLIENT_IDLE_SECONDS
+            and (state.task is None or state.task.done())
+        ]
+        for client_id in idle:
+            del self._clients[client_id]
+
+    async def _run(self, state: _ClientState, question: str) -> None:
+        cache = get_warm_cache()
+        try:
+            await asyncio.sleep(self._debounce_seconds)
+            state.retrieving = True
+            k = get_settings().retrieval_k
+            generation = cache.generation if cache is not None else None
+            docs = await run_in_threadpool(retrieve, question, k, False)
+        except asyncio.CancelledError:
+            metrics.increment("prefetch_runs_total", result="cancelled")
+            raise
+        except Exception:
+            # Prefetching is best effort; the real request retrieves again.
+            metrics.increment("prefetch_runs_total", result="failed")
+            return
+
+        if cache is not None:
+            cache.put(question, k, docs, generation)
+        metrics.increment("prefetch_runs_total", result="completed")
+
+
+@lru_cache(maxsize=1)
+def get_prefetch_scheduler() -> PrefetchScheduler:
+    """Get the process-wide prefetch scheduler."""
+    settings = get_settings()
+    return PrefetchScheduler(
+        debounce_seconds=settings.prefetch_debounce_seconds,
+        max_per_minute=settings.prefetch_max_per_minute,
+        min_chars=settings.prefetch_min_chars,
+        extension_chars=settings.prefetch_extension_chars,
+    )
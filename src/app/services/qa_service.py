@@ -5,18 +5,45 @@ with the multi-agent RAG pipeline without depending directly on LangGraph
 or agent implementation details.
 """
 
+import threading
 from typing import Dict, Any
 
 from ..core.agents.graph import run_qa_flow
+from ..core.retrieval.serialization import render_citations, render_context
 
 
-def answer_question(question: str) -> Dict[str, Any]:
+def answer_question(
+    question: str,
+    session_id: str | None = None,
+    cancel_event: threading.Event | None = None,
+    deadline: float | None = None,
+) -> Dict[str, Any]:
     """Run the multi-agent QA flow for a given question.
 
     Args:
         question: User's natural language question about the vector databases paper.
+        session_id: Optional conversation session for follow-up questions.
+        cancel_event: Optional event that stops the run between graph nodes
+            (raises `QARunCancelledError`).
+        deadline: Absolute `time.time()` by which the answer is needed
+            (defaults to `qa_deadline_seconds` from now).
 
     Returns:
-        Dictionary containing at least `answer` and `context` keys.
+        Dictionary containing `answer`, `draft_answer`, `context`, `citations`,
+        `grounding`, `verified` and `status` keys. Context and citations are rendered here, once,
+        from the final state's chunk table.
     """
-    return run_qa_flow(question)
+    final_state = run_qa_flow(
+        question, session_id=session_id, cancel_event=cancel_event, deadline=deadline
+    )
+    chunks = final_state.get("chunks") or {}
+
+    return {
+        "answer": final_state.get("answer") or "",
+        "draft_answer": final_state.get("draft_answer"),
+        "context": render_context(chunks),
+        "citations": render_citations(chunks),
+        "grounding": final_state.get("grounding"),
+        "verified": final_state.get("verified"),
+        "status": final_state.get("status") or "complete",
+    }
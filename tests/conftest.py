@@ -0,0 +1,11 @@
+"""Shared test setup.
+
+Settings require the API credentials to be set; the unit tests never call
+the external services, so placeholders are enough.
+"""
+
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("PINECONE_API_KEY", "test-pinecone-key")
+os.environ.setdefault("PINECONE_INDEX_NAME", "test-index")
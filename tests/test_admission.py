@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.app import api
+from src.app.core.config import get_settings
+from src.app.services.admission import AdmissionController, OverloadedError
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=0, max_wait_seconds=1)
+        async with controller.admit():
+            with pytest.raises(OverloadedError) as rejected:
+                async with controller.admit():
+                    pass
+        return rejected.value
+
+    error = asyncio.run(scenario())
+    assert error.retry_after >= 1
+
+
+def test_queued_request_times_out():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=1, max_wait_seconds=0.05)
+        async with controller.admit():
+            with pytest.raises(OverloadedError, match="Timed out"):
+                async with controller.admit():
+                    pass
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_is_admitted_when_a_slot_frees():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=1, max_wait_seconds=1)
+        order = []
+
+        async def first():
+            async with controller.admit():
+                await asyncio.sleep(0.05)
+                order.append("first")
+
+        async def second():
+            await asyncio.sleep(0.01)
+            async with controller.admit():
+                order.append("second")
+
+        await asyncio.gather(first(), second())
+        return order
+
+    assert asyncio.run(scenario()) == ["first", "second"]
+
+
+class DisconnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return True
+
+
+def test_disconnected_run_keeps_its_slot_until_the_thread_returns(monkeypatch):
+    controller = AdmissionController(max_concurrency=1, max_queue=0, max_wait_seconds=1)
+    finished = threading.Event()
+
+    def answer_question(question, session_id, cancel_event, deadline):
+        time.sleep(0.3)  # a node that cannot be interrupted
+        finished.set()
+        return {"answer": ""}
+
+    monkeypatch.setattr(api, "get_admission_controller", lambda: controller)
+    monkeypatch.setattr(api, "answer_question", answer_question)
+    monkeypatch.setattr(get_settings(), "qa_disconnect_poll_seconds", 0.01)
+
+    async def scenario():
+        result = await api._answer_until_disconnect(DisconnectedRequest(), "q", None, None)
+        await asyncio.sleep(0.1)
+        assert not finished.is_set()
+        held_after_disconnect = controller._semaphore.locked()
+        with pytest.raises(OverloadedError):
+            async with controller.admit():
+                pass
+        while not finished.is_set():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        return result, held_after_disconnect, controller._semaphore.locked()
+
+    result, held_after_disconnect, held_after_run = asyncio.run(scenario())
+    assert result is None
+    assert held_after_disconnect
+    assert not held_after_run
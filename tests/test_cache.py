@@ -0,0 +1,128 @@
+import pytest
+
+from src.app.core import cache as cache_module
+from src.app.core.cache import MemoryCache, SqliteCache, make_key
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(max_entries=100):
+        if request.param == "memory":
+            return MemoryCache(max_entries)
+        cache = SqliteCache(tmp_path / "cache.db", max_entries)
+        cache._EVICT_EVERY = 1
+        cache._TOUCH_INTERVAL = 0.0
+        return cache
+
+    return make
+
+
+def test_make_key_is_stable_and_namespaced():
+    assert make_key("llm", "model", "prompt") == make_key("llm", "model", "prompt")
+    assert make_key("llm", "model", "prompt") != make_key("llm", "model", "other")
+    assert make_key("retrieval", "q").startswith("retrieval:")
+
+
+def test_set_get_delete(make_cache):
+    cache = make_cache()
+    cache.set("k", {"docs": [1, 2]})
+    assert cache.get("k") == {"docs": [1, 2]}
+    cache.delete("k")
+    assert cache.get("k") is None
+
+
+def test_entries_expire_after_ttl(make_cache, clock):
+    cache = make_cache()
+    cache.set("short", "value", ttl=10)
+    cache.set("forever", "value")
+    clock.now += 9
+    assert cache.get("short") == "value"
+    clock.now += 1
+    assert cache.get("short") is None
+    assert cache.get("forever") == "value"
+
+
+def test_least_recently_used_entries_are_evicted(make_cache, clock):
+    cache = make_cache(max_entries=2)
+    cache.set("a", 1)
+    clock.now += 1
+    cache.set("b", 2)
+    clock.now += 1
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    clock.now += 1
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_corpus_bump_invalidates_corpus_bound_entries(make_cache):
+    cache = make_cache()
+    cache.set("bound", "old", corpus_bound=True)
+    cache.set("unbound", "kept")
+    version = cache.corpus_version()
+    assert cache.bump_corpus_version() == version + 1
+    assert cache.get("bound") is None
+    assert cache.get("unbound") == "kept"
+    cache.set("bound", "new", corpus_bound=True)
+    assert cache.get("bound") == "new"
+
+
+def test_invalidate_tag_drops_only_tagged_entries(make_cache):
+    cache = make_cache()
+    cache.set("a", 1, tags=["a.pdf"])
+    cache.set("ab", 2, tags=["a.pdf", "b.pdf"])
+    cache.set("b", 3, tags=["b.pdf"])
+    cache.invalidate_tag("a.pdf")
+    assert cache.get("a") is None
+    assert cache.get("ab") is None
+    assert cache.get("b") == 3
+
+
+def test_clear(make_cache):
+    cache = make_cache()
+    cache.set("a", 1, tags=["t"])
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_sqlite_entries_are_shared_between_instances(tmp_path):
+    first = SqliteCache(tmp_path / "cache.db", 10)
+    second = SqliteCache(tmp_path / "cache.db", 10)
+    first.set("k", "v", corpus_bound=True)
+    assert second.get("k") == "v"
+    second.bump_corpus_version()
+    assert first.get("k") is None
+
+
+def test_sqlite_hits_touch_entries_at_most_once_per_interval(tmp_path, clock):
+    cache = SqliteCache(tmp_path / "cache.db", 10)
+    cache.set("k", "v")
+
+    def accessed_at():
+        return cache._connect().execute(
+            "SELECT accessed_at FROM cache_entries WHERE key = 'k'"
+        ).fetchone()[0]
+
+    set_at = accessed_at()
+    clock.now += cache._TOUCH_INTERVAL - 1
+    assert cache.get("k") == "v"
+    assert accessed_at() == set_at
+    clock.now += 1
+    assert cache.get("k") == "v"
+    assert accessed_at() == clock.now
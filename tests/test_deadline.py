@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+from src.app.core.agents import agents
+from src.app.core.config import get_settings
+from src.app.core.deadline import (
+    DeadlineExceededError,
+    call_with_deadline,
+    current_timeout,
+    deadline_scope,
+    new_deadline,
+)
+from src.app.core.retrieval.chunks import ChunkRecord
+
+CHUNK = ChunkRecord(text="Caching cuts latency.", source="a.pdf", page=1)
+
+
+class SlowAgent:
+    """Agent whose call outlives any deadline used in these tests."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = threading.Event()
+
+    def invoke(self, *args, **kwargs):
+        self.calls += 1
+        self.release.wait(5)
+        return {"messages": []}
+
+
+@pytest.fixture
+def slow_agent():
+    agent = SlowAgent()
+    yield agent
+    agent.release.set()
+
+
+def test_zero_budget_means_no_deadline():
+    assert new_deadline(0) is None
+    with deadline_scope(None):
+        assert current_timeout() is None
+        assert call_with_deadline(lambda: "inline") == "inline"
+
+
+def test_expired_deadline_raises():
+    with deadline_scope(time.time() - 1):
+        with pytest.raises(DeadlineExceededError):
+            current_timeout()
+
+
+def test_call_is_abandoned_at_the_deadline(slow_agent):
+    with deadline_scope(new_deadline(0.05)):
+        with pytest.raises(DeadlineExceededError):
+            call_with_deadline(slow_agent.invoke)
+
+
+def test_call_result_and_errors_reach_the_caller():
+    def fail():
+        raise ValueError("boom")
+
+    with deadline_scope(new_deadline(5)):
+        assert call_with_deadline(lambda value: value * 2, 21) == 42
+        with pytest.raises(ValueError):
+            call_with_deadline(fail)
+
+
+def test_retrieval_timeout_keeps_session_chunks(monkeypatch, slow_agent):
+    monkeypatch.setattr(agents, "retrieval_agent", slow_agent)
+    update = agents.retrieval_node(
+        {"question": "q", "deadline": new_deadline(0.05), "session_chunks": [CHUNK]}
+    )
+    assert update["status"] == "partial"
+    assert update["chunks"] == {"C1": CHUNK}
+
+
+def test_summarization_is_skipped_without_budget(monkeypatch, slow_agent):
+    monkeypatch.setattr(get_settings(), "summarization_min_seconds", 5.0)
+    monkeypatch.setattr(agents, "_summarization_request", lambda state: (slow_agent, "q"))
+    update = agents.summarization_node({"question": "q", "deadline": new_deadline(1)})
+    assert update == {"status": "partial"}
+    assert slow_agent.calls == 0
+
+
+def test_summarization_timeout_is_partial(monkeypatch, slow_agent):
+    monkeypatch.setattr(get_settings(), "summarization_min_seconds", 0.0)
+    monkeypatch.setattr(agents, "_summarization_request", lambda state: (slow_agent, "q"))
+    update = agents.summarization_node({"question": "q", "deadline": new_deadline(0.05)})
+    assert update == {"status": "partial"}
+    assert slow_agent.calls == 1
+
+
+@pytest.mark.parametrize("output", ["answer", "edits"])
+def test_verification_without_budget_returns_the_draft_unverified(
+    monkeypatch, slow_agent, output
+):
+    monkeypatch.setattr(get_settings(), "verification_min_seconds", 5.0)
+    monkeypatch.setattr(get_settings(), "verification_output", output)
+    monkeypatch.setattr(agents, "verification_agent", slow_agent)
+    monkeypatch.setattr(agents, "edit_verification_agent", slow_agent)
+    state = {
+        "question": "q",
+        "draft_answer": "Caching cuts latency [C1].",
+        "chunks": {"C1": CHUNK},
+        "deadline": new_deadline(1),
+    }
+    assert agents.verification_node(state) == {
+        "answer": "Caching cuts latency [C1].",
+        "verified": False,
+    }
+    assert slow_agent.calls == 0
+
+
+@pytest.mark.parametrize("output", ["answer", "edits"])
+def test_verification_timeout_returns_the_draft_unverified(
+    monkeypatch, slow_agent, output
+):
+    monkeypatch.setattr(get_settings(), "verification_min_seconds", 0.0)
+    monkeypatch.setattr(get_settings(), "verification_output", output)
+    monkeypatch.setattr(agents, "verification_agent", slow_agent)
+    monkeypatch.setattr(agents, "edit_verification_agent", slow_agent)
+    state = {
+        "question": "q",
+        "draft_answer": "Caching cuts latency [C1].",
+        "chunks": {"C1": CHUNK},
+        "deadline": new_deadline(0.05),
+    }
+    assert agents.verification_node(state) == {
+        "answer": "Caching cuts latency [C1].",
+        "verified": False,
+    }
+    assert slow_agent.calls == 1
@@ -0,0 +1,77 @@
+from src.app.core.agents.edits import (
+    SentenceEdit,
+    VerificationEdits,
+    apply_edits,
+    number_sentences,
+)
+from src.app.core.agents.sentences import split_sentences
+from src.app.core.retrieval.chunks import ChunkRecord
+
+CHUNKS = {
+    "C1": ChunkRecord(text="Caching cuts latency.", source="a.pdf", page=1),
+    "C2": ChunkRecord(text="Batching raises throughput.", source="b.pdf", page=2),
+}
+DRAFT = "Caching cuts latency [C1]. Batching lowers cost [C2].\n\nIt always works [C3]."
+
+
+def edits(*items):
+    return VerificationEdits(edits=[SentenceEdit(**item) for item in items])
+
+
+def test_number_sentences():
+    assert number_sentences(split_sentences(DRAFT)) == (
+        "[1] Caching cuts latency [C1].\n"
+        "[2] Batching lowers cost [C2].\n"
+        "[3] It always works [C3]."
+    )
+
+
+def test_no_edits_returns_draft():
+    assert apply_edits(split_sentences(DRAFT), edits(), CHUNKS) == DRAFT
+
+
+def test_replace_and_delete_keep_layout():
+    result = apply_edits(
+        split_sentences(DRAFT),
+        edits(
+            {"index": 2, "action": "replace", "text": "Batching raises throughput [C2]."},
+            {"index": 3, "action": "delete"},
+        ),
+        CHUNKS,
+    )
+    assert result == "Caching cuts latency [C1]. Batching raises throughput [C2]."
+
+
+def test_replacement_drops_unknown_citations():
+    result = apply_edits(
+        split_sentences(DRAFT),
+        edits({"index": 3, "action": "replace", "text": "It often works [C1] [C9]."}),
+        CHUNKS,
+    )
+    assert result.endswith("\n\nIt often works [C1].")
+
+
+def test_out_of_range_and_empty_edits_are_ignored():
+    result = apply_edits(
+        split_sentences(DRAFT),
+        edits(
+            {"index": 0, "action": "delete"},
+            {"index": 4, "action": "delete"},
+            {"index": 1, "action": "replace", "text": None},
+            {"index": 2, "action": "keep"},
+        ),
+        CHUNKS,
+    )
+    assert result == DRAFT
+
+
+def test_last_edit_of_a_sentence_wins():
+    result = apply_edits(
+        split_sentences(DRAFT),
+        edits(
+            {"index": 1, "action": "delete"},
+            {"index": 1, "action": "replace", "text": "Caching helps [C1]."},
+        ),
+        CHUNKS,
+    )
+    assert result.startswith("Caching helps [C1]. Batching")
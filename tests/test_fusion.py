@@ -0,0 +1,35 @@
+from src.app.core.retrieval.chunks import ChunkRecord
+from src.app.core.retrieval.fusion import deduplicate_chunks, reciprocal_rank_fusion
+
+
+def record(name, page=1):
+    return ChunkRecord(text=f"text of {name}", source=f"{name}.pdf", page=page)
+
+
+A, B, C, D = record("a"), record("b"), record("c"), record("d")
+
+
+def test_chunks_found_by_several_queries_rank_first():
+    fused = reciprocal_rank_fusion([[A, B, C], [C, D], [D, C]])
+    assert fused == [C, D, A, B]
+
+
+def test_duplicates_are_merged_by_key():
+    copy_of_a = ChunkRecord(text=A.text, source=A.source, page=A.page, doc_id="other")
+    fused = reciprocal_rank_fusion([[A], [copy_of_a, B]])
+    assert fused == [A, B]
+    assert fused[0] is A
+
+
+def test_ties_keep_first_seen_order():
+    assert reciprocal_rank_fusion([[A, B], [C, D]]) == [A, C, B, D]
+
+
+def test_limit_and_empty_input():
+    assert reciprocal_rank_fusion([[A, B, C]], limit=2) == [A, B]
+    assert reciprocal_rank_fusion([]) == []
+
+
+def test_same_text_on_another_page_is_a_different_chunk():
+    other_page = record("a", page=2)
+    assert deduplicate_chunks([A, other_page, A]) == [A, other_page]
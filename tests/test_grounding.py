@@ -0,0 +1,48 @@
+from src.app.core.agents.grounding import check_grounding, score_sentences
+from src.app.core.retrieval.chunks import ChunkRecord
+
+CHUNKS = {
+    "C1": ChunkRecord(text="Response caching reduces median latency.", source="a.pdf", page=1),
+    "C2": ChunkRecord(text="Batching requests improves throughput.", source="b.pdf", page=3),
+}
+
+
+def test_supported_sentences_are_grounded():
+    result = check_grounding(
+        "Response caching reduces median latency [C1]. Batching requests improves throughput [C2].",
+        CHUNKS,
+        threshold=0.8,
+    )
+    assert result.grounded
+    assert [report["score"] for report in result.sentences] == [1.0, 1.0]
+
+
+def test_citing_the_wrong_chunk_is_not_grounded():
+    result = check_grounding("Batching requests improves throughput [C1].", CHUNKS, 0.5)
+    assert not result.grounded
+    assert result.sentences[0]["score"] == 0.0
+
+
+def test_union_of_cited_chunks_supports_a_sentence():
+    result = score_sentences(
+        ["Response caching and batching requests improve throughput [C1][C2]."],
+        CHUNKS,
+        threshold=0.6,
+    )
+    assert result.grounded
+
+
+def test_unknown_citation_scores_zero():
+    result = score_sentences(["Response caching reduces latency [C7]."], CHUNKS, 0.1)
+    assert result.sentences[0]["missing_citations"] == ["C7"]
+    assert result.sentences[0]["score"] == 0.0
+    assert not result.grounded
+
+
+def test_sentence_without_content_words_scores_one():
+    result = score_sentences(["It is."], CHUNKS, 0.9)
+    assert result.sentences[0]["score"] == 1.0
+
+
+def test_empty_answer_is_not_grounded():
+    assert check_grounding("", CHUNKS, 0.5) == (False, [])
@@ -0,0 +1,108 @@
+import asyncio
+import contextvars
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.app.core.config import get_settings
+from src.app.core.llm import hedging
+from src.app.core.llm.hedging import HedgeBudget, HedgedChatOpenAI, LatencyTracker
+from src.app.core.llm.rate_limit import RateLimitedChatOpenAI
+
+_attempt_var: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "attempt", default=None
+)
+
+
+def test_percentile_needs_min_samples():
+    tracker = LatencyTracker()
+    tracker.record(1.0)
+    assert tracker.percentile(50, min_samples=2) is None
+    tracker.record(3.0)
+    assert tracker.percentile(50, min_samples=2) == pytest.approx(2.0)
+
+
+def test_budget_caps_the_hedge_ratio():
+    budget = HedgeBudget(max_ratio=0.25)
+    for _ in range(3):
+        budget.record_call(hedged=False)
+    assert budget.allows_hedge()  # 1 of 4 calls
+    budget.record_call(hedged=True)
+    assert not budget.allows_hedge()  # would be 2 of 5
+    for _ in range(3):
+        budget.record_call(hedged=False)
+    assert budget.allows_hedge()  # 2 of 8
+
+
+@pytest.fixture
+def hedged_model(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "hedge_percentile", 50.0)
+    monkeypatch.setattr(settings, "hedge_min_samples", 1)
+    monkeypatch.setattr(settings, "hedge_max_ratio", 1.0)
+    monkeypatch.setattr(hedging, "_trackers", {})
+    monkeypatch.setattr(hedging, "_budgets", {})
+    model = HedgedChatOpenAI(model="gpt-4o-mini", hedge_node="test")
+    tracker, _ = hedging._node_state("test")
+    tracker.record(0.05)  # the primary is hedged after 50 ms
+    return model
+
+
+def _result(text):
+    return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+def test_hedge_wins_when_the_primary_is_slow(monkeypatch, hedged_model):
+    calls = []
+    cancelled = []
+
+    async def fake_agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        attempt = len(calls)
+        calls.append(attempt)
+        # Attempts must not see each other's context changes.
+        assert _attempt_var.get() is None
+        _attempt_var.set(f"attempt-{attempt}")
+        try:
+            await asyncio.sleep(1.0 if attempt == 0 else 0.0)
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return _result(f"attempt-{attempt}")
+
+    monkeypatch.setattr(RateLimitedChatOpenAI, "_agenerate", fake_agenerate)
+    result = hedged_model._generate([HumanMessage(content="hi")])
+
+    assert result.generations[0].message.content == "attempt-1"
+    assert calls == [0, 1]
+    assert cancelled == [0]
+
+
+def test_fast_primary_is_not_hedged(monkeypatch, hedged_model):
+    calls = []
+
+    async def fake_agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        calls.append(len(calls))
+        return _result("primary")
+
+    monkeypatch.setattr(RateLimitedChatOpenAI, "_agenerate", fake_agenerate)
+    result = hedged_model._generate([HumanMessage(content="hi")])
+
+    assert result.generations[0].message.content == "primary"
+    assert calls == [0]
+
+
+def test_no_hedge_without_budget(monkeypatch, hedged_model):
+    monkeypatch.setattr(HedgeBudget, "allows_hedge", lambda self: False)
+    calls = []
+
+    async def fake_agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        calls.append(len(calls))
+        await asyncio.sleep(0.2)
+        return _result("primary")
+
+    monkeypatch.setattr(RateLimitedChatOpenAI, "_agenerate", fake_agenerate)
+    result = hedged_model._generate([HumanMessage(content="hi")])
+
+    assert result.generations[0].message.content == "primary"
+    assert calls == [0]
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.app.core.retrieval import vector_store
+from src.app.core.retrieval.vector_store import (
+    FINGERPRINT_NAMESPACE,
+    FINGERPRINT_RECORD_ID,
+    check_index_embeddings,
+)
+
+
+class FakeIndex:
+    """Just enough of the Pinecone index client for the fingerprint check."""
+
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+        self.records = {}
+
+    def describe_index_stats(self) -> dict:
+        return {"dimension": self.dimension, "total_vector_count": len(self.records)}
+
+    def fetch(self, ids, namespace=None):
+        found = {
+            record_id: SimpleNamespace(metadata=self.records[(namespace, record_id)]["metadata"])
+            for record_id in ids
+            if (namespace, record_id) in self.records
+        }
+        return SimpleNamespace(vectors=found)
+
+    def upsert(self, vectors, namespace=None, **kwargs):
+        for vector in vectors:
+            assert len(vector["values"]) == self.dimension
+            self.records[(namespace, vector["id"])] = vector
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    current = {"fingerprint": "text-embedding-3-small:native", "dimension": 8}
+    monkeypatch.setattr(vector_store, "embedding_fingerprint", lambda: current["fingerprint"])
+    monkeypatch.setattr(vector_store, "embedding_dimension", lambda: current["dimension"])
+    return current
+
+
+def marker(index):
+    return index.records.get((FINGERPRINT_NAMESPACE, FINGERPRINT_RECORD_ID))
+
+
+def test_new_index_is_claimed_with_the_fingerprint(embeddings):
+    index = FakeIndex(dimension=8)
+    check_index_embeddings(index)
+    assert marker(index)["metadata"] == {
+        "embedding_fingerprint": "text-embedding-3-small:native"
+    }
+    check_index_embeddings(index)  # same embeddings: accepted
+
+
+def test_other_embeddings_of_the_same_dimension_are_rejected(embeddings):
+    index = FakeIndex(dimension=8)
+    check_index_embeddings(index)
+    embeddings["fingerprint"] = "hashing:8"
+    with pytest.raises(ValueError, match="hashing:8"):
+        check_index_embeddings(index)
+
+
+def test_dimension_mismatch_is_rejected(embeddings):
+    with pytest.raises(ValueError, match="dimension"):
+        check_index_embeddings(FakeIndex(dimension=16))
+
+
+def legacy_index():
+    index = FakeIndex(dimension=8)
+    index.records[("", "doc-1")] = {"id": "doc-1", "values": [1.0] * 8, "metadata": {}}
+    return index
+
+
+def test_query_path_leaves_an_unmarked_legacy_index_alone(embeddings, caplog):
+    index = legacy_index()
+    with caplog.at_level("WARNING"):
+        check_index_embeddings(index)
+    assert marker(index) is None
+    assert "no embedding fingerprint" in caplog.text
+
+
+def test_indexing_path_claims_an_unmarked_legacy_index(embeddings):
+    index = legacy_index()
+    check_index_embeddings(index, claim=True)
+    assert marker(index)["metadata"] == {
+        "embedding_fingerprint": "text-embedding-3-small:native"
+    }
@@ -0,0 +1,87 @@
+import asyncio
+import io
+from types import SimpleNamespace
+
+import pytest
+from fastapi import UploadFile
+
+from src.app.core.retrieval.documents import SyncResult
+from src.app.services import indexing_service
+from src.app.services.indexing_service import (
+    index_stored_upload,
+    replace_stored_upload,
+    store_pdf_upload,
+)
+
+OLD = b"%PDF-1.7 old revision"
+NEW = b"%PDF-1.7 new revision"
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    settings = SimpleNamespace(
+        upload_dir=str(tmp_path), upload_chunk_bytes=8, max_upload_bytes=1024
+    )
+    monkeypatch.setattr(indexing_service, "get_settings", lambda: settings)
+    monkeypatch.setattr(indexing_service, "_in_flight", set())
+    (tmp_path / "paper.pdf").write_bytes(OLD)
+    return tmp_path
+
+
+def store(content: bytes, replace_source: str | None = None):
+    upload = UploadFile(file=io.BytesIO(content), filename="paper.pdf")
+    return asyncio.run(store_pdf_upload(upload, replace_source))
+
+
+def test_replacement_swaps_the_file_after_indexing(upload_dir, monkeypatch):
+    indexed = []
+
+    def replace_document(path, sha256):
+        indexed.append(path.read_bytes())
+        return SyncResult(added=1, deleted=1, unchanged=0)
+
+    monkeypatch.setattr(indexing_service, "replace_document", replace_document)
+    stored = store(NEW, replace_source="paper.pdf")
+    assert stored.previous.read_bytes() == OLD
+
+    replace_stored_upload(stored)
+    assert indexed == [NEW]
+    assert (upload_dir / "paper.pdf").read_bytes() == NEW
+    assert not stored.previous.exists()
+
+
+def test_failed_replacement_restores_the_previous_file(upload_dir, monkeypatch):
+    def replace_document(path, sha256):
+        raise RuntimeError("embedding failed")
+
+    monkeypatch.setattr(indexing_service, "replace_document", replace_document)
+    stored = store(NEW, replace_source="paper.pdf")
+    with pytest.raises(RuntimeError):
+        replace_stored_upload(stored)
+
+    assert (upload_dir / "paper.pdf").read_bytes() == OLD
+    assert sorted(path.name for path in upload_dir.iterdir()) == ["paper.pdf"]
+    # The hash was released, so the same revision can be retried.
+    stored = store(NEW, replace_source="paper.pdf")
+    assert stored.previous is not None
+
+
+def test_new_upload_with_the_same_name_keeps_both_files(upload_dir):
+    stored = store(NEW)
+    assert stored.previous is None
+    assert stored.path.name.startswith("paper-")
+    assert (upload_dir / "paper.pdf").read_bytes() == OLD
+
+
+def test_failed_indexing_removes_the_upload(upload_dir, monkeypatch):
+    def index_pdf_file(path, sha256):
+        raise RuntimeError("embedding failed")
+
+    monkeypatch.setattr(indexing_service, "index_pdf_file", index_pdf_file)
+    stored = store(NEW)
+    with pytest.raises(RuntimeError):
+        index_stored_upload(stored)
+
+    assert sorted(path.name for path in upload_dir.iterdir()) == ["paper.pdf"]
+    # The hash was released, so the same file can be retried.
+    assert store(NEW).path.exists()
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.app.services import prefetch
+from src.app.services.prefetch import PrefetchScheduler
+
+
+@pytest.fixture
+def slow_retrieve(monkeypatch):
+    """Retrieval that blocks until released; records finished questions."""
+    release = threading.Event()
+    finished = []
+
+    def retrieve(question, k, use_prefetched):
+        release.wait(timeout=5)
+        finished.append(question)
+        return []
+
+    monkeypatch.setattr(prefetch, "retrieve", retrieve)
+    monkeypatch.setattr(prefetch, "get_warm_cache", lambda: None)
+    return release, finished
+
+
+def scheduler():
+    return PrefetchScheduler(
+        debounce_seconds=0.01, max_per_minute=30, min_chars=5, extension_chars=8
+    )
+
+
+def test_qa_waits_for_a_prefetch_of_the_same_question(slow_retrieve):
+    release, finished = slow_retrieve
+
+    async def scenario():
+        prefetcher = scheduler()
+        prefetcher.schedule("tab", "What is HNSW indexing")
+        await asyncio.sleep(0.05)
+        asyncio.get_running_loop().call_later(0.1, release.set)
+        await prefetcher.settle("tab", "What is HNSW indexing?")
+
+    asyncio.run(scenario())
+    assert finished == ["What is HNSW indexing"]
+
+
+def test_qa_cancels_a_prefetch_of_another_question(slow_retrieve):
+    release, _ = slow_retrieve
+
+    async def scenario():
+        prefetcher = scheduler()
+        prefetcher.schedule("tab", "What is HNSW")
+        task = prefetcher._clients["tab"].task
+        await asyncio.sleep(0.05)
+        await prefetcher.settle("tab", "How does product quantization work?")
+        release.set()
+        await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(scenario())
+    assert task.cancelled()
+
+
+def test_newer_partial_question_replaces_the_pending_one(slow_retrieve):
+    release, _ = slow_retrieve
+
+    async def scenario():
+        prefetcher = scheduler()
+        prefetcher.schedule("tab", "What is HN")
+        first = prefetcher._clients["tab"].task
+        prefetcher.schedule("tab", "What is HNSW indexing")
+        await asyncio.sleep(0)
+        release.set()
+        await prefetcher.settle("tab", "What is HNSW indexing")
+        return first
+
+    assert asyncio.run(scenario()).cancelled()
+
+
+def test_rate_limit(slow_retrieve):
+    release, _ = slow_retrieve
+    release.set()
+
+    async def scenario():
+        prefetcher = PrefetchScheduler(
+            debounce_seconds=0.01, max_per_minute=1, min_chars=5, extension_chars=8
+        )
+        assert prefetcher.schedule("tab", "HNSW") == "ignored"
+        assert prefetcher.schedule("tab", "first question") == "scheduled"
+        with pytest.raises(prefetch.PrefetchRateLimitedError):
+            prefetcher.schedule("tab", "second question")
+        await prefetcher.settle("tab", "first question")
+
+    asyncio.run(scenario())
+
+
+def test_superseded_prefetch_never_retrieves(slow_retrieve, monkeypatch):
+    release, finished = slow_retrieve
+    release.set()
+    started = []
+    monkeypatch.setattr(
+        prefetch, "retrieve", lambda question, k, use_prefetched: started.append(question) or []
+    )
+
+    async def scenario():
+        prefetcher = PrefetchScheduler(
+            debounce_seconds=0.05, max_per_minute=30, min_chars=5, extension_chars=8
+        )
+        for partial in ("What is H", "What is HN", "What is HNS", "What is HNSW"):
+            prefetcher.schedule("tab", partial)
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    assert started == ["What is HNSW"]
+
+
+def test_qa_cancels_a_matching_prefetch_still_in_its_delay(slow_retrieve):
+    async def scenario():
+        prefetcher = PrefetchScheduler(
+            debounce_seconds=1.0, max_per_minute=30, min_chars=5, extension_chars=8
+        )
+        prefetcher.schedule("tab", "What is HNSW indexing")
+        task = prefetcher._clients["tab"].task
+        await asyncio.sleep(0)
+        await prefetcher.settle("tab", "What is HNSW indexing")
+        await asyncio.sleep(0)
+        return task
+
+    assert asyncio.run(scenario()).cancelled()
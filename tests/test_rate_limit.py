@@ -0,0 +1,57 @@
+import pytest
+
+from src.app.core.llm.rate_limit import RateScheduler, TokenBucket, estimate_tokens
+
+
+def test_full_bucket_has_no_delay():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.delay(60, now=bucket._updated) == 0.0
+
+
+def test_delay_until_refilled():
+    bucket = TokenBucket(per_minute=60)  # one unit per second
+    start = bucket._updated
+    bucket.take(60)
+    assert bucket.delay(10, now=start) == pytest.approx(10.0)
+    assert bucket.delay(10, now=start + 4) == pytest.approx(6.0)
+
+
+def test_debt_is_repaid_before_the_next_call():
+    bucket = TokenBucket(per_minute=60)
+    start = bucket._updated
+    bucket.take(90)  # 30 over the available quota
+    assert bucket.delay(1, now=start) == pytest.approx(31.0)
+
+
+def test_amounts_above_capacity_wait_only_for_a_full_bucket():
+    bucket = TokenBucket(per_minute=60)
+    start = bucket._updated
+    bucket.take(30)
+    assert bucket.delay(500, now=start) == pytest.approx(30.0)
+
+
+def test_refill_never_exceeds_capacity():
+    bucket = TokenBucket(per_minute=60)
+    start = bucket._updated
+    bucket.refund(100)
+    bucket.take(60)
+    assert bucket.delay(1, now=start) == pytest.approx(1.0)
+
+
+def test_refund_corrects_estimate_both_ways():
+    bucket = TokenBucket(per_minute=60)
+    start = bucket._updated
+    bucket.take(60)
+    bucket.refund(20)  # used 20 less than estimated
+    assert bucket.delay(20, now=start) == 0.0
+    bucket.refund(-10)  # used 10 more than estimated
+    assert bucket.delay(20, now=start) == pytest.approx(10.0)
+
+
+def test_unconfigured_model_is_not_paced():
+    assert RateScheduler().acquire("unknown-model", tokens=10**6) == 0.0
+
+
+def test_estimate_tokens_is_at_least_one():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("x" * 400) > estimate_tokens("x" * 40)
@@ -0,0 +1,54 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from src.app.api import RequestSizeLimitMiddleware
+
+app = FastAPI()
+app.add_middleware(RequestSizeLimitMiddleware, max_body_bytes=1024)
+
+
+@app.post("/upload")
+async def upload(file: UploadFile = File(...)) -> dict:
+    return {"size": len(await file.read())}
+
+
+client = TestClient(app)
+
+
+def multipart(payload: bytes, piece: int = 256):
+    yield b'--bnd\r\nContent-Disposition: form-data; name="file"; filename="a.pdf"\r\n'
+    yield b"Content-Type: application/pdf\r\n\r\n"
+    for start in range(0, len(payload), piece):
+        yield payload[start : start + piece]
+    yield b"\r\n--bnd--\r\n"
+
+
+def post_chunked(payload: bytes):
+    return client.post(
+        "/upload",
+        content=multipart(payload),
+        headers={"content-type": "multipart/form-data; boundary=bnd"},
+    )
+
+
+def test_small_upload_passes():
+    response = client.post("/upload", files={"file": ("a.pdf", b"%PDF-1", "application/pdf")})
+    assert response.status_code == 200
+    assert response.json() == {"size": 6}
+
+
+def test_declared_length_over_limit_is_rejected():
+    response = client.post("/upload", files={"file": ("a.pdf", b"x" * 4096, "application/pdf")})
+    assert response.status_code == 413
+
+
+def test_chunked_upload_is_cut_off_while_received():
+    response = post_chunked(b"x" * 4096)
+    assert response.request.headers.get("transfer-encoding") == "chunked"
+    assert response.status_code == 413
+
+
+def test_chunked_upload_under_limit_passes():
+    response = post_chunked(b"x" * 512)
+    assert response.status_code == 200
+    assert response.json() == {"size": 512}
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.outputs import Generation
+
+from src.app.core import cache as cache_module
+from src.app.core.cache import MemoryCache
+from src.app.core.llm import response_cache
+from src.app.core.llm.response_cache import ResponseCache
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = MemoryCache(100)
+    monkeypatch.setattr(cache_module, "get_cache", lambda: backend)
+    monkeypatch.setattr(response_cache, "get_cache", lambda: backend)
+    return backend
+
+
+def test_responses_are_keyed_on_prompt_and_model(backend):
+    cache = ResponseCache()
+    cache.update("prompt", "model-a", [Generation(text="answer")])
+    assert cache.lookup("prompt", "model-a") == [Generation(text="answer")]
+    assert cache.lookup("prompt", "model-b") is None
+    assert cache.lookup("other prompt", "model-a") is None
+
+
+def test_indexing_and_clear_invalidate_responses(backend):
+    cache = ResponseCache()
+    cache.update("prompt", "model", [Generation(text="answer")])
+    backend.bump_corpus_version()
+    assert cache.lookup("prompt", "model") is None
+
+    cache.update("prompt", "model", [Generation(text="answer")])
+    cache.clear()
+    assert cache.lookup("prompt", "model") is None
+
+
+def test_refuses_the_null_backend(monkeypatch):
+    settings = SimpleNamespace(cache_backend="none", llm_cache_ttl_seconds=60.0)
+    monkeypatch.setattr(response_cache, "get_settings", lambda: settings)
+    with pytest.raises(ValueError, match="cache_backend"):
+        response_cache.get_response_cache.__wrapped__()
+
+    settings.cache_backend = "memory"
+    assert isinstance(response_cache.get_response_cache.__wrapped__(), ResponseCache)
@@ -0,0 +1,82 @@
+from src.app.core.agents.sentences import (
+    Sentence,
+    SentenceStream,
+    join_sentences,
+    split_sentences,
+)
+
+
+def texts(text):
+    return [sentence.text for sentence in split_sentences(text)]
+
+
+def test_splits_sentences_with_citations_attached():
+    assert texts("First claim [C1]. Second claim. [C2] Third? Yes!") == [
+        "First claim [C1].",
+        "Second claim. [C2]",
+        "Third?",
+        "Yes!",
+    ]
+
+
+def test_splits_on_line_breaks():
+    assert texts("- first item [C1]\n- second item [C2]") == [
+        "- first item [C1]",
+        "- second item [C2]",
+    ]
+
+
+def test_abbreviations_do_not_end_sentences():
+    assert texts("e.g. the value is 3.5 in Fig. 2 [C1]. It is stable.") == [
+        "e.g. the value is 3.5 in Fig. 2 [C1].",
+        "It is stable.",
+    ]
+    assert texts("Mr. Smith measured it. Approx. 10 ms were spent.") == [
+        "Mr. Smith measured it.",
+        "Approx. 10 ms were spent.",
+    ]
+    assert texts("See Fig. A and the U.S. Census for details.") == [
+        "See Fig. A and the U.S. Census for details."
+    ]
+
+
+def test_initials_do_not_end_sentences():
+    assert texts("J. R. Smith wrote it [C1]. Others agreed.") == [
+        "J. R. Smith wrote it [C1].",
+        "Others agreed.",
+    ]
+
+
+def test_lowercase_or_digit_after_period_continues_sentence():
+    assert texts("The rate was approx. 10 per cent. it held in version 2. 3 runs failed.") == [
+        "The rate was approx. 10 per cent. it held in version 2. 3 runs failed."
+    ]
+
+
+def test_unit_abbreviation_at_sentence_end_still_splits():
+    assert texts("It takes 10 ms. The cache is faster.") == [
+        "It takes 10 ms.",
+        "The cache is faster.",
+    ]
+
+
+def test_stream_matches_split_sentences():
+    text = "Mr. Smith said e.g. 3.5 [C1]. Next claim. [C2] Last one"
+    stream = SentenceStream()
+    streamed = []
+    for char in text:
+        streamed.extend(stream.feed(char))
+    streamed.extend(stream.close())
+    assert streamed == split_sentences(text)
+
+
+def test_stream_holds_sentence_until_citations_are_complete():
+    stream = SentenceStream()
+    assert stream.feed("Claim one. [C") == []
+    assert stream.feed("1] Claim two") == [Sentence(text="Claim one. [C1]", separator=" ")]
+    assert stream.close() == [Sentence(text="Claim two", separator="")]
+
+
+def test_join_restores_original_layout():
+    text = "First [C1].\n\nSecond. Third [C2]."
+    assert join_sentences(split_sentences(text)) == text
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.app.core.agents import sessions
+from src.app.core.agents.sessions import SessionRegistry
+
+
+class FakeCheckpointer:
+    def __init__(self, threads=()):
+        self.threads = set(threads)
+        self.deleted = []
+
+    def list(self, config):
+        return [
+            SimpleNamespace(config={"configurable": {"thread_id": thread_id}})
+            for thread_id in self.threads
+        ]
+
+    def delete_thread(self, thread_id):
+        self.threads.discard(thread_id)
+        self.deleted.append(thread_id)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(sessions.time, "time", clock)
+    return clock
+
+
+def make_registry(checkpointer=None, ttl=60.0, max_sessions=10, db_path=None):
+    return SessionRegistry(checkpointer or FakeCheckpointer(), ttl, max_sessions, db_path)
+
+
+def test_new_session_has_no_previous_thread(clock):
+    registry = make_registry()
+    assert registry.touch("s1") is None
+
+
+def test_commit_turn_replaces_the_previous_thread(clock):
+    checkpointer = FakeCheckpointer()
+    registry = make_registry(checkpointer)
+    first = registry.new_thread_id("s1")
+    registry.commit_turn("s1", first)
+    assert registry.touch("s1") == first
+
+    second = registry.new_thread_id("s1")
+    assert second != first and second.startswith("s1#")
+    registry.commit_turn("s1", second)
+    assert registry.touch("s1") == second
+    assert checkpointer.deleted == [first]
+
+
+def test_discarded_turn_keeps_the_previous_one(clock):
+    checkpointer = FakeCheckpointer()
+    registry = make_registry(checkpointer)
+    registry.commit_turn("s1", "s1#a")
+    registry.discard_thread("s1#b")
+    assert checkpointer.deleted == ["s1#b"]
+    assert registry.touch("s1") == "s1#a"
+
+
+def test_idle_sessions_expire_after_the_ttl(clock):
+    checkpointer = FakeCheckpointer()
+    registry = make_registry(checkpointer, ttl=60)
+    registry.commit_turn("s1", "s1#a")
+    clock.now += 60
+    assert registry.touch("s1") == "s1#a"  # touching renews the TTL
+    clock.now += 61
+    assert registry.touch("s1") is None
+    assert checkpointer.deleted == ["s1#a"]
+
+
+def test_least_recently_used_sessions_are_evicted(clock):
+    checkpointer = FakeCheckpointer()
+    registry = make_registry(checkpointer, max_sessions=2)
+    registry.commit_turn("s1", "s1#a")
+    clock.now += 1
+    registry.commit_turn("s2", "s2#a")
+    clock.now += 1
+    registry.touch("s1")  # "s2" is now the least recently used
+    clock.now += 1
+    registry.commit_turn("s3", "s3#a")
+    assert checkpointer.deleted == ["s2#a"]
+    assert registry.touch("s1") == "s1#a"
+    assert registry.touch("s2") is None
+
+
+def test_untracked_threads_are_adopted_and_expire(clock, tmp_path):
+    checkpointer = FakeCheckpointer(threads={"orphan"})
+    make_registry(checkpointer, db_path=tmp_path / "sessions.db")
+    assert checkpointer.deleted == []
+    clock.now += 61
+    # A restart with the same database expires the adopted thread.
+    make_registry(checkpointer, db_path=tmp_path / "sessions.db")
+    assert checkpointer.deleted == ["orphan"]
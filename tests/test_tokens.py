@@ -0,0 +1,69 @@
+import pytest
+
+from src.app.core.llm import tokens
+from src.app.core.retrieval.chunks import ChunkRecord
+from src.app.core.retrieval.serialization import render_context
+
+
+@pytest.fixture(autouse=True)
+def offline_encoding(monkeypatch):
+    # Use the character-based estimate so the tests never download encodings.
+    monkeypatch.setattr(tokens, "_encoding", lambda model_name: None)
+
+
+CHUNKS = {
+    f"C{idx}": ChunkRecord(text=f"chunk {idx} " + "word " * 40, source="a.pdf", page=idx)
+    for idx in range(1, 5)
+}
+
+
+def chunk_tokens(chunk_id):
+    return tokens.count_tokens(render_context({chunk_id: CHUNKS[chunk_id]}))
+
+
+def test_zero_budget_keeps_every_chunk():
+    assert tokens.fit_chunks(CHUNKS, budget=0) is CHUNKS
+
+
+def test_lowest_ranked_chunks_are_dropped_first():
+    budget = chunk_tokens("C1") + chunk_tokens("C2") + 2 * tokens.count_tokens("\n\n")
+    assert list(tokens.fit_chunks(CHUNKS, budget=budget)) == ["C1", "C2"]
+
+
+def test_reserved_tokens_reduce_the_budget():
+    budget = chunk_tokens("C1") + chunk_tokens("C2") + 2 * tokens.count_tokens("\n\n")
+    assert list(tokens.fit_chunks(CHUNKS, budget=budget, reserved=10)) == ["C1"]
+
+
+def test_best_chunk_is_kept_even_over_budget():
+    assert list(tokens.fit_chunks(CHUNKS, budget=1)) == ["C1"]
+
+
+def test_priority_chunks_are_kept_in_table_order():
+    budget = chunk_tokens("C3") + chunk_tokens("C4") + 2 * tokens.count_tokens("\n\n")
+    kept = tokens.fit_chunks(CHUNKS, budget=budget, priority=["C4", "C3"])
+    assert list(kept) == ["C3", "C4"]
+
+
+def test_prompt_tokens_counts_both_messages():
+    assert tokens.prompt_tokens("system", "user") == (
+        tokens.count_tokens("system") + tokens.count_tokens("user")
+    )
+
+
+def test_context_tokens_sums_rendered_chunks():
+    expected = sum(chunk_tokens(cid) for cid in CHUNKS) + 3 * tokens.count_tokens("\n\n")
+    assert tokens.context_tokens(CHUNKS) == expected
+    assert tokens.context_tokens({}) == 0
+
+
+def test_chunk_counts_are_memoized(monkeypatch):
+    tokens.chunk_tokens.cache_clear()
+    calls = []
+    count = tokens.count_tokens
+    monkeypatch.setattr(tokens, "count_tokens", lambda text: calls.append(text) or count(text))
+    tokens.context_tokens(CHUNKS)
+    rendered = len(calls)
+    tokens.context_tokens(CHUNKS)
+    tokens.fit_chunks(CHUNKS, budget=10_000)
+    assert len(calls) - rendered <= 2  # only the separator is re-counted
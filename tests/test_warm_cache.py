@@ -0,0 +1,45 @@
+from langchain_core.documents import Document
+
+from src.app.core.retrieval.prefetch import WarmRetrievalCache, extends_prefetched
+
+
+def doc(source):
+    return Document(page_content=f"chunk of {source}", metadata={"source": f"data/uploads/{source}"})
+
+
+def cache():
+    return WarmRetrievalCache(ttl_seconds=30, max_entries=10, extension_chars=8)
+
+
+def test_prefix_matching():
+    assert extends_prefetched("What is HNSW?", "what is  hnsw", 8)
+    assert extends_prefetched("What is HNSW index", "What is HNSW", 8)
+    assert not extends_prefetched("What is HNSW indexing about", "What is HNSW", 8)
+    assert not extends_prefetched("What is LSH", "What is HNSW", 8)
+
+
+def test_lookup_serves_the_longest_matching_prefix():
+    warm = cache()
+    warm.put("What is HN", 4, [doc("a.pdf")])
+    warm.put("What is HNSW", 4, [doc("b.pdf")])
+    assert warm.get("What is HNSW?", 4) == [doc("b.pdf")]
+    assert warm.get("What is HNSW?", 8) is None  # fewer results than asked for
+
+
+def test_invalidate_source_drops_entries_holding_it():
+    warm = cache()
+    warm.put("What is HNSW", 4, [doc("a.pdf"), doc("b.pdf")])
+    warm.put("What is LSH", 4, [doc("c.pdf")])
+    warm.invalidate_source("b.pdf")
+    assert warm.get("What is HNSW", 4) is None
+    assert warm.get("What is LSH", 4) == [doc("c.pdf")]
+
+
+def test_results_retrieved_before_an_invalidation_are_discarded():
+    warm = cache()
+    generation = warm.generation
+    warm.clear()
+    warm.put("What is HNSW", 4, [doc("a.pdf")], generation)
+    assert warm.get("What is HNSW", 4) is None
+    warm.put("What is HNSW", 4, [doc("a.pdf")], warm.generation)
+    assert warm.get("What is HNSW", 4) == [doc("a.pdf")]